@@ -0,0 +1,200 @@
+"""
+Zátěžový test latence levných endpointů během velkého exportu
+Autor: GitHub Copilot
+Datum: 17.10.2026
+
+Spustí server nad dočasnou databází se zaplněným skladem, nejdřív změří
+latenci levných endpointů (health, detail GB, mřížka regálu) bez zátěže
+a potom znovu, zatímco ve smyčce běží export PDF a Excel celého skladu.
+Blokující export nesmí ostatní požadavky workeru zdržet - test selže,
+pokud p99 během exportu překročí --max-p99-ms.
+Použití: python benchmark_export_latency.py [--items 20000] [--seconds 10] [--workers 1]
+"""
+
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from stress_concurrent_writes import _free_port, _request, _start_server
+
+EXPORTS = ["/api/export/search/pdf", "/api/export/search/excel"]
+
+
+def _seed(base_url: str, db_path: str, pocet_polozek: int) -> list:
+    """GB na všech pozicích přes API, položky hromadně přímo do databáze"""
+    pozice = _request(base_url, "GET", "/api/positions/available")[1]["data"]
+    gitterboxy = []
+    for cislo, pos in enumerate(pozice, start=1):
+        status, data = _request(
+            base_url,
+            "POST",
+            "/api/gitterboxes/",
+            {
+                "cislo_gb": cislo,
+                "position_id": pos["id"],
+                "zodpovedna_osoba": f"Osoba {cislo % 5}",
+            },
+        )
+        if status != 200:
+            raise RuntimeError(f"Založení GB selhalo: {status}")
+        gitterboxy.append(data["id"])
+
+    dnes = date.today().isoformat()
+    with sqlite3.connect(db_path) as connection:
+        connection.executemany(
+            """INSERT INTO items (gitterbox_id, tma_cislo, projekt, nazev_dilu, pocet_kusu, jednotka,
+                                  datum_zaskladneni, sledovat_expiraci, expiracni_datum, stav, poznamka)
+               VALUES (?, ?, ?, ?, 1, 'ks', ?, ?, ?, 'aktivni', ?)""",
+            (
+                (
+                    gitterboxy[i % len(gitterboxy)],
+                    f"TMA-{i:06d}",
+                    f"Projekt {i % 12}",
+                    f"Díl {i}",
+                    dnes,
+                    i % 3 == 0,
+                    "2030-01-01" if i % 3 == 0 else None,
+                    "Zátěžový test",
+                )
+                for i in range(pocet_polozek)
+            ),
+        )
+    return gitterboxy
+
+
+def _timed_get(url: str) -> float:
+    """Doba GET požadavku v ms (chyba = výjimka)"""
+    start = time.perf_counter()
+    with urllib.request.urlopen(url, timeout=120) as response:
+        response.read()
+        if response.status != 200:
+            raise RuntimeError(f"{url}: {response.status}")
+    return (time.perf_counter() - start) * 1000
+
+
+def _measure(base_url: str, gitterboxy: list, clients: int, seconds: float) -> list:
+    """Latence levných endpointů z několika klientů po zadanou dobu"""
+    cheap = [
+        "/api/health",
+        *(f"/api/gitterboxes/{gb_id}" for gb_id in gitterboxy[:20]),
+        "/api/positions/occupancy?shelf_id=1",
+    ]
+    konec = time.perf_counter() + seconds
+
+    def client(index: int) -> list:
+        latence = []
+        i = index
+        while time.perf_counter() < konec:
+            latence.append(_timed_get(base_url + cheap[i % len(cheap)]))
+            i += clients
+        return latence
+
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        return [ms for latence in pool.map(client, range(clients)) for ms in latence]
+
+
+def _percentile(values: list, p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def _report(nazev: str, latence: list) -> float:
+    p99 = _percentile(latence, 99)
+    print(
+        f"   {nazev:<16} {len(latence):>6} požadavků  p50 {statistics.median(latence):7.1f} ms"
+        f"  p95 {_percentile(latence, 95):7.1f} ms  p99 {p99:7.1f} ms  max {max(latence):7.1f} ms"
+    )
+    return p99
+
+
+def run(
+    pocet_polozek: int, seconds: float, clients: int, workers: int, max_p99_ms: float
+) -> bool:
+    temp_dir = tempfile.mkdtemp(prefix="storage_app_latency_")
+    db_path = os.path.join(temp_dir, "latency.db")
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+
+    server = _start_server(db_path, port, workers)
+    try:
+        gitterboxy = _seed(base_url, db_path, pocet_polozek)
+        print(
+            f"Sklad: {len(gitterboxy)} GB, {pocet_polozek} položek, {workers} worker(ů), {clients} klientů"
+        )
+
+        bez_exportu = _measure(base_url, gitterboxy, clients, seconds)
+
+        exporty = []
+        chyby_exportu = []
+        stop = threading.Event()
+
+        def export_loop():
+            i = 0
+            while not stop.is_set():
+                url = EXPORTS[i % len(EXPORTS)]
+                try:
+                    exporty.append((url, _timed_get(base_url + url)))
+                except Exception as e:
+                    chyby_exportu.append(f"{url}: {e}")
+                i += 1
+
+        export_thread = threading.Thread(target=export_loop, daemon=True)
+        export_thread.start()
+        time.sleep(0.5)  # export musí běžet už během prvních měřených požadavků
+        s_exportem = _measure(base_url, gitterboxy, clients, seconds)
+        stop.set()
+        export_thread.join()
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    print("Latence levných endpointů:")
+    _report("bez exportu", bez_exportu)
+    p99 = _report("během exportu", s_exportem)
+    for url in EXPORTS:
+        doby = [ms for export_url, ms in exporty if export_url == url]
+        if doby:
+            print(
+                f"   {url}: {len(doby)}x, průměr {statistics.mean(doby) / 1000:.1f} s"
+            )
+
+    ok = True
+    if chyby_exportu:
+        ok = False
+        print(f"❌ Chyby exportu: {chyby_exportu[:3]}")
+    if not exporty:
+        ok = False
+        print("❌ Během měření nedoběhl žádný export - zvyšte --seconds")
+    if p99 > max_p99_ms:
+        ok = False
+        print(f"❌ p99 během exportu {p99:.1f} ms překročilo {max_p99_ms:.0f} ms")
+    else:
+        print(f"✅ p99 během exportu {p99:.1f} ms (limit {max_p99_ms:.0f} ms)")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Latence levných endpointů během velkého exportu"
+    )
+    parser.add_argument(
+        "--items", type=int, default=20000, help="Počet položek ve skladu"
+    )
+    parser.add_argument("--seconds", type=float, default=10, help="Doba každého měření")
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--max-p99-ms", type=float, default=250)
+    args = parser.parse_args()
+    sys.exit(
+        0
+        if run(args.items, args.seconds, args.clients, args.workers, args.max_p99_ms)
+        else 1
+    )
@@ -0,0 +1,85 @@
+"""
+Měření serializace velkých výpisů do JSON
+Autor: GitHub Copilot
+Datum: 17.10.2026
+
+Porovná čas kódování 10 000 řádků výpisu GB původní cestou (pydantic model
+pro každý řádek + jsonable_encoder + json) a přes FastJSONResponse (orjson).
+Databázi nepotřebuje. Použití: python benchmark_serialization.py
+"""
+
+import time
+from datetime import date
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from routers.gitterboxes import GitterboxResponse
+from services.response_service import FastJSONResponse
+
+POCET_RADKU = 10_000
+OPAKOVANI = 5
+
+
+def _rows():
+    return [
+        {
+            "id": i,
+            "cislo_gb": i,
+            "zodpovedna_osoba": f"Osoba {i % 7}",
+            "datum_zalozeni": date(2026, 1, 1),
+            "naplnenost_procenta": i % 101,
+            "stav": "aktivni",
+            "poznamka": None,
+            "position_id": i,
+            "lokace": "Mošnov",
+            "regal": f"Regál {i % 5}",
+            "radek": i % 4 + 1,
+            "sloupec": i % 23 + 1,
+            "pocet_polozek": i % 9,
+            "ma_kriticke_expirace": i % 3 == 0,
+            "verze": 1,
+        }
+        for i in range(POCET_RADKU)
+    ]
+
+
+def _envelope(data):
+    return {
+        "status": "success",
+        "data": data,
+        "message": f"Načteno {len(data)} Gitterboxů",
+    }
+
+
+def _measure(popis: str, fn) -> None:
+    nejlepsi = min(_timed(fn) for _ in range(OPAKOVANI))
+    print(f"{popis:<48} {nejlepsi * 1000:8.1f} ms / {POCET_RADKU} řádků")
+
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    rows = _rows()
+    _measure(
+        "pydantic model + jsonable_encoder + json",
+        lambda: JSONResponse(
+            jsonable_encoder(_envelope([GitterboxResponse(**row) for row in rows]))
+        ),
+    )
+    _measure(
+        "slovníky + jsonable_encoder + json",
+        lambda: JSONResponse(jsonable_encoder(_envelope(rows))),
+    )
+    _measure(
+        "slovníky + FastJSONResponse (orjson)",
+        lambda: FastJSONResponse(_envelope(rows)),
+    )
+
+
+if __name__ == "__main__":
+    main()
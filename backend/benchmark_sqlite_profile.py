@@ -0,0 +1,189 @@
+"""
+Benchmark propustnosti čtení a zápisů podle profilu SQLite
+Autor: GitHub Copilot
+Datum: 17.10.2026
+
+Nad stejnou zaplněnou databází porovná původní nastavení (rollback journal,
+synchronous=FULL, výchozí cache a 5s timeout ovladače sqlite3, NullPool -
+nové připojení na každou session) s profilem z database.py (WAL, PRAGMA z SQLITE_PRAGMAS, QueuePool).
+Čtenáři i zapisovatelé běží souběžně ve vláknech, měří se operace za
+sekundu a zápisy odmítnuté chybou "database is locked".
+Použití: python benchmark_sqlite_profile.py [--seconds 10] [--readers 8] [--writers 4]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+# Dočasná databáze musí být nastavená před importem database.py
+_temp_dir = tempfile.mkdtemp(prefix="storage_app_profile_")
+_template = os.path.join(_temp_dir, "template.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_template}"
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import joinedload, sessionmaker
+
+from database import SQLITE_PRAGMAS, engine, engine_options, init_database
+from models import Gitterbox, Item, Position
+
+# Výchozí hodnoty SQLite před zavedením profilu
+PUVODNI_PRAGMAS = {"journal_mode": "DELETE", "synchronous": "FULL"}
+
+POCET_POLOZEK = 5000
+
+
+def _prepare_template() -> list:
+    """Sklad podle konfigurace, GB na všech pozicích a položky; vrací ID GB"""
+    init_database()
+    with sessionmaker(bind=engine)() as db:
+        pozice = [position_id for (position_id,) in db.query(Position.id)]
+        for cislo, position_id in enumerate(pozice, start=1):
+            db.add(
+                Gitterbox(
+                    cislo_gb=cislo,
+                    position_id=position_id,
+                    zodpovedna_osoba=f"Osoba {cislo % 5}",
+                )
+            )
+        db.flush()
+        gitterboxy = [gb_id for (gb_id,) in db.query(Gitterbox.id)]
+        for i in range(POCET_POLOZEK):
+            db.add(
+                Item(
+                    gitterbox_id=gitterboxy[i % len(gitterboxy)],
+                    nazev_dilu=f"Díl {i}",
+                    projekt=f"Projekt {i % 12}",
+                )
+            )
+        db.commit()
+    engine.dispose()
+
+    # Šablona bez WAL souborů, každý profil si nastaví journal_mode sám
+    with sqlite3.connect(_template) as connection:
+        connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        connection.execute("PRAGMA journal_mode = DELETE")
+    return gitterboxy
+
+
+def _make_engine(db_path: str, profil: str):
+    if profil == "puvodni":
+        bench_engine = create_engine(
+            f"sqlite:///{db_path}", connect_args={"check_same_thread": False}
+        )
+        pragmas = PUVODNI_PRAGMAS
+    else:
+        bench_engine = create_engine(
+            f"sqlite:///{db_path}",
+            connect_args={"check_same_thread": False},
+            **engine_options,
+        )
+        pragmas = SQLITE_PRAGMAS
+
+    @event.listens_for(bench_engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma, value in pragmas.items():
+            cursor.execute(f"PRAGMA {pragma} = {value}")
+        cursor.close()
+
+    return bench_engine
+
+
+def run_profile(
+    profil: str, gitterboxy: list, seconds: float, readers: int, writers: int
+) -> Counter:
+    db_path = os.path.join(_temp_dir, f"{profil}.db")
+    shutil.copyfile(_template, db_path)
+    bench_engine = _make_engine(db_path, profil)
+    Session = sessionmaker(bind=bench_engine)
+    vysledky = Counter()
+    lock = threading.Lock()
+    konec = time.perf_counter() + seconds
+
+    def reader():
+        hotovo = Counter()
+        while time.perf_counter() < konec:
+            try:
+                with Session() as db:
+                    gb_id = random.choice(gitterboxy)
+                    db.query(Gitterbox).options(joinedload(Gitterbox.pozice)).filter(
+                        Gitterbox.id == gb_id
+                    ).one()
+                    db.query(Item).filter(
+                        Item.gitterbox_id == gb_id, Item.stav == "aktivni"
+                    ).all()
+                hotovo["čtení"] += 1
+            except OperationalError:
+                hotovo["čtení zamčeno"] += 1
+        with lock:
+            vysledky.update(hotovo)
+
+    def writer():
+        hotovo = Counter()
+        while time.perf_counter() < konec:
+            try:
+                with Session() as db:
+                    db.add(
+                        Item(
+                            gitterbox_id=random.choice(gitterboxy),
+                            nazev_dilu="Benchmark",
+                        )
+                    )
+                    db.commit()
+                hotovo["zápis"] += 1
+            except OperationalError:
+                hotovo["zápis zamčeno"] += 1
+        with lock:
+            vysledky.update(hotovo)
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    bench_engine.dispose()
+    return vysledky
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Propustnost čtení a zápisů podle profilu SQLite"
+    )
+    parser.add_argument(
+        "--seconds", type=float, default=10, help="Doba měření každého profilu"
+    )
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    args = parser.parse_args()
+
+    gitterboxy = _prepare_template()
+    print(
+        f"Sklad: {len(gitterboxy)} GB, {POCET_POLOZEK} položek, "
+        f"{args.readers} čtenářů, {args.writers} zapisovatelů, {args.seconds:.0f} s"
+    )
+
+    vysledky = {}
+    for profil in ("puvodni", "profil"):
+        vysledky[profil] = run_profile(
+            profil, gitterboxy, args.seconds, args.readers, args.writers
+        )
+        v = vysledky[profil]
+        print(
+            f"   {profil:<8} čtení {v['čtení'] / args.seconds:8.0f}/s  zápisy {v['zápis'] / args.seconds:7.0f}/s"
+            f"  zamčeno: čtení {v['čtení zamčeno']}, zápisy {v['zápis zamčeno']}"
+        )
+
+    puvodni, profil = vysledky["puvodni"], vysledky["profil"]
+    for druh in ("čtení", "zápis"):
+        if puvodni[druh]:
+            print(f"   {druh}: {profil[druh] / puvodni[druh]:.1f}x")
+    sys.exit(0 if profil["čtení zamčeno"] + profil["zápis zamčeno"] == 0 else 1)
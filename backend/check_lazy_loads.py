@@ -0,0 +1,113 @@
+"""
+Kontrola implicitních lazy loadů (striktní režim načítání relací)
+Autor: GitHub Copilot
+Datum: 17.10.2026
+
+Nad dočasnou databází se zapnutým DB_STRICT_LOADING založí několik GB
+s položkami, zavolá všechny GET endpointy /api a hlavní zápisy (úprava,
+archivace, mazání) a selže, pokud některý z nich vrátí chybu serveru.
+Endpoint, který sáhne na nenačtenou relaci, ve striktním režimu spadne
+na LazyLoadError - N+1 dotazy se tak zachytí v CI, ne až v produkci.
+Použití: python check_lazy_loads.py
+"""
+
+import os
+import sys
+import tempfile
+from datetime import date, timedelta
+
+# Dočasná databáze a striktní režim musí být nastavené před importem database.py
+_temp_dir = tempfile.mkdtemp(prefix="storage_app_lazy_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_temp_dir, 'lazy.db')}"
+os.environ["DB_STRICT_LOADING"] = "true"
+
+from fastapi.testclient import TestClient
+
+from main import app
+
+POCET_GB = 4
+POLOZEK_NA_GB = 3
+
+# Hodnoty parametrů cesty pro GET endpointy (ID z naplněné databáze)
+PATH_PARAMS = {
+    "{gb_id}": "1",
+    "{cislo_gb}": "1",
+    "{item_id}": "1",
+    "{shelf_id}": "1",
+    "{location_id}": "1",
+    "{position_id}": "1",
+}
+
+# Zápisy po kontrole GET endpointů (metoda, URL, tělo)
+WRITES = [
+    ("PUT", "/api/gitterboxes/1", {"poznamka": "kontrola"}),
+    ("PUT", "/api/items/1", {"poznamka": "kontrola"}),
+    ("POST", "/api/items/batch-expire", [2]),
+    ("DELETE", "/api/archive/items/3", {"duvod": "expirace"}),
+    ("DELETE", "/api/archive/gitterboxes/2", {"duvod": "jine"}),
+    ("DELETE", "/api/gitterboxes/3", None),
+    ("DELETE", "/api/items/10", None),
+]
+
+
+def _seed(client: TestClient) -> None:
+    """Založí GB s položkami přes API"""
+    pozice = client.get("/api/positions/available", params={"limit": POCET_GB}).json()[
+        "data"
+    ]
+    for index, pos in enumerate(pozice, start=1):
+        response = client.post(
+            "/api/gitterboxes/",
+            json={
+                "cislo_gb": index,
+                "position_id": pos["id"],
+                "zodpovedna_osoba": "Kontrola",
+            },
+        )
+        response.raise_for_status()
+        gb_id = response.json()["id"]
+        for cislo in range(POLOZEK_NA_GB):
+            client.post(
+                "/api/items/",
+                json={
+                    "gitterbox_id": gb_id,
+                    "nazev_dilu": f"Díl {index}-{cislo}",
+                    "expiracni_datum": str(
+                        date.today() + timedelta(days=cislo * 20 - 5)
+                    ),
+                },
+            ).raise_for_status()
+
+
+def _get_urls():
+    """URL všech GET endpointů /api s doplněnými parametry cesty"""
+    for route in app.routes:
+        path = getattr(route, "path", "")
+        if not path.startswith("/api") or "GET" not in getattr(route, "methods", ()):
+            continue
+        if path.startswith(("/api/docs", "/api/redoc")):
+            continue
+        for param, value in PATH_PARAMS.items():
+            path = path.replace(param, value)
+        yield path + ("?q=Díl" if path.rstrip("/").endswith("/search") else "")
+
+
+def check_lazy_loads() -> bool:
+    """Zavolá endpointy ve striktním režimu, vrací True pokud žádný nespadl"""
+    ok = True
+    with TestClient(app) as client:
+        _seed(client)
+
+        calls = [("GET", url, None) for url in _get_urls()] + WRITES
+        for method, url, body in calls:
+            response = client.request(method, url, json=body)
+            if response.status_code >= 500:
+                ok = False
+                print(f"❌ {method} {url}: {response.text[:300]}")
+            else:
+                print(f"✅ {method} {url}")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check_lazy_loads() else 1)
@@ -0,0 +1,106 @@
+"""
+Kontrola počtu SQL dotazů výpisů (ochrana proti N+1)
+Autor: GitHub Copilot
+Datum: 17.10.2026
+
+Nad dočasnou databází založí N Gitterboxů s položkami, spočítá SQL příkazy
+výpisů (hlavička X-DB-Queries), doplní sklad na 10·N GB a měření zopakuje.
+Počet dotazů výpisu nesmí záviset na počtu GB - jinak se v něm někde
+dotazuje po řádcích. Použití: python check_query_counts.py
+"""
+
+import os
+import sys
+import tempfile
+
+# Dočasná databáze musí být nastavená před importem database.py
+_temp_dir = tempfile.mkdtemp(prefix="storage_app_counts_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_temp_dir, 'counts.db')}"
+
+from fastapi.testclient import TestClient
+
+from main import app
+
+N = 10
+POLOZEK_NA_GB = 2
+
+# Výpisy, jejichž počet dotazů musí být konstantní. Výpisy položek a pozic
+# s vse=true se streamují a jejich dotazy běží až po odeslání hlaviček,
+# měří se proto stránkou s maximálním limitem (stejný kód, celý sklad se vejde)
+LISTINGS = [
+    "/api/gitterboxes/?vse=true",
+    "/api/gitterboxes/?stav=aktivni&vse=true",
+    "/api/gitterboxes/?stav=aktivni&limit=5",
+    "/api/items/?limit=1000",
+    "/api/items/expired?limit=1000",
+    "/api/items/expiring-soon?limit=1000",
+    "/api/positions/?limit=1000",
+    "/api/positions/shelves/1/positions",
+    "/api/shelves/",
+    "/api/locations",
+    "/api/gitterboxes/reports/dashboard",
+    "/api/statistics",
+    "/api/search?q=Díl",
+]
+
+
+def _seed(client: TestClient, pocet_gb: int) -> None:
+    """Doplní sklad přes API na zadaný počet aktivních GB"""
+    stavajici = len(
+        client.get("/api/gitterboxes/?stav=aktivni&vse=true").json()["data"]
+    )
+    volne = client.get(
+        "/api/positions/available", params={"limit": pocet_gb - stavajici}
+    ).json()["data"]
+    for cislo, pozice in enumerate(volne, start=stavajici + 1):
+        response = client.post(
+            "/api/gitterboxes/",
+            json={
+                "cislo_gb": cislo,
+                "position_id": pozice["id"],
+                "zodpovedna_osoba": f"Osoba {cislo % 3}",
+            },
+        )
+        response.raise_for_status()
+        for index in range(POLOZEK_NA_GB):
+            client.post(
+                "/api/items/",
+                json={
+                    "gitterbox_id": response.json()["id"],
+                    "nazev_dilu": f"Díl {cislo}-{index}",
+                    "expiracni_datum": f"2020-01-{index + 1:02d}" if index else None,
+                },
+            ).raise_for_status()
+
+
+def _query_counts(client: TestClient) -> dict:
+    counts = {}
+    for url in LISTINGS:
+        response = client.get(url)
+        response.raise_for_status()
+        counts[url] = int(response.headers["X-DB-Queries"])
+    return counts
+
+
+def check_query_counts() -> bool:
+    """Porovná počty dotazů při N a 10·N GB, vrací True pokud se neliší"""
+    ok = True
+    with TestClient(app) as client:
+        _seed(client, N)
+        male = _query_counts(client)
+        _seed(client, 10 * N)
+        velke = _query_counts(client)
+
+    for url in LISTINGS:
+        if male[url] == velke[url]:
+            print(f"✅ {url}: {male[url]} dotazů")
+        else:
+            ok = False
+            print(
+                f"❌ {url}: {male[url]} dotazů při {N} GB, {velke[url]} při {10 * N} GB"
+            )
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check_query_counts() else 1)
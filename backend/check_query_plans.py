@@ -0,0 +1,235 @@
+"""
+Kontrola plánů častých dotazů (EXPLAIN QUERY PLAN)
+Autor: GitHub Copilot
+Datum: 17.10.2026
+
+Spustí hlavní endpointy nad dočasnou databází, zachytí jejich SELECTy
+a selže, pokud některý z nich prochází hlídanou tabulku celou (SCAN)
+místo hledání přes index. Použití: python check_query_plans.py
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+
+# Dočasná databáze musí být nastavená před importem database.py
+_temp_dir = tempfile.mkdtemp(prefix="storage_app_plans_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_temp_dir, 'plans.db')}"
+os.environ.setdefault("DB_STRICT_LOADING", "true")
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import event
+
+from database import engine, SessionLocal, init_database
+from routers import items, positions
+from services.archive_service import ArchiveService
+from services.listing_service import GitterboxListingService
+from services.pagination_service import encode_cursor
+
+# (popis, volání, tabulky které se nesmí procházet celé)
+HOT_QUERIES = [
+    (
+        "Výpis aktivních GB",
+        lambda db: GitterboxListingService.list_gitterboxes(db, stav="aktivni"),
+        {"gitterboxes", "items", "positions"},
+    ),
+    (
+        "Detail GB",
+        lambda db: GitterboxListingService.get_gitterbox(db, 1),
+        {"gitterboxes", "items", "positions"},
+    ),
+    (
+        "Položky GB",
+        lambda db: items.get_all_items(
+            gitterbox_id=1,
+            status="aktivni",
+            limit=100,
+            cursor=None,
+            vse=True,
+            fields=None,
+            embed=None,
+            db=db,
+        ),
+        {"items"},
+    ),
+    (
+        "Aktivní položky - další stránka",
+        lambda db: items.get_all_items(
+            gitterbox_id=None,
+            status="aktivni",
+            limit=100,
+            cursor=encode_cursor([50]),
+            vse=False,
+            fields=None,
+            embed=None,
+            db=db,
+        ),
+        {"items"},
+    ),
+    (
+        "Expirované položky - další stránka",
+        lambda db: items.get_expired_items(
+            limit=100,
+            cursor=encode_cursor(["2020-01-01", 10]),
+            vse=False,
+            fields=None,
+            embed=None,
+            db=db,
+        ),
+        {"items"},
+    ),
+    (
+        "Položky blízko expirace",
+        lambda db: items.get_expiring_soon_items(
+            days_ahead=30,
+            limit=100,
+            cursor=None,
+            vse=False,
+            fields=None,
+            embed=None,
+            db=db,
+        ),
+        {"items"},
+    ),
+    (
+        "Výpis všech GB - další stránka",
+        lambda db: GitterboxListingService.page_gitterboxes(
+            db, 100, cursor=encode_cursor([20, 20])
+        ),
+        {"gitterboxes", "items", "positions"},
+    ),
+    (
+        "Výpis GB - jen čísla",
+        lambda db: GitterboxListingService.page_gitterboxes(
+            db, 100, stav="aktivni", pole={"cislo_gb"}
+        ),
+        {"gitterboxes"},
+    ),
+    (
+        "Pozice - další stránka",
+        lambda db: positions.get_all_positions(
+            limit=100,
+            cursor=encode_cursor([50]),
+            vse=False,
+            fields=None,
+            embed=None,
+            db=db,
+        ),
+        {"positions"},
+    ),
+    (
+        "Položky pro výběr (jen id a název)",
+        lambda db: items.get_all_items(
+            gitterbox_id=None,
+            status="aktivni",
+            limit=100,
+            cursor=None,
+            vse=False,
+            fields="nazev_dilu",
+            embed=None,
+            db=db,
+        ),
+        {"items"},
+    ),
+    (
+        "Volné pozice",
+        lambda db: positions.get_available_positions(
+            shelf_id=None, location_id=None, limit=50, offset=0, db=db
+        ),
+        {"positions"},
+    ),
+    (
+        "Volné pozice regálu",
+        lambda db: positions.get_available_positions(
+            shelf_id=1, location_id=None, limit=None, offset=0, db=db
+        ),
+        {"positions"},
+    ),
+    (
+        "Další volná pozice",
+        lambda db: positions.get_next_available_position(
+            shelf_id=None, location_id=1, db=db
+        ),
+        {"positions"},
+    ),
+    (
+        "Pozice regálu",
+        lambda db: positions.get_shelf_positions(shelf_id=1, db=db),
+        {"positions"},
+    ),
+    (
+        "Statistiky archivu",
+        lambda db: ArchiveService.get_archive_stats(db),
+        {"archive_records", "archive_stats", "archive_period_stats"},
+    ),
+]
+
+
+@contextmanager
+def capture_query_plans():
+    """Zachytí plán každého SELECTu spuštěného přes engine"""
+    plans = []
+
+    def explain(conn, cursor, statement, parameters, context, executemany):
+        if executemany or not statement.lstrip().upper().startswith("SELECT"):
+            return
+        rows = cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+        plans.append((statement, [row[3] for row in rows]))
+
+    event.listen(engine, "before_cursor_execute", explain)
+    try:
+        yield plans
+    finally:
+        event.remove(engine, "before_cursor_execute", explain)
+
+
+def _read_body(result) -> None:
+    """Streamovaný výpis (vse=true) spouští dotaz až při čtení těla odpovědi"""
+    if isinstance(result, StreamingResponse):
+
+        async def read():
+            async for _ in result.body_iterator:
+                pass
+
+        asyncio.run(read())
+
+
+def _table_scans(plan, tables):
+    """Vrátí kroky plánu, které procházejí celou hlídanou tabulku"""
+    return [
+        step for step in plan if step.startswith("SCAN ") and step.split()[1] in tables
+    ]
+
+
+def check_query_plans() -> bool:
+    """Projde všechny hlídané dotazy, vrací True pokud žádný nedělá SCAN"""
+    init_database()
+    db = SessionLocal()
+    ok = True
+    try:
+        for popis, call, tables in HOT_QUERIES:
+            with capture_query_plans() as plans:
+                _read_body(call(db))
+
+            scans = [
+                (statement, step)
+                for statement, plan in plans
+                for step in _table_scans(plan, tables)
+            ]
+            if scans:
+                ok = False
+                print(f"❌ {popis}")
+                for statement, step in scans:
+                    print(f"   {step}")
+                    print(f"   {' '.join(statement.split())[:200]}")
+            else:
+                print(f"✅ {popis}")
+    finally:
+        db.close()
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check_query_plans() else 1)
@@ -5,7 +5,10 @@ Datum: 27.7.2025
 """
 
 import os
-from sqlalchemy import create_engine
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from dotenv import load_dotenv
@@ -29,16 +32,83 @@ else:  # Unix/Linux
 print(f"🗄️ Databázová cesta: {db_path}")
 print(f"🔗 DATABASE_URL: {DATABASE_URL}")
 
+# Výkonnostní profil SQLite - nastavuje se na každém novém připojení,
+# hodnoty lze přepsat proměnnými prostředí
+SQLITE_PRAGMAS = {
+    # WAL: čtenáři neblokují zapisovatele (více workerů v produkci)
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    # NORMAL je ve WAL módu bezpečné proti poškození DB, fsync jen při checkpointu
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    # Záporná hodnota = velikost v KiB (výchozí 64 MiB na připojení)
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-65536")),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    # Jak dlouho čekat na zámek, než SQLite vrátí "database is locked" (ms)
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000")),
+    "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+}
+
+# Za kolik sekund má klient zopakovat zápis, na který nezbyl zámek (503)
+BUSY_RETRY_AFTER = os.getenv("SQLITE_BUSY_RETRY_AFTER", "1")
+
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+IS_SQLITE_MEMORY = IS_SQLITE and (":memory:" in DATABASE_URL or DATABASE_URL.rstrip("/") == "sqlite:")
+
+engine_options = {}
+if IS_SQLITE and not IS_SQLITE_MEMORY:
+    # SQLAlchemy 1.4 používá pro souborovou SQLite NullPool (nové připojení na
+    # každý požadavek) - pool drží připojení otevřená i s nastavenými PRAGMA
+    engine_options.update(
+        poolclass=QueuePool,
+        pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        pool_timeout=int(os.getenv("DB_POOL_TIMEOUT", "30")),
+    )
+
 # SQLAlchemy engine
 engine = create_engine(
     DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {},
-    echo=os.getenv("DEBUG", "False").lower() == "true"  # SQL logging v debug módu
+    connect_args={"check_same_thread": False} if IS_SQLITE else {},
+    echo=os.getenv("DEBUG", "False").lower() == "true",  # SQL logging v debug módu
+    **engine_options
 )
 
+
+if IS_SQLITE:
+    @event.listens_for(engine, "connect")
+    def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+        """Nastaví výkonnostní PRAGMA na novém SQLite připojení"""
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma, value in SQLITE_PRAGMAS.items():
+                if pragma == "journal_mode" and IS_SQLITE_MEMORY:
+                    continue  # In-memory DB WAL nepodporuje
+                cursor.execute(f"PRAGMA {pragma} = {value}")
+        finally:
+            cursor.close()
+
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Striktní načítání relací (CI, vývoj): implicitní lazy load relace vyhodí
+# LazyLoadError - relace používané v endpointu se musí načíst explicitně
+# přes selectinload/joinedload, jinak hrozí N+1 dotazy ve smyčce
+STRICT_LOADING = os.getenv("DB_STRICT_LOADING", "False").lower() == "true"
+
+
+class LazyLoadError(RuntimeError):
+    """Implicitní lazy load relace ve striktním režimu"""
+
+
+if STRICT_LOADING:
+    @event.listens_for(SessionLocal, "do_orm_execute")
+    def _forbid_lazy_loads(orm_execute_state):
+        """Zastaví SQL dotaz lazy loaderu (selectinload apod. projdou)"""
+        if orm_execute_state.is_select and orm_execute_state.lazy_loaded_from is not None:
+            raise LazyLoadError(
+                f"Implicitní lazy load {orm_execute_state.loader_strategy_path[-1]} "
+                f"({orm_execute_state.lazy_loaded_from.class_.__name__}) - použijte selectinload/joinedload"
+            )
+
 # Base pro modely
 Base = declarative_base()
 
@@ -55,12 +125,68 @@ def get_database():
         db.close()
 
 
+def begin_immediate(db) -> None:
+    """
+    Zahájí zapisovací transakci hned na začátku (SQLite BEGIN IMMEDIATE)
+    
+    Souběžní zapisovatelé z ostatních workerů pak čekají (busy_timeout)
+    už před čtením, takže kontrola a následný zápis vidí stejná data.
+    Pokud session už transakci má, nic nemění.
+    
+    Raises:
+        HTTPException: 503 s Retry-After, pokud zámek nepřišel do busy_timeout
+    """
+    if not IS_SQLITE:
+        return
+    connection = db.connection()
+    if not connection.connection.in_transaction:
+        try:
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+        except OperationalError as e:
+            if "locked" not in str(e.orig) and "busy" not in str(e.orig):
+                raise
+            # Přetížení zapisovatelů, ne chyba dat - klient může požadavek zopakovat
+            db.rollback()
+            raise HTTPException(
+                status_code=503,
+                detail="Databáze je vytížená zápisy jiných požadavků, zkuste to prosím znovu",
+                headers={"Retry-After": BUSY_RETRY_AFTER},
+            )
+
+
 def create_tables():
     """
     Vytvoří všechny tabulky v databázi
     """
     from models import Base
-    Base.metadata.create_all(bind=engine)
+    from migrations import run_migrations
+    from services.cache_service import DataVersionService
+    from services.counter_service import GitterboxCounterService
+    from services.occupancy_service import OccupancyService
+    from services.position_service import FreePositionService
+    from services.search_service import SearchService
+    
+    with engine.begin() as connection:
+        fresh_database = not inspect(connection).has_table("gitterboxes")
+        Base.metadata.create_all(bind=connection)
+        
+        # Úpravy schématu existující databáze (indexy, nové sloupce)
+        run_migrations(connection, fresh_database=fresh_database)
+        
+        # Čítač verze dat pro cache reportů
+        DataVersionService.ensure_row(connection)
+        
+        # Triggery udržující počty položek a expirace v tabulce gitterboxes
+        GitterboxCounterService.create_triggers(connection)
+        
+        # Triggery udržující status pozic podle aktivních GB
+        FreePositionService.create_triggers(connection)
+        
+        # Triggery verzí regálů (mřížky obsazenosti se načítají jen u změněných regálů)
+        OccupancyService.create_triggers(connection)
+        
+        # Fulltext index (FTS5) a triggery pro jeho synchronizaci
+        SearchService.create_search_index(connection)
     
 
 def init_database():
@@ -70,8 +196,9 @@ def init_database():
     create_tables()
     
     # Import zde kvůli circular imports
-    from models import Location, Shelf, Position
+    from models import Location, Shelf
     from storage_config import ACTIVE_CONFIG
+    from services.position_service import PositionGridService
     
     db = SessionLocal()
     try:
@@ -107,17 +234,8 @@ def init_database():
                 db.add(regal)
                 db.flush()  # Získání ID
                 
-                # Vytvoření pozic pro tento regál
-                for radek in range(1, regal.radky + 1):
-                    for sloupec in range(1, regal.sloupce + 1):
-                        pozice = Position(
-                            shelf_id=regal.id,
-                            radek=radek,
-                            sloupec=sloupec,
-                            status="volna"
-                        )
-                        db.add(pozice)
-                        pozice_celkem += 1
+                # Vytvoření pozic pro tento regál jedním hromadným INSERTem
+                pozice_celkem += PositionGridService.materialize(db, regal.id, regal.radky, regal.sloupce)
         
         db.commit()
         
@@ -135,11 +253,16 @@ def init_database():
         db.close()
 
 
-def get_storage_statistics():
+def get_storage_statistics(db=None):
     """
     Vrací základní statistiky skladu
+    
+    Args:
+        db: Existující session (jinak se otevře vlastní)
     """
-    db = SessionLocal()
+    own_session = db is None
+    if own_session:
+        db = SessionLocal()
     try:
         from models import Location, Shelf, Position, Gitterbox, Item
         
@@ -163,4 +286,5 @@ def get_storage_statistics():
         return stats
         
     finally:
-        db.close()
+        if own_session:
+            db.close()
@@ -6,15 +6,25 @@ Datum: 27.7.2025
 
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import HTMLResponse, FileResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, selectinload
+import anyio
+import asyncio
 import os
 from pathlib import Path
 
-from database import get_database, init_database, get_storage_statistics
+from database import get_database, init_database, get_storage_statistics, SessionLocal
 from models import Location, Shelf, Position, Gitterbox, Item
-from routers import gitterboxes, items, positions, shelves, archive, export
+from routers import gitterboxes, items, positions, shelves, archive, export, search
+from services.archive_service import ArchiveService
+from services.cache_service import cached_response
+from services.coalescing_service import single_flight
+from services.metrics_service import (
+    METRICS_ENABLED, MetricsMiddleware, mark_process_dead, render_metrics, sample_process_loop,
+)
+from services.response_service import FastJSONResponse, FastJSONRoute
+from services.sql_metrics_service import SQLMetricsMiddleware
 
 # Vytvoření FastAPI aplikace
 app = FastAPI(
@@ -22,9 +32,13 @@ app = FastAPI(
     description="Webová aplikace pro správu skladu s vizualizací regálů",
     version="1.0.0",
     docs_url="/api/docs",
-    redoc_url="/api/redoc"
+    redoc_url="/api/redoc",
+    default_response_class=FastJSONResponse
 )
 
+# Endpointy aplikace i routerů vrací slovníky přes orjson (bez jsonable_encoder)
+app.router.route_class = FastJSONRoute
+
 # CORS middleware pro frontend
 app.add_middleware(
     CORSMiddleware,
@@ -32,8 +46,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-DB-Queries", "Server-Timing"],
 )
 
+# Počet a čas SQL dotazů požadavku v hlavičkách, pomalé dotazy do logu
+app.add_middleware(SQLMetricsMiddleware)
+
+# Latence a počet běžících požadavků pro Prometheus (jen s prometheus-client)
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Mount static files (frontend)
 static_path = Path(__file__).parent / "static"
 if static_path.exists():
@@ -59,15 +81,47 @@ app.include_router(archive.router)
 # Přidání routeru pro export dat
 app.include_router(export.router)
 
+# Přidání routeru pro fulltext vyhledávání
+app.include_router(search.router)
+
 
 @app.on_event("startup")
 async def startup_event():
     """Inicializace při spuštění aplikace"""
     print("🚀 Spouštím skladovou aplikaci...")
+    
+    # Synchronní endpointy (práce s DB, exporty) běží v threadpoolu,
+    # jeho velikost lze upravit proměnnou THREADPOOL_SIZE (výchozí 40)
+    threadpool_size = os.getenv("THREADPOOL_SIZE")
+    if threadpool_size:
+        anyio.to_thread.current_default_thread_limiter().total_tokens = int(threadpool_size)
+    
     init_database()
+    
+    # Jednorázový převod starého Excel archivu do archivní tabulky
+    db = SessionLocal()
+    try:
+        ArchiveService.import_legacy_excel(db)
+        ArchiveService.rebuild_archive_stats(db)
+    finally:
+        db.close()
+    
+    # Pravidelné vzorkování poolu a paměti/CPU workeru pro /metrics
+    if METRICS_ENABLED:
+        app.state.metrics_task = asyncio.create_task(sample_process_loop())
+    
     print("✅ Aplikace připravena!")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Úklid při ukončení workeru"""
+    metrics_task = getattr(app.state, "metrics_task", None)
+    if metrics_task:
+        metrics_task.cancel()
+    mark_process_dead()
+
+
 @app.get("/", response_class=HTMLResponse)
 async def root():
     """Hlavní stránka aplikace"""
@@ -122,10 +176,11 @@ async def root():
 # === API ENDPOINTY ===
 
 @app.get("/api/statistics")
-async def get_statistics():
+@cached_response("statistics")
+def get_statistics(db: Session = Depends(get_database)):
     """Základní statistiky skladu"""
     try:
-        stats = get_storage_statistics()
+        stats = get_storage_statistics(db)
         return {
             "status": "success",
             "data": stats,
@@ -136,10 +191,11 @@ async def get_statistics():
 
 
 @app.get("/api/locations")
-async def get_locations(db: Session = Depends(get_database)):
+@cached_response("locations")
+def get_locations(db: Session = Depends(get_database)):
     """Seznam všech lokací s regály"""
     try:
-        locations = db.query(Location).all()
+        locations = db.query(Location).options(selectinload(Location.regaly)).all()
         result = []
         
         for location in locations:
@@ -171,14 +227,17 @@ async def get_locations(db: Session = Depends(get_database)):
 
 
 @app.get("/api/shelves/{shelf_id}/positions")
-async def get_shelf_positions(shelf_id: int, db: Session = Depends(get_database)):
+def get_shelf_positions(shelf_id: int, db: Session = Depends(get_database)):
     """Pozice konkrétního regálu s informacemi o obsazenosti"""
     try:
         shelf = db.query(Shelf).filter(Shelf.id == shelf_id).first()
         if not shelf:
             raise HTTPException(status_code=404, detail="Regál nebyl nalezen")
         
-        positions = db.query(Position).filter(Position.shelf_id == shelf_id).all()
+        # GB všech pozic regálu jedním dotazem (ne dotaz na každou pozici)
+        positions = db.query(Position).options(selectinload(Position.gitterbox)).filter(
+            Position.shelf_id == shelf_id
+        ).all()
         
         result = {
             "regal": {
@@ -231,47 +290,11 @@ async def get_shelf_positions(shelf_id: int, db: Session = Depends(get_database)
         raise HTTPException(status_code=500, detail=f"Chyba při načítání pozic: {str(e)}")
 
 
-@app.get("/api/positions/{position_id}")
-async def get_position_detail(position_id: int, db: Session = Depends(get_database)):
-    """Detail konkrétní pozice"""
-    try:
-        position = db.query(Position).filter(Position.id == position_id).first()
-        if not position:
-            raise HTTPException(status_code=404, detail="Pozice nebyla nalezena")
-        
-        result = {
-            "id": position.id,
-            "radek": position.radek,
-            "sloupec": position.sloupec,
-            "nazev": position.nazev_pozice,
-            "status": position.status,
-            "shelf": {
-                "id": position.shelf.id,
-                "nazev": position.shelf.nazev,
-                "location": {
-                    "id": position.shelf.lokace.id,
-                    "nazev": position.shelf.lokace.nazev
-                }
-            }
-        }
-        
-        return {
-            "status": "success",
-            "data": result,
-            "message": f"Detail pozice {position.nazev_pozice}"
-        }
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Chyba při načítání pozice: {str(e)}")
-
-
 @app.get("/api/gitterboxes/{gb_id}/items")
-async def get_gitterbox_items(gb_id: int, db: Session = Depends(get_database)):
+def get_gitterbox_items(gb_id: int, db: Session = Depends(get_database)):
     """Položky konkrétního Gitterboxu"""
     try:
-        gb = db.query(Gitterbox).filter(Gitterbox.id == gb_id).first()
+        gb = db.query(Gitterbox).options(joinedload(Gitterbox.pozice)).filter(Gitterbox.id == gb_id).first()
         if not gb:
             raise HTTPException(status_code=404, detail="Gitterbox nebyl nalezen")
         
@@ -318,47 +341,6 @@ async def get_gitterbox_items(gb_id: int, db: Session = Depends(get_database)):
         raise HTTPException(status_code=500, detail=f"Chyba při načítání položek: {str(e)}")
 
 
-@app.get("/api/gitterboxes/available-numbers")
-async def get_available_gb_numbers(db: Session = Depends(get_database)):
-    """Získání volných čísel Gitterboxů"""
-    try:
-        # Získej všechna používaná čísla GB
-        obsazena_cisla = db.query(Gitterbox.cislo_gb).filter(Gitterbox.stav == 'aktivni').all()
-        obsazena_cisla = [cislo[0] for cislo in obsazena_cisla]
-        
-        # Pokud nejsou žádná čísla, začni od 1
-        if not obsazena_cisla:
-            max_cislo = 1
-        else:
-            max_cislo = max(obsazena_cisla) + 10  # Rozšiř rozsah o 10
-        
-        # Vytvoř seznam všech čísel od 1 do max+10
-        vsechna_cisla = set(range(1, max_cislo + 1))
-        obsazena_cisla_set = set(obsazena_cisla)
-        
-        # Volná čísla
-        volna_cisla = list(vsechna_cisla - obsazena_cisla_set)
-        volna_cisla.sort()
-        
-        return {
-            "status": "success",
-            "data": {
-                "volna_cisla": volna_cisla,
-                "obsazena_cisla": sorted(obsazena_cisla),
-                "celkem_volnych": len(volna_cisla),
-                "celkem_obsazenych": len(obsazena_cisla),
-                "max_cislo": max_cislo
-            },
-            "message": f"Nalezeno {len(volna_cisla)} volných čísel"
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Chyba při načítání čísel GB: {str(e)}")
-
-
-@app.get("/api/health")
-
-
 @app.get("/api/config/storage")
 async def get_storage_config():
     """Aktuální konfigurace skladu"""
@@ -379,6 +361,26 @@ async def get_storage_config():
         raise HTTPException(status_code=500, detail=f"Chyba při načítání konfigurace: {str(e)}")
 
 
+@app.get("/api/health/coalescing")
+async def get_coalescing_stats():
+    """Počty sloučených souběžných požadavků (za tento worker od startu)"""
+    stats = single_flight.stats()
+    return {
+        "status": "success",
+        "data": stats,
+        "message": f"Sloučeno {sum(s['sdilene'] for s in stats.values())} požadavků"
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """Metriky pro Prometheus (při více workerech součet za všechny)"""
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=503, detail="Metriky nejsou zapnuté (chybí prometheus-client nebo METRICS_ENABLED=False)")
+    content, media_type = render_metrics()
+    return Response(content=content, headers={"Content-Type": media_type})
+
+
 # Health check endpoint
 @app.get("/api/health")
 async def health_check():
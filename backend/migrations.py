@@ -0,0 +1,220 @@
+"""
+Verzované migrace schématu databáze
+Autor: GitHub Copilot
+Datum: 17.10.2026
+
+Funkcionalita:
+- Verze schématu uložená v PRAGMA user_version (bez další tabulky)
+- Migrace se spouští při startu v jedné transakci s create_all
+- Nová databáze vzniká rovnou v aktuálním schématu a jen se označí nejvyšší verzí
+"""
+
+from typing import Callable, List, Tuple
+
+from models import Base
+
+# Nové migrace přidávejte na konec seznamu se vzestupným číslem verze
+
+
+def _create_indexes(connection, *names: str) -> None:
+    """Vytvoří indexy podle jejich definice v models.py (pokud ještě neexistují)"""
+    indexes = {
+        index.name: index
+        for table in Base.metadata.sorted_tables
+        for index in table.indexes
+    }
+    for name in names:
+        indexes[name].create(connection, checkfirst=True)
+
+
+def _migration_001_hot_path_indexes(connection) -> None:
+    """Indexy pro nejčastější filtry (stav položek/GB, expirace, volné pozice)"""
+    _create_indexes(
+        connection,
+        "ix_items_gitterbox_stav",
+        "ix_items_stav_gitterbox",
+        "ix_items_aktivni_expirace",
+        "ix_gitterboxes_stav_cislo",
+        "ix_gitterboxes_position",
+        "ix_positions_status_shelf",
+        "ix_shelves_location",
+    )
+
+
+def _migration_002_gitterbox_counters(connection) -> None:
+    """Uložené údaje GB o položkách (počet, nejbližší expirace, mix sledování)"""
+    from services.counter_service import GitterboxCounterService
+
+    connection.exec_driver_sql(
+        "ALTER TABLE gitterboxes ADD COLUMN pocet_polozek INTEGER NOT NULL DEFAULT 0"
+    )
+    connection.exec_driver_sql(
+        "ALTER TABLE gitterboxes ADD COLUMN nejblizsi_expirace DATE"
+    )
+    connection.exec_driver_sql(
+        "ALTER TABLE gitterboxes ADD COLUMN ma_sledovane BOOLEAN NOT NULL DEFAULT 0"
+    )
+    connection.exec_driver_sql(
+        "ALTER TABLE gitterboxes ADD COLUMN ma_nesledovane BOOLEAN NOT NULL DEFAULT 0"
+    )
+    GitterboxCounterService.recalculate_all(connection)
+
+
+def _migration_003_fill_level_index(connection) -> None:
+    """Index pro report nejméně naplněných GB"""
+    _create_indexes(connection, "ix_gitterboxes_stav_naplnenost")
+
+
+def _migration_004_free_positions(connection) -> None:
+    """Status pozic podle aktivních GB, index statusu rozšířený o řádek a sloupec"""
+    from services.position_service import FreePositionService
+
+    FreePositionService.resync_all(connection)
+    connection.exec_driver_sql("DROP INDEX IF EXISTS ix_positions_status_shelf")
+    _create_indexes(connection, "ix_positions_status_shelf")
+
+
+def _rebuild_table(connection, table) -> None:
+    """
+    Přestaví tabulku podle aktuální definice v models.py (SQLite neumí
+    odebrat omezení přes ALTER TABLE)
+
+    Data se zkopírují (sloupce, které stará tabulka nemá, dostanou výchozí
+    hodnotu), indexy se vytvoří znovu. Triggery, které tabulku používají,
+    se smažou - create_tables je po migracích vytvoří znovu.
+    """
+    from sqlalchemy.schema import CreateTable
+
+    puvodni = {
+        row[1] for row in connection.exec_driver_sql(f"PRAGMA table_info({table.name})")
+    }
+    sloupce = ", ".join(
+        column.name for column in table.columns if column.name in puvodni
+    )
+    nova = f"_{table.name}_new"
+
+    triggery = (
+        connection.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND (tbl_name = ? OR sql LIKE ?)",
+            (table.name, f"%{table.name}%"),
+        )
+        .scalars()
+        .all()
+    )
+    for trigger in triggery:
+        connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {trigger}")
+
+    ddl = str(CreateTable(table).compile(connection)).replace(
+        f"CREATE TABLE {table.name} ", f"CREATE TABLE {nova} ", 1
+    )
+    connection.exec_driver_sql(ddl)
+    connection.exec_driver_sql(
+        f"INSERT INTO {nova} ({sloupce}) SELECT {sloupce} FROM {table.name}"
+    )
+    connection.exec_driver_sql(f"DROP TABLE {table.name}")
+    connection.exec_driver_sql(f"ALTER TABLE {nova} RENAME TO {table.name}")
+    for index in table.indexes:
+        index.create(connection)
+
+
+def _migration_005_concurrent_writes(connection) -> None:
+    """Unikátní číslo a pozice jen mezi aktivními GB, verze řádků GB a pozic"""
+    gitterboxes = Base.metadata.tables["gitterboxes"]
+
+    # Duplicitní aktivní GB by index nepustil - data musí opravit člověk
+    duplicity = connection.exec_driver_sql("""
+        SELECT 'cislo_gb', cislo_gb FROM gitterboxes WHERE stav = 'aktivni'
+        GROUP BY cislo_gb HAVING COUNT(*) > 1
+        UNION ALL
+        SELECT 'position_id', position_id FROM gitterboxes WHERE stav = 'aktivni'
+        GROUP BY position_id HAVING COUNT(*) > 1
+    """).all()
+    if duplicity:
+        raise RuntimeError(
+            f"Duplicitní aktivní Gitterboxy (sloupec, hodnota): {duplicity}"
+        )
+
+    # Globální UNIQUE(cislo_gb) je součástí tabulky, proto přestavba
+    _rebuild_table(connection, gitterboxes)
+    connection.exec_driver_sql(
+        "ALTER TABLE positions ADD COLUMN verze INTEGER NOT NULL DEFAULT 1"
+    )
+
+
+def _migration_006_listing_indexes(connection) -> None:
+    """Indexy pro stránkované výpisy GB a položek (pořadí stránky z indexu)"""
+    _create_indexes(
+        connection, "ix_gitterboxes_cislo", "ix_items_stav", "ix_items_stav_expirace"
+    )
+
+
+def _migration_007_archive_created_index(connection) -> None:
+    """Index času archivace (poslední archivace, export od nejnovějších)"""
+    _create_indexes(connection, "ix_archive_records_vytvoreno")
+
+
+def _migration_008_search_active_gitterboxes(connection) -> None:
+    """Fulltext index jen s položkami aktivních GB (triggery i obsah)"""
+    from services.search_service import SearchService
+
+    # Nové triggery vytvoří create_tables po migracích
+    SearchService.drop_item_triggers(connection)
+
+    # Položky přidané do archivovaných GB starými triggery z indexu odstraní přestavba
+    if connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'"
+    ).first():
+        SearchService.rebuild_search_index(connection)
+
+
+def _migration_009_archive_period_stats(connection) -> None:
+    """Měsíční a celková počítadla archivace z existujících denních"""
+    from services.archive_service import ArchiveService
+
+    ArchiveService.rebuild_period_stats(connection)
+
+
+MIGRATIONS: List[Tuple[int, str, Callable]] = [
+    (1, "Indexy pro časté filtry", _migration_001_hot_path_indexes),
+    (2, "Počítadla položek v tabulce gitterboxes", _migration_002_gitterbox_counters),
+    (3, "Index naplněnosti GB", _migration_003_fill_level_index),
+    (4, "Seznam volných pozic", _migration_004_free_positions),
+    (5, "Souběžné zápisy GB a pozic", _migration_005_concurrent_writes),
+    (6, "Indexy pro stránkované výpisy", _migration_006_listing_indexes),
+    (7, "Index času archivace", _migration_007_archive_created_index),
+    (8, "Fulltext jen aktivních GB", _migration_008_search_active_gitterboxes),
+    (9, "Měsíční počítadla archivace", _migration_009_archive_period_stats),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(connection) -> int:
+    """Vrátí aktuální verzi schématu databáze"""
+    return connection.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def _set_schema_version(connection, version: int) -> None:
+    connection.exec_driver_sql(f"PRAGMA user_version = {int(version)}")
+
+
+def run_migrations(connection, fresh_database: bool = False) -> None:
+    """
+    Aplikuje chybějící migrace
+
+    Args:
+        connection: SQLAlchemy Connection v otevřené transakci
+        fresh_database: Databáze byla právě vytvořena přes create_all,
+                        schéma je aktuální a stačí nastavit verzi
+    """
+    if fresh_database:
+        _set_schema_version(connection, LATEST_VERSION)
+        return
+
+    current_version = get_schema_version(connection)
+    for version, popis, migrate in MIGRATIONS:
+        if version <= current_version:
+            continue
+        migrate(connection)
+        _set_schema_version(connection, version)
+        print(f"✅ Migrace {version}: {popis}")
@@ -4,7 +4,7 @@ Autor: GitHub Copilot
 Datum: 27.7.2025
 """
 
-from sqlalchemy import Column, Integer, String, Text, Date, Boolean, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, Boolean, ForeignKey, UniqueConstraint, Index, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime, timedelta
@@ -38,6 +38,8 @@ class Shelf(Base):
     sloupce = Column(Integer, nullable=False, comment="Počet sloupců")
     typ = Column(String(20), comment="Typ regálu (hala/zkušebna)")
     
+    __table_args__ = (Index('ix_shelves_location', 'location_id'),)
+    
     # Vztahy
     lokace = relationship("Location", back_populates="regaly")
     pozice = relationship("Position", back_populates="regal")
@@ -60,9 +62,18 @@ class Position(Base):
     radek = Column(Integer, nullable=False, comment="Číslo řádku")
     sloupec = Column(Integer, nullable=False, comment="Číslo sloupce")
     status = Column(String(20), default="volna", comment="Status pozice (volna/obsazena)")
+    # Optimistická verze řádku - zvyšuje ji ORM i triggery při změně statusu
+    verze = Column(Integer, nullable=False, default=1, server_default="1", comment="Verze řádku")
+    
+    # Unikátní kombinace regál + řádek + sloupec (slouží i jako index pro hledání podle regálu)
+    __table_args__ = (
+        UniqueConstraint('shelf_id', 'radek', 'sloupec', name='unique_position'),
+        # Pozice podle statusu a místa - pro status 'volna' seznam volných pozic
+        # po regálech v pořadí řádek/sloupec (status udržují triggery nad gitterboxes)
+        Index('ix_positions_status_shelf', 'status', 'shelf_id', 'radek', 'sloupec'),
+    )
     
-    # Unikátní kombinace regál + řádek + sloupec
-    __table_args__ = (UniqueConstraint('shelf_id', 'radek', 'sloupec', name='unique_position'),)
+    __mapper_args__ = {"version_id_col": verze}
     
     # Vztahy
     regal = relationship("Shelf", back_populates="pozice")
@@ -82,7 +93,7 @@ class Gitterbox(Base):
     __tablename__ = "gitterboxes"
     
     id = Column(Integer, primary_key=True, index=True)
-    cislo_gb = Column(Integer, unique=True, nullable=False, comment="Globální číslo GB (1-max_pozic)")
+    cislo_gb = Column(Integer, nullable=False, comment="Globální číslo GB (1-max_pozic), unikátní mezi aktivními GB")
     position_id = Column(Integer, ForeignKey("positions.id"), nullable=False)
     zodpovedna_osoba = Column(String(100), nullable=False, comment="Zodpovědná osoba")
     datum_zalozeni = Column(Date, default=datetime.now().date(), comment="Datum založení GB")
@@ -90,26 +101,39 @@ class Gitterbox(Base):
     stav = Column(String(20), default="aktivni", comment="Stav GB (aktivni/vyskladnen)")
     poznamka = Column(Text, comment="Poznámka k GB")
     
+    # Denormalizované údaje o aktivních položkách - udržují je SQL triggery
+    # nad tabulkou items (services/counter_service.py), needitovat ručně
+    pocet_polozek = Column(Integer, nullable=False, default=0, server_default="0", comment="Počet aktivních položek v GB")
+    nejblizsi_expirace = Column(Date, comment="Nejbližší expirace aktivních sledovaných položek")
+    ma_sledovane = Column(Boolean, nullable=False, default=False, server_default="0", comment="Obsahuje aktivní sledované položky")
+    ma_nesledovane = Column(Boolean, nullable=False, default=False, server_default="0", comment="Obsahuje aktivní nesledované položky")
+    
+    # Optimistická verze řádku (kontroluje ji každý UPDATE přes ORM)
+    verze = Column(Integer, nullable=False, default=1, server_default="1", comment="Verze řádku")
+    
+    __table_args__ = (
+        Index('ix_gitterboxes_stav_cislo', 'stav', 'cislo_gb'),
+        Index('ix_gitterboxes_position', 'position_id'),
+        Index('ix_gitterboxes_stav_naplnenost', 'stav', 'naplnenost_procenta', 'cislo_gb'),
+        # Výpis všech GB stránkovaný podle (číslo, ID) bez filtru stavu
+        Index('ix_gitterboxes_cislo', 'cislo_gb'),
+        # Číslo i pozice smí patřit jen jednomu aktivnímu GB - poslední pojistka
+        # proti souběžnému založení/přesunu (neaktivní GB čísla neblokují)
+        Index('ux_gitterboxes_aktivni_cislo', 'cislo_gb', unique=True, sqlite_where=text("stav = 'aktivni'")),
+        Index('ux_gitterboxes_aktivni_pozice', 'position_id', unique=True, sqlite_where=text("stav = 'aktivni'")),
+    )
+    
+    __mapper_args__ = {"version_id_col": verze}
+    
     # Vztahy
     pozice = relationship("Position", back_populates="gitterbox")
     polozky = relationship("Item", back_populates="gitterbox")
     
-    @property
-    def pocet_polozek(self):
-        """Počet aktivních položek v GB"""
-        return len([p for p in self.polozky if p.stav == "aktivni"])
-    
     @property
     def ma_kriticke_expirace(self):
         """Má GB nějaké položky s kritickou expirací (< 30 dní)?"""
         kriticky_datum = datetime.now().date() + timedelta(days=30)
-        for polozka in self.polozky:
-            if (polozka.stav == "aktivni" and 
-                polozka.sledovat_expiraci and 
-                polozka.expiracni_datum and 
-                polozka.expiracni_datum <= kriticky_datum):
-                return True
-        return False
+        return self.nejblizsi_expirace is not None and self.nejblizsi_expirace <= kriticky_datum
     
     @property
     def barva_indikace(self):
@@ -118,12 +142,9 @@ class Gitterbox(Base):
             return "cervena"
         
         # Kontrola typů položek
-        sledovane = any(p.sledovat_expiraci for p in self.polozky if p.stav == "aktivni")
-        nesledovane = any(not p.sledovat_expiraci for p in self.polozky if p.stav == "aktivni")
-        
-        if not sledovane and nesledovane:
+        if not self.ma_sledovane and self.ma_nesledovane:
             return "modra"  # Pouze nesledované
-        elif sledovane:
+        elif self.ma_sledovane:
             if self.naplnenost_procenta < 80:
                 return "oranzova_srafovana"  # Neúplně naplněný
             else:
@@ -152,6 +173,21 @@ class Item(Base):
     stav = Column(String(20), default="aktivni", comment="Stav položky (aktivni/vyskladnena)")
     poznamka = Column(Text, comment="Poznámka k položce")
     
+    __table_args__ = (
+        # Položky GB (gitterbox_id + stav) a počty aktivních položek (stav + gitterbox_id)
+        Index('ix_items_gitterbox_stav', 'gitterbox_id', 'stav'),
+        Index('ix_items_stav_gitterbox', 'stav', 'gitterbox_id'),
+        # Částečný index jen pro aktivní položky se sledovanou expirací
+        Index(
+            'ix_items_aktivni_expirace', 'expiracni_datum',
+            sqlite_where=text("stav = 'aktivni' AND sledovat_expiraci = 1")
+        ),
+        # Stránkované výpisy: položky podle stavu v pořadí ID a expirace
+        # v pořadí (datum, ID) - stránka se čte z indexu bez řazení
+        Index('ix_items_stav', 'stav'),
+        Index('ix_items_stav_expirace', 'stav', 'sledovat_expiraci', 'expiracni_datum'),
+    )
+    
     # Vztahy
     gitterbox = relationship("Gitterbox", back_populates="polozky")
     
@@ -186,3 +222,97 @@ class Item(Base):
     
     def __repr__(self):
         return f"<Item(nazev='{self.nazev_dilu}', mnozstvi={self.popis_mnozstvi})>"
+
+
+class ArchiveRecord(Base):
+    """Záznam o vyskladnění (append-only archiv, Excel se generuje na vyžádání)"""
+    __tablename__ = "archive_records"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    vytvoreno = Column(DateTime, nullable=False, default=datetime.now, comment="Datum a čas archivace")
+    windows_user = Column(String(100), comment="Uživatel, který archivaci provedl")
+    typ = Column(String(20), nullable=False, comment="Typ záznamu (Položka/Celý_GB/Položka_z_GB)")
+    gb_cislo = Column(Integer, comment="Číslo GB")
+    nazev_dilu = Column(String(200), comment="Název dílu")
+    tma_cislo = Column(String(50), comment="TMA číslo")
+    projekt = Column(String(100), comment="Projekt")
+    mnozstvi = Column(String(50), comment="Popis množství")
+    expirace = Column(String(20), comment="Datum expirace")
+    duvod = Column(String(100), nullable=False, comment="Důvod vyskladnění")
+    poznamka = Column(Text, comment="Poznámka")
+    datum_zaskladneni = Column(String(20), comment="Datum zaskladnění / založení GB")
+    zodpovedna_osoba = Column(String(100), comment="Zodpovědná osoba")
+    
+    # Poslední archivace a export archivu od nejnovějšího záznamu
+    __table_args__ = (Index('ix_archive_records_vytvoreno', 'vytvoreno'),)
+    
+    def __repr__(self):
+        return f"<ArchiveRecord(typ='{self.typ}', gb={self.gb_cislo}, duvod='{self.duvod}')>"
+
+
+class ArchiveStat(Base):
+    """Denní počítadla archivace podle důvodu a uživatele (aktualizují se při archivaci)"""
+    __tablename__ = "archive_stats"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    den = Column(Date, nullable=False, comment="Den archivace")
+    duvod = Column(String(100), nullable=False, comment="Důvod vyskladnění")
+    uzivatel = Column(String(100), nullable=False, default="", comment="Uživatel, který archivaci provedl")
+    pocet = Column(Integer, nullable=False, default=0, comment="Počet archivních záznamů")
+    
+    __table_args__ = (UniqueConstraint('den', 'duvod', 'uzivatel', name='unique_archive_stat'),)
+    
+    def __repr__(self):
+        return f"<ArchiveStat(den={self.den}, duvod='{self.duvod}', pocet={self.pocet})>"
+
+
+class ArchivePeriodStat(Base):
+    """Měsíční a celková počítadla archivace podle důvodu a uživatele (souhrn bez procházení historie)"""
+    __tablename__ = "archive_period_stats"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    obdobi = Column(String(7), nullable=False, comment="Měsíc RRRR-MM, nebo 'celkem' pro celou historii")
+    duvod = Column(String(100), nullable=False, comment="Důvod vyskladnění")
+    uzivatel = Column(String(100), nullable=False, default="", comment="Uživatel, který archivaci provedl")
+    pocet = Column(Integer, nullable=False, default=0, comment="Počet archivních záznamů")
+    
+    __table_args__ = (UniqueConstraint('obdobi', 'duvod', 'uzivatel', name='unique_archive_period_stat'),)
+    
+    def __repr__(self):
+        return f"<ArchivePeriodStat(obdobi='{self.obdobi}', duvod='{self.duvod}', pocet={self.pocet})>"
+
+
+class DataVersion(Base):
+    """Globální verze dat (jediný řádek) - zvyšuje se při každém zápisu přes API"""
+    __tablename__ = "data_version"
+    
+    id = Column(Integer, primary_key=True)
+    verze = Column(Integer, nullable=False, default=0, server_default="0", comment="Číslo verze dat")
+    
+    def __repr__(self):
+        return f"<DataVersion(verze={self.verze})>"
+
+
+class ShelfVersion(Base):
+    """Verze obsahu regálu pro mřížky obsazenosti - zvyšují ji triggery (services/occupancy_service.py)"""
+    __tablename__ = "shelf_versions"
+    
+    shelf_id = Column(Integer, primary_key=True, comment="ID regálu (i smazaného)")
+    verze = Column(Integer, nullable=False, default=0, server_default="0", comment="Verze obsahu regálu")
+    
+    def __repr__(self):
+        return f"<ShelfVersion(shelf_id={self.shelf_id}, verze={self.verze})>"
+
+
+class GbNumberReservation(Base):
+    """Dočasná rezervace čísla GB (např. pro hromadný příjem)"""
+    __tablename__ = "gb_number_reservations"
+    
+    id = Column(Integer, primary_key=True)
+    cislo_gb = Column(Integer, unique=True, nullable=False, comment="Rezervované číslo GB")
+    token = Column(String(36), nullable=False, index=True, comment="Identifikátor rezervace")
+    vyprsi = Column(DateTime, nullable=False, comment="Konec platnosti rezervace")
+    vytvoreno = Column(DateTime, nullable=False, default=datetime.now, comment="Datum a čas rezervace")
+    
+    def __repr__(self):
+        return f"<GbNumberReservation(cislo={self.cislo_gb}, vyprsi={self.vyprsi})>"
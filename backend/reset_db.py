@@ -11,6 +11,7 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from backend.database import SessionLocal, engine
 from backend.models import Base, Gitterbox, Item, Position
 from backend.database import init_database
+from backend.services.search_service import SearchService
 from datetime import datetime, timedelta
 import random
 
@@ -22,6 +23,8 @@ def reset_database():
     
     # Smazání všech tabulek
     Base.metadata.drop_all(bind=engine)
+    with engine.begin() as connection:
+        SearchService.drop_search_index(connection)
     print("✅ Všechny tabulky smazány")
     
     # Znovu vytvoření tabulek a základních dat
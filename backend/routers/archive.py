@@ -28,19 +28,26 @@ Funkcionalita:
 """
 
 from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from typing import Dict, Any
+from sqlalchemy.orm import Session, selectinload
+from typing import Dict, Any, Optional
 from datetime import date
 
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database import get_database
-from models import Gitterbox, Position, Item
+from database import begin_immediate, get_database
+from models import Gitterbox, Item
 from services.archive_service import ArchiveService, VYSSKLADNENI_DUVODY
+from services.cache_service import track_data_changes
+from services.response_service import FastJSONRoute
 
-router = APIRouter(prefix="/api/archive", tags=["archive"])
+router = APIRouter(
+    prefix="/api/archive",
+    tags=["archive"],
+    dependencies=[Depends(track_data_changes)],
+    route_class=FastJSONRoute
+)
 
 # Pydantic modely
 from pydantic import BaseModel
@@ -95,9 +102,9 @@ def archive_item(item_id: int, request: VyskladneniRequest, db: Session = Depend
             'zodpovedna_osoba': gb.zodpovedna_osoba
         } if gb else {}
         
-        # Archivuj do Excel
-        if not ArchiveService.archive_item(item_data, VYSSKLADNENI_DUVODY.get(request.duvod, request.duvod), gb_info):
-            raise HTTPException(status_code=500, detail="Chyba při archivaci do Excel")
+        # Zapiš do archivu (stejná transakce jako smazání položky)
+        if not ArchiveService.archive_item(db, item_data, VYSSKLADNENI_DUVODY.get(request.duvod, request.duvod), gb_info):
+            raise HTTPException(status_code=500, detail="Chyba při zápisu do archivu")
         
         # Smaž z databáze
         db.delete(item)
@@ -130,13 +137,19 @@ def archive_item(item_id: int, request: VyskladneniRequest, db: Session = Depend
 def archive_gitterbox(gb_id: int, request: VyskladneniRequest, db: Session = Depends(get_database)):
     """Archivuje a smaže celý Gitterbox včetně všech položek"""
     
+    # Zápisový zámek před čtením - souběžný přesun nebo úprava GB počká
+    begin_immediate(db)
+    
     # Najdi GB
-    gb = db.query(Gitterbox).filter(Gitterbox.id == gb_id, Gitterbox.stav == "aktivni").first()
+    # Položky GB se načtou hned s ním - smazání GB je stejně prochází
+    gb = db.query(Gitterbox).options(selectinload(Gitterbox.polozky)).filter(
+        Gitterbox.id == gb_id, Gitterbox.stav == "aktivni"
+    ).first()
     if not gb:
         raise HTTPException(status_code=404, detail="Gitterbox nebyl nalezen")
     
     # Najdi všechny aktivní položky v GB
-    items = db.query(Item).filter(Item.gitterbox_id == gb_id, Item.stav == "aktivni").all()
+    items = [item for item in gb.polozky if item.stav == "aktivni"]
     
     try:
         # Připrav data pro archivaci
@@ -167,22 +180,17 @@ def archive_gitterbox(gb_id: int, request: VyskladneniRequest, db: Session = Dep
                 'datum_zaskladneni': str(item.datum_zaskladneni)
             })
         
-        # Archivuj do Excel
-        if not ArchiveService.archive_gitterbox(gb_data, items_data, VYSSKLADNENI_DUVODY.get(request.duvod, request.duvod)):
-            raise HTTPException(status_code=500, detail="Chyba při archivaci do Excel")
+        # Zapiš do archivu (stejná transakce jako smazání GB)
+        if not ArchiveService.archive_gitterbox(db, gb_data, items_data, VYSSKLADNENI_DUVODY.get(request.duvod, request.duvod)):
+            raise HTTPException(status_code=500, detail="Chyba při zápisu do archivu")
         
         # Smaž všechny položky
         for item in items:
             db.delete(item)
         
-        # Smaž GB
+        # Smaž GB (pozici uvolní trigger nad gitterboxes)
         db.delete(gb)
         
-        # Uvolni pozici
-        pozice = db.query(Position).filter(Position.id == gb.position_id).first()
-        if pozice:
-            pozice.status = "volna"
-        
         db.commit()
         
         return {
@@ -202,29 +210,40 @@ def archive_gitterbox(gb_id: int, request: VyskladneniRequest, db: Session = Dep
         raise HTTPException(status_code=500, detail=f"Chyba při vyskladnění GB: {str(e)}")
 
 @router.get("/stats")
-def get_archive_stats():
-    """Vrátí statistiky archivních dat"""
+def get_archive_stats(
+    od: Optional[date] = None,
+    do: Optional[date] = None,
+    db: Session = Depends(get_database)
+):
+    """Vrátí statistiky archivních dat, volitelně s rozpisem za období od-do"""
     try:
-        stats = ArchiveService.get_archive_stats()
+        if od and do and od > do:
+            raise HTTPException(status_code=422, detail="Datum 'od' musí být před datem 'do'")
+        
+        stats = ArchiveService.get_archive_stats(db, od=od, do=do)
         return {
             "status": "success",
             "data": stats,
             "message": "Archivní statistiky načteny"
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Chyba při načítání statistik: {str(e)}")
 
 @router.get("/export")
-def download_archive():
-    """Umožní stažení Excel souboru s archivem"""
+def download_archive(db: Session = Depends(get_database)):
+    """Umožní stažení Excel souboru s archivem (generuje se z archivní tabulky)"""
     from fastapi.responses import FileResponse
-    from services.archive_service import ARCHIVE_FILE
+    from starlette.background import BackgroundTask
     
-    if not ARCHIVE_FILE.exists():
-        raise HTTPException(status_code=404, detail="Archivní soubor neexistuje")
+    excel_path = ArchiveService.export_to_excel(db)
+    if not excel_path:
+        raise HTTPException(status_code=404, detail="Archiv je prázdný")
     
     return FileResponse(
-        path=str(ARCHIVE_FILE),
+        path=excel_path,
         filename=f"vyskladneno_archiv_{date.today().strftime('%Y%m%d')}.xlsx",
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        background=BackgroundTask(os.remove, excel_path)
     )
@@ -5,26 +5,30 @@ Datum: 6.8.2025
 """
 
 from fastapi import APIRouter, HTTPException, Depends, Query
-from fastapi.responses import FileResponse
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, func, String
-from typing import List, Optional
-from datetime import datetime, timedelta
+from sqlalchemy import or_
+from typing import Optional
+from datetime import datetime
 import os
-import tempfile
-from pathlib import Path
+from urllib.parse import quote
 
 from database import get_database
 from models import Gitterbox, Item, Position, Shelf, Location
 from services.export_service import ExportService
+from services.search_service import SearchService
+from services.cache_service import current_stamp
+from services.coalescing_service import single_flight
+from services.response_service import FastJSONRoute
 
 router = APIRouter(
     prefix="/api/export",
-    tags=["Export"]
+    tags=["Export"],
+    route_class=FastJSONRoute
 )
 
 @router.get("/search/pdf")
-async def export_search_to_pdf(
+def export_search_to_pdf(
     query: Optional[str] = Query(None, description="Vyhledávací dotaz"),
     location_id: Optional[int] = Query(None, description="ID lokace"),
     project: Optional[str] = Query(None, description="Projekt"),
@@ -32,61 +36,60 @@ async def export_search_to_pdf(
     status: Optional[str] = Query(None, description="Stav GB"),
     db: Session = Depends(get_database)
 ):
-    """Export výsledků vyhledávání do PDF"""
+    """
+    Export výsledků vyhledávání do PDF
+    
+    Běží ve worker vlákně (synchronní endpoint), PDF se skládá průběžně
+    z dávkově čteného dotazu a hotový soubor se streamuje klientovi.
+    Souběžné požadavky se stejnými filtry čekají na jedno generování.
+    """
     try:
-        # Získej data na základě filtrů
-        results = await _get_search_results(db, query, location_id, project, person, status)
-        
-        if not results:
-            raise HTTPException(status_code=404, detail="Žádná data k exportu")
-        
-        # Vygeneruj PDF
         export_service = ExportService()
-        pdf_path = export_service.create_search_pdf(results, {
-            'query': query,
-            'location_id': location_id, 
-            'project': project,
-            'person': person,
-            'status': status
-        })
-        
-        # Vygeneruj název souboru na základě filtrů
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename_parts = ["Sklad"]
-        
-        if query:
-            # Zkrať dlouhé query na prvních 15 znaků
-            clean_query = "".join(c for c in query if c.isalnum() or c in " -_")[:15]
-            filename_parts.append(clean_query.replace(" ", "_"))
         
-        if person:
-            clean_person = "".join(c for c in person if c.isalnum() or c in " -_")[:20]
-            filename_parts.append(clean_person.replace(" ", "_"))
+        def build_pdf() -> str:
+            gb_query = _build_search_query(db, query, location_id, project, person, status)
+            celkem = gb_query.count()
             
-        if project:
-            clean_project = "".join(c for c in project if c.isalnum() or c in " -_")[:15]
-            filename_parts.append(f"proj_{clean_project.replace(' ', '_')}")
+            if not celkem:
+                raise HTTPException(status_code=404, detail="Žádná data k exportu")
             
-        if location_id:
-            filename_parts.append(f"lok_{location_id}")
-            
-        if status and status != "aktivni":
-            filename_parts.append(status)
+            # Vygeneruj PDF
+            rows = export_service.search_rows(db, gb_query.with_entities(Gitterbox.id))
+            return export_service.create_search_pdf(rows, celkem, {
+                'query': query,
+                'location_id': location_id, 
+                'project': project,
+                'person': person,
+                'status': status
+            })
+        
+        # Souběžné stejné exporty sdílí jedno generování, každý dostane vlastní kopii souboru
+        # (razítko verze dat v klíči - export po vlastním zápisu nedostane starší PDF)
+        pdf_path = single_flight.do(
+            "export/search/pdf",
+            ("export/search/pdf", query, location_id, project, person, status, current_stamp(db)),
+            build_pdf,
+            share=export_service.share_file
+        )
         
-        filename = f"{'_'.join(filename_parts)}_{timestamp}.pdf"
+        filename = _build_export_filename(query, person, project, location_id, status, "pdf")
         
-        return FileResponse(
-            pdf_path,
+        return StreamingResponse(
+            export_service.iter_file(pdf_path),
             media_type="application/pdf",
-            filename=filename,
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
+            headers={
+                "Content-Disposition": _content_disposition(filename),
+                "Content-Length": str(os.path.getsize(pdf_path))
+            }
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Chyba při exportu do PDF: {str(e)}")
 
 @router.get("/search/excel") 
-async def export_search_to_excel(
+def export_search_to_excel(
     query: Optional[str] = Query(None, description="Vyhledávací dotaz"),
     location_id: Optional[int] = Query(None, description="ID lokace"),
     project: Optional[str] = Query(None, description="Projekt"),
@@ -94,17 +97,23 @@ async def export_search_to_excel(
     status: Optional[str] = Query(None, description="Stav GB"),
     db: Session = Depends(get_database)
 ):
-    """Export výsledků vyhledávání do Excel"""
+    """
+    Export výsledků vyhledávání do Excel
+    
+    Řádky se z DB čtou po dávkách do write-only workbooku a hotový soubor
+    se klientovi streamuje po blocích, paměť tak nezávisí na velikosti exportu.
+    """
     try:
-        # Získej data na základě filtrů
-        results = await _get_search_results(db, query, location_id, project, person, status)
+        gb_query = _build_search_query(db, query, location_id, project, person, status)
+        celkem = gb_query.count()
         
-        if not results:
+        if not celkem:
             raise HTTPException(status_code=404, detail="Žádná data k exportu")
         
         # Vygeneruj Excel
         export_service = ExportService()
-        excel_path = export_service.create_search_excel(results, {
+        rows = export_service.search_rows(db, gb_query.with_entities(Gitterbox.id))
+        excel_path = export_service.create_search_excel(rows, celkem, {
             'query': query,
             'location_id': location_id,
             'project': project, 
@@ -112,44 +121,59 @@ async def export_search_to_excel(
             'status': status
         })
         
-        # Vygeneruj název souboru na základě filtrů
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename_parts = ["Sklad"]
-        
-        if query:
-            # Zkrať dlouhé query na prvních 15 znaků
-            clean_query = "".join(c for c in query if c.isalnum() or c in " -_")[:15]
-            filename_parts.append(clean_query.replace(" ", "_"))
-        
-        if person:
-            clean_person = "".join(c for c in person if c.isalnum() or c in " -_")[:20]
-            filename_parts.append(clean_person.replace(" ", "_"))
-            
-        if project:
-            clean_project = "".join(c for c in project if c.isalnum() or c in " -_")[:15]
-            filename_parts.append(f"proj_{clean_project.replace(' ', '_')}")
-            
-        if location_id:
-            filename_parts.append(f"lok_{location_id}")
-            
-        if status and status != "aktivni":
-            filename_parts.append(status)
-        
-        filename = f"{'_'.join(filename_parts)}_{timestamp}.xlsx"
+        filename = _build_export_filename(query, person, project, location_id, status, "xlsx")
         
-        return FileResponse(
-            excel_path,
+        return StreamingResponse(
+            export_service.iter_file(excel_path),
             media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            filename=filename,
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
+            headers={
+                "Content-Disposition": _content_disposition(filename),
+                "Content-Length": str(os.path.getsize(excel_path))
+            }
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Chyba při exportu do Excel: {str(e)}")
 
-async def _get_search_results(db: Session, query: str = None, location_id: int = None, 
-                             project: str = None, person: str = None, status: str = None):
-    """Pomocná funkce pro získání vyhledávacích výsledků"""
+def _build_export_filename(query: Optional[str], person: Optional[str], project: Optional[str],
+                           location_id: Optional[int], status: Optional[str], extension: str) -> str:
+    """Vygeneruje název souboru exportu na základě filtrů"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename_parts = ["Sklad"]
+    
+    if query:
+        # Zkrať dlouhé query na prvních 15 znaků
+        clean_query = "".join(c for c in query if c.isalnum() or c in " -_")[:15]
+        filename_parts.append(clean_query.replace(" ", "_"))
+    
+    if person:
+        clean_person = "".join(c for c in person if c.isalnum() or c in " -_")[:20]
+        filename_parts.append(clean_person.replace(" ", "_"))
+        
+    if project:
+        clean_project = "".join(c for c in project if c.isalnum() or c in " -_")[:15]
+        filename_parts.append(f"proj_{clean_project.replace(' ', '_')}")
+        
+    if location_id:
+        filename_parts.append(f"lok_{location_id}")
+        
+    if status and status != "aktivni":
+        filename_parts.append(status)
+    
+    return f"{'_'.join(filename_parts)}_{timestamp}.{extension}"
+
+def _content_disposition(filename: str) -> str:
+    """Hlavička Content-Disposition i pro názvy s diakritikou (RFC 5987)"""
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+def _build_search_query(db: Session, query: str = None, location_id: int = None,
+                        project: str = None, person: str = None, status: str = None):
+    """Sestaví filtrovaný dotaz na GB (s JOINy na pozici, regál a lokaci)"""
     
     # Základní query
     gb_query = db.query(Gitterbox).filter(Gitterbox.stav == "aktivni")
@@ -167,55 +191,30 @@ async def _get_search_results(db: Session, query: str = None, location_id: int =
     if status:
         gb_query = gb_query.filter(Gitterbox.stav == status)
         
-    # Fulltext vyhledávání
+    # Fulltext vyhledávání přes FTS5 index (GB i jejich položky)
     if query:
-        # Rozdělej query na slova pro lepší vyhledávání
-        search_terms = query.split()
-        
-        for term in search_terms:
-            term_filter = or_(
-                # Vyhledávání v GB
-                Gitterbox.zodpovedna_osoba.ilike(f"%{term}%"),
-                func.cast(Gitterbox.cislo_gb, String).ilike(f"%{term}%"),
-                Gitterbox.poznamka.ilike(f"%{term}%"),
-                # Vyhledávání v pozici
-                Position.nazev_pozice.ilike(f"%{term}%"),
-                # Vyhledávání v regálu a lokaci
+        # Každé slovo musí odpovídat indexu nebo názvu regálu/lokace
+        for term in query.split():
+            term_filter = [
                 Shelf.nazev.ilike(f"%{term}%"),
                 Location.nazev.ilike(f"%{term}%")
-            )
-            gb_query = gb_query.filter(term_filter)
+            ]
+            fts_ids = SearchService.matching_gitterbox_ids(term)
+            if fts_ids is not None:
+                term_filter.append(Gitterbox.id.in_(fts_ids))
+            gb_query = gb_query.filter(or_(*term_filter))
     
-    # Filtr podle projektu - potřebujeme vyhledat v items
+    # Filtr podle projektu - hledání ve sloupci projekt fulltext indexu
     if project:
-        # Subquery pro GB s položkami daného projektu
-        gb_with_project = db.query(Item.gitterbox_id).filter(
-            Item.stav == "aktivni",
-            Item.projekt.ilike(f"%{project}%")
-        ).distinct().subquery()
-        
-        gb_query = gb_query.filter(Gitterbox.id.in_(
-            db.query(gb_with_project.c.gitterbox_id)
-        ))
-    
-    # Spusť query
-    gitterboxes = gb_query.order_by(Gitterbox.cislo_gb).all()
-    
-    # Sestavuj výsledky s položkami
-    results = []
-    for gb in gitterboxes:
-        items = db.query(Item).filter(
-            Item.gitterbox_id == gb.id,
-            Item.stav == "aktivni"
-        ).all()
-        
-        gb_data = {
-            'gitterbox': gb,
-            'items': items,
-            'location': gb.pozice.regal.lokace,
-            'shelf': gb.pozice.regal,
-            'position': gb.pozice
-        }
-        results.append(gb_data)
+        project_ids = SearchService.matching_gitterbox_ids(project, column="projekt")
+        if project_ids is None:
+            # Bez hledatelného slova (např. "-") podřetězec v položkách, filtr nesmí odpadnout
+            # (% a _ z dotazu se hledají doslova)
+            hledany = project.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            project_ids = db.query(Item.gitterbox_id).filter(
+                Item.stav == "aktivni",
+                Item.projekt.ilike(f"%{hledany}%", escape="\\")
+            )
+        gb_query = gb_query.filter(Gitterbox.id.in_(project_ids))
     
-    return results
+    return gb_query
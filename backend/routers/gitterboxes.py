@@ -10,24 +10,39 @@ Funkce:
 - Seznam všech GB s filtrováním
 """
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy import desc
-from typing import List, Optional, Dict, Any
+from typing import Optional
 from datetime import date
 
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database import get_database
-from models import Gitterbox, Position, Shelf, Location, Item
-from storage_config import get_total_positions
+from database import begin_immediate, get_database
+from models import Gitterbox, Position, Item
+from services.listing_service import GitterboxListingService
+from services.report_service import ReportService
+from services.cache_service import cached_response, track_data_changes
+from services.coalescing_service import coalesced
+from services.number_service import GbNumberAllocator, REZERVACE_PLATNOST_MINUT
+from services.position_service import FreePositionService
+from services.pagination_service import MAX_LIMIT, VYCHOZI_LIMIT, page_info
+from services.fieldset_service import parse_selection
+from services.response_service import FastJSONRoute
 
-router = APIRouter(prefix="/api/gitterboxes", tags=["gitterboxes"])
+router = APIRouter(
+    prefix="/api/gitterboxes",
+    tags=["gitterboxes"],
+    dependencies=[Depends(track_data_changes)],
+    route_class=FastJSONRoute
+)
 
 # Pydantic modely pro API
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 class GitterboxCreate(BaseModel):
     cislo_gb: int  # Uživatel si vybere číslo GB
@@ -35,6 +50,12 @@ class GitterboxCreate(BaseModel):
     position_id: int
     naplnenost_procenta: Optional[int] = 0
     poznamka: Optional[str] = None
+    rezervace: Optional[str] = None  # Token rezervace, pokud je číslo rezervované
+
+class NumberReservationRequest(BaseModel):
+    pocet: int = Field(1, ge=1, le=500)
+    souvisle: bool = False  # Čísla musí tvořit jeden souvislý blok
+    platnost_minut: int = Field(REZERVACE_PLATNOST_MINUT, ge=1, le=24 * 60)
 
 class GitterboxUpdate(BaseModel):
     zodpovedna_osoba: Optional[str] = None
@@ -42,6 +63,7 @@ class GitterboxUpdate(BaseModel):
     naplnenost_procenta: Optional[int] = None
     stav: Optional[str] = None
     poznamka: Optional[str] = None
+    verze: Optional[int] = None  # Verze, kterou klient upravuje (kontrola souběžné změny)
 
 class GitterboxResponse(BaseModel):
     id: int
@@ -62,86 +84,113 @@ class GitterboxResponse(BaseModel):
     # Statistiky
     pocet_polozek: int
     ma_kriticke_expirace: bool
+    
+    # Verze řádku pro optimistickou kontrolu úprav
+    verze: int
 
     class Config:
         from_attributes = True
 
-@router.get("/", response_model=Dict[str, Any])
+@router.get("/")
+@coalesced("gitterboxes/list")
 def get_all_gitterboxes(
     stav: Optional[str] = None,
     zodpovedna_osoba: Optional[str] = None,
+    limit: int = Query(VYCHOZI_LIMIT, ge=1, le=MAX_LIMIT, description="Počet GB na stránku"),
+    cursor: Optional[str] = Query(None, description="Kurzor další stránky (next_cursor z předchozí odpovědi)"),
+    vse: bool = Query(False, description="Všechny GB najednou bez stránkování (původní chování)"),
+    fields: Optional[str] = Query(None, description="Jen vybraná pole oddělená čárkou (id vždy), např. id,cislo_gb"),
     db: Session = Depends(get_database)
 ):
-    """Získá seznam všech Gitterboxů s možností filtrování"""
-    
-    query = db.query(Gitterbox).join(Position).join(Shelf).join(Location)
-    
-    if stav:
-        query = query.filter(Gitterbox.stav == stav)
-    if zodpovedna_osoba:
-        query = query.filter(Gitterbox.zodpovedna_osoba.ilike(f"%{zodpovedna_osoba}%"))
-    
-    gitterboxes = query.order_by(Gitterbox.cislo_gb).all()
-    
-    result = []
-    for gb in gitterboxes:
-        # Spočítáme položky a kontrolujeme expirace
-        items = db.query(Item).filter(Item.gitterbox_id == gb.id, Item.stav == "aktivni").all()
+    """Získá seznam Gitterboxů (stránkovaný kurzorem) s možností filtrování"""
+    try:
+        vyber = parse_selection(fields, None, GitterboxResponse.model_fields)
+        pole = vyber.fields
         
-        # Zkontrolujeme kritické expirace (méně než 30 dní)
-        from datetime import datetime, timedelta
-        kriticky_datum = datetime.now().date() + timedelta(days=30)
-        ma_kriticke = any(
-            item.sledovat_expiraci and 
-            item.expiracni_datum and 
-            item.expiracni_datum <= kriticky_datum 
-            for item in items
-        )
+        # Jeden agregovaný dotaz místo dotazu na položky pro každý GB
+        if vse:
+            rows = GitterboxListingService.list_gitterboxes(db, stav=stav, zodpovedna_osoba=zodpovedna_osoba, pole=pole)
+            next_cursor = None
+        else:
+            rows, next_cursor = GitterboxListingService.page_gitterboxes(
+                db, limit, cursor=cursor, stav=stav, zodpovedna_osoba=zodpovedna_osoba, pole=pole
+            )
+        # Řádky jsou přímo z vlastního SQL dotazu ve tvaru GitterboxResponse -
+        # validace po řádcích by jen zdržovala, kóduje je rovnou orjson
+        if pole is None:
+            result = rows
+        else:
+            # Číslo GB je v řádku kvůli řazení i když ho klient nechtěl
+            result = [{nazev: hodnota for nazev, hodnota in row.items() if nazev in pole} for row in rows]
         
-        result.append(GitterboxResponse(
-            id=gb.id,
-            cislo_gb=gb.cislo_gb,
-            zodpovedna_osoba=gb.zodpovedna_osoba,
-            datum_zalozeni=gb.datum_zalozeni,
-            naplnenost_procenta=gb.naplnenost_procenta,
-            stav=gb.stav,
-            poznamka=gb.poznamka,
-            position_id=gb.position_id,
-            lokace=gb.pozice.regal.lokace.nazev,
-            regal=gb.pozice.regal.nazev,
-            radek=gb.pozice.radek,
-            sloupec=gb.pozice.sloupec,
-            pocet_polozek=len(items),
-            ma_kriticke_expirace=ma_kriticke
-        ))
-    
-    return {
-        "status": "success",
-        "data": result,
-        "message": f"Načteno {len(result)} Gitterboxů"
-    }
+        return {
+            "status": "success",
+            "data": result,
+            "strankovani": page_info(None if vse else limit, next_cursor),
+            "message": f"Načteno {len(result)} Gitterboxů"
+        }
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/available-numbers")
 def get_available_gb_numbers(db: Session = Depends(get_database)):
-    """Vrátí seznam volných čísel GB"""
+    """Vrátí volná čísla GB zakódovaná jako intervaly [od, do]"""
     
-    max_cislo = get_total_positions()
+    return GbNumberAllocator.summary(db)
+
+
+@router.get("/numbers/next")
+def get_next_gb_number(db: Session = Depends(get_database)):
+    """Vrátí nejnižší volné číslo GB (bez rezervace)"""
     
-    # Získáme všechna obsazená čísla
-    obsazena_cisla = set(
-        result[0] for result in 
-        db.query(Gitterbox.cislo_gb).filter(Gitterbox.stav == "aktivni").all()
-    )
+    cislo = GbNumberAllocator.next_free(db)
+    if cislo is None:
+        raise HTTPException(status_code=404, detail="Žádné volné číslo GB")
+    
+    return {
+        "status": "success",
+        "data": {"cislo_gb": cislo},
+        "message": f"Další volné číslo GB je #{cislo}"
+    }
+
+
+@router.post("/numbers/reserve")
+def reserve_gb_numbers(request: NumberReservationRequest, db: Session = Depends(get_database)):
+    """Rezervuje blok čísel GB pro hromadný příjem"""
+    try:
+        rezervace = GbNumberAllocator.reserve(
+            db, request.pocet, souvisle=request.souvisle, platnost_minut=request.platnost_minut
+        )
+        if rezervace is None:
+            raise HTTPException(status_code=409, detail=f"Není k dispozici {request.pocet} volných čísel GB")
+        
+        return {
+            "status": "success",
+            "data": rezervace,
+            "message": f"Rezervováno {request.pocet} čísel GB"
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Chyba při rezervaci čísel GB: {str(e)}")
+
+
+@router.delete("/numbers/reserve/{token}")
+def release_gb_numbers(token: str, db: Session = Depends(get_database)):
+    """Zruší rezervaci čísel GB"""
     
-    # Najdeme volná čísla
-    volna_cisla = [cislo for cislo in range(1, max_cislo + 1) if cislo not in obsazena_cisla]
+    uvolneno = GbNumberAllocator.release(db, token)
+    if not uvolneno:
+        raise HTTPException(status_code=404, detail="Rezervace nebyla nalezena")
+    db.commit()
     
     return {
-        "volna_cisla": volna_cisla,  # Všechna volná čísla, ne jen prvních 20
-        "celkem_volnych": len(volna_cisla),
-        "celkem_obsazenych": len(obsazena_cisla),
-        "max_cislo": max_cislo
+        "status": "success",
+        "data": {"uvolneno": uvolneno},
+        "message": f"Uvolněno {uvolneno} rezervovaných čísel GB"
     }
 
 
@@ -149,85 +198,84 @@ def get_available_gb_numbers(db: Session = Depends(get_database)):
 def get_gitterbox(gb_id: int, db: Session = Depends(get_database)):
     """Získá detail konkrétního Gitterboxu"""
     
-    gb = db.query(Gitterbox).filter(Gitterbox.id == gb_id).first()
-    if not gb:
+    row = GitterboxListingService.get_gitterbox(db, gb_id)
+    if not row:
         raise HTTPException(status_code=404, detail="Gitterbox nenalezen")
     
-    # Spočítáme položky a kontrolujeme expirace
-    items = db.query(Item).filter(Item.gitterbox_id == gb.id, Item.stav == "aktivni").all()
-    
-    # Zkontrolujeme kritické expirace (méně než 30 dní)
-    from datetime import datetime, timedelta
-    kriticky_datum = datetime.now().date() + timedelta(days=30)
-    ma_kriticke = any(
-        item.sledovat_expiraci and 
-        item.expiracni_datum and 
-        item.expiracni_datum <= kriticky_datum 
-        for item in items
-    )
-    
-    return GitterboxResponse(
-        id=gb.id,
-        cislo_gb=gb.cislo_gb,
-        zodpovedna_osoba=gb.zodpovedna_osoba,
-        datum_zalozeni=gb.datum_zalozeni,
-        naplnenost_procenta=gb.naplnenost_procenta,
-        stav=gb.stav,
-        poznamka=gb.poznamka,
-        position_id=gb.position_id,
-        lokace=gb.pozice.regal.lokace.nazev,
-        regal=gb.pozice.regal.nazev,
-        radek=gb.pozice.radek,
-        sloupec=gb.pozice.sloupec,
-        pocet_polozek=len(items),
-        ma_kriticke_expirace=ma_kriticke
-    )
+    return GitterboxResponse(**row)
 
 @router.get("/by-number/{cislo_gb}", response_model=GitterboxResponse)
 def get_gitterbox_by_number(cislo_gb: int, db: Session = Depends(get_database)):
     """Získá Gitterbox podle globálního čísla GB"""
     
-    gb = db.query(Gitterbox).filter(Gitterbox.cislo_gb == cislo_gb).first()
+    # Číslo je unikátní jen mezi aktivními GB, aktivní má přednost před starými
+    gb = db.query(Gitterbox).filter(Gitterbox.cislo_gb == cislo_gb).order_by(
+        Gitterbox.stav != "aktivni", desc(Gitterbox.id)
+    ).first()
     if not gb:
         raise HTTPException(status_code=404, detail=f"Gitterbox s číslem {cislo_gb} nenalezen")
     
     return get_gitterbox(gb.id, db)
 
-@router.post("/", response_model=GitterboxResponse)
-def create_gitterbox(gitterbox_data: GitterboxCreate, db: Session = Depends(get_database)):
-    """Vytvoří nový Gitterbox na zadané pozici s automatickým přidělením čísla"""
+def _commit_or_conflict(db: Session, detail: str) -> None:
+    """
+    Potvrdí transakci, souběžný konflikt vrátí jako 409
     
-    # 1. Ověříme že pozice existuje a je volná
-    pozice = db.query(Position).filter(Position.id == gitterbox_data.position_id).first()
+    IntegrityError hlásí unikátní indexy aktivních GB (číslo, pozice),
+    StaleDataError změnu řádku jiným požadavkem od jeho načtení.
+    """
+    try:
+        db.commit()
+    except (IntegrityError, StaleDataError):
+        db.rollback()
+        raise HTTPException(status_code=409, detail=detail)
+
+def _position_conflict(db: Session, position_id: int, not_found_status: int, not_found_detail: str) -> HTTPException:
+    """Chyba pro pozici, kterou se nepodařilo obsadit (neexistuje nebo je obsazená)"""
+    pozice = db.query(Position).filter(Position.id == position_id).first()
     if not pozice:
-        raise HTTPException(status_code=404, detail="Pozice nebyla nalezena")
+        return HTTPException(status_code=not_found_status, detail=not_found_detail)
     
-    if pozice.status != "volna":
-        raise HTTPException(status_code=400, detail="Pozice není volná")
-    
-    # Zkontrolujeme zda na pozici už není GB
-    existing_gb = db.query(Gitterbox).filter(
-        Gitterbox.position_id == gitterbox_data.position_id,
+    existujici_gb = db.query(Gitterbox.cislo_gb).filter(
+        Gitterbox.position_id == position_id,
         Gitterbox.stav == "aktivni"
     ).first()
-    if existing_gb:
-        raise HTTPException(status_code=400, detail=f"Na pozici už je GB #{existing_gb.cislo_gb}")
+    if existujici_gb:
+        return HTTPException(status_code=400, detail=f"Pozice je již obsazena Gitterboxem #{existujici_gb.cislo_gb}")
+    return HTTPException(status_code=400, detail="Pozice není volná")
+
+@router.post("/", response_model=GitterboxResponse)
+def create_gitterbox(gitterbox_data: GitterboxCreate, db: Session = Depends(get_database)):
+    """Vytvoří nový Gitterbox na zadané pozici s automatickým přidělením čísla"""
     
-    # 2. Zkontrolujeme dostupnost čísla GB
+    # 1. Kontroly čísla GB (bez zápisu)
     if gitterbox_data.cislo_gb < 1:
         raise HTTPException(status_code=422, detail="Číslo GB musí být alespoň 1")
     
-    max_cislo = get_total_positions()  # Maximum podle konfigurace
+    # Zápisový zámek hned na začátku - kontroly a zápis vidí stejná data
+    # i při souběžných požadavcích z více workerů
+    begin_immediate(db)
+    
+    max_cislo = GbNumberAllocator.max_number(db)  # Čísla GB jdou 1..počet pozic
     if gitterbox_data.cislo_gb > max_cislo:
         raise HTTPException(status_code=422, detail=f"Číslo GB nesmí být větší než {max_cislo}")
     
+    # Číslo rezervované pro jiný příjem nelze použít bez tokenu rezervace
+    chyba_rezervace = GbNumberAllocator.check_reservation(db, gitterbox_data.cislo_gb, gitterbox_data.rezervace)
+    if chyba_rezervace:
+        raise HTTPException(status_code=409, detail=chyba_rezervace)
+    
     # Zkontrolujeme zda číslo GB už není použité
-    existing_gb_by_number = db.query(Gitterbox).filter(
+    existing_gb_by_number = db.query(Gitterbox.id).filter(
         Gitterbox.cislo_gb == gitterbox_data.cislo_gb,
         Gitterbox.stav == "aktivni"
     ).first()
     if existing_gb_by_number:
         raise HTTPException(status_code=400, detail=f"Číslo GB #{gitterbox_data.cislo_gb} už je obsazené")
+    
+    # 2. Obsadíme pozici - jen pokud je volná (podmíněný UPDATE)
+    if not FreePositionService.claim(db, gitterbox_data.position_id):
+        raise _position_conflict(db, gitterbox_data.position_id, 404, "Pozice nebyla nalezena")
 
     # 3. Vytvoříme nový Gitterbox
     new_gb = Gitterbox(
@@ -240,26 +288,32 @@ def create_gitterbox(gitterbox_data: GitterboxCreate, db: Session = Depends(get_
         stav="aktivni"
     )
     
-    # 4. Označíme pozici jako obsazenou
-    pozice.status = "obsazena"
+    # 4. Číslo odebereme z rezervací
+    GbNumberAllocator.consume(db, gitterbox_data.cislo_gb)
     
-    # 5. Uložíme do databáze
+    # 5. Uložíme do databáze (unikátní indexy aktivních GB jsou poslední pojistka)
     db.add(new_gb)
-    db.commit()
-    db.refresh(new_gb)
+    _commit_or_conflict(db, f"Číslo GB #{gitterbox_data.cislo_gb} nebo pozice už jsou obsazené")
     
-    print(f"✅ Vytvořen nový Gitterbox #{gitterbox_data.cislo_gb} na pozici {pozice.radek}-{pozice.sloupec} pro {gitterbox_data.zodpovedna_osoba}")
+    result = get_gitterbox(new_gb.id, db)
+    print(f"✅ Vytvořen nový Gitterbox #{gitterbox_data.cislo_gb} na pozici {result.radek}-{result.sloupec} pro {gitterbox_data.zodpovedna_osoba}")
     
-    return get_gitterbox(new_gb.id, db)
+    return result
 
 @router.put("/{gb_id}", response_model=GitterboxResponse)
 def update_gitterbox(gb_id: int, update_data: GitterboxUpdate, db: Session = Depends(get_database)):
     """Aktualizuje existující Gitterbox"""
     
+    begin_immediate(db)
+    
     gb = db.query(Gitterbox).filter(Gitterbox.id == gb_id).first()
     if not gb:
         raise HTTPException(status_code=404, detail="Gitterbox nenalezen")
     
+    # Klient upravuje starší verzi GB - jeho změny by přepsaly cizí
+    if update_data.verze is not None and update_data.verze != gb.verze:
+        raise HTTPException(status_code=409, detail=f"Gitterbox #{gb.cislo_gb} byl mezitím změněn, načtěte ho znovu")
+    
     # Aktualizujeme pouze poskytnutá pole
     if update_data.zodpovedna_osoba is not None:
         gb.zodpovedna_osoba = update_data.zodpovedna_osoba
@@ -272,53 +326,33 @@ def update_gitterbox(gb_id: int, update_data: GitterboxUpdate, db: Session = Dep
     
     # Přemístění GB na novou pozici
     if update_data.position_id is not None and update_data.position_id != gb.position_id:
-        # Ověř, že nová pozice existuje a je volná
-        nova_pozice = db.query(Position).filter(Position.id == update_data.position_id).first()
-        if not nova_pozice:
-            raise HTTPException(status_code=400, detail="Nová pozice neexistuje")
-        
-        # Zkontroluj, že nová pozice je volná
-        existujici_gb = db.query(Gitterbox).filter(
-            Gitterbox.position_id == update_data.position_id,
-            Gitterbox.stav == "aktivni"
-        ).first()
-        if existujici_gb:
-            raise HTTPException(status_code=400, detail=f"Pozice je již obsazena Gitterboxem #{existujici_gb.cislo_gb}")
-        
-        # Uvolni současnou pozici
-        stara_pozice = db.query(Position).filter(Position.id == gb.position_id).first()
-        if stara_pozice:
-            stara_pozice.status = "volna"
-        
-        # Obsaď novou pozici
-        nova_pozice.status = "obsazena"
+        # Obsaď novou pozici, jen pokud je volná (podmíněný UPDATE),
+        # původní pozici uvolní trigger po změně position_id
+        if not FreePositionService.claim(db, update_data.position_id):
+            raise _position_conflict(db, update_data.position_id, 400, "Nová pozice neexistuje")
         gb.position_id = update_data.position_id
     
-    db.commit()
-    db.refresh(gb)
+    _commit_or_conflict(db, f"Gitterbox #{gb.cislo_gb} nelze uložit - číslo nebo pozice jsou obsazené, nebo byl GB mezitím změněn")
     
-    return get_gitterbox(gb.id, db)
+    return get_gitterbox(gb_id, db)
 
 @router.delete("/{gb_id}")
 def delete_gitterbox(gb_id: int, db: Session = Depends(get_database)):
     """Označí Gitterbox jako neaktivní a uvolní pozici"""
     
+    begin_immediate(db)
+    
     gb = db.query(Gitterbox).filter(Gitterbox.id == gb_id).first()
     if not gb:
         raise HTTPException(status_code=404, detail="Gitterbox nenalezen")
     
-    # Označíme GB jako neaktivní místo mazání
+    # Označíme GB jako neaktivní místo mazání (pozici uvolní trigger)
     gb.stav = "neaktivni"
     
-    # Uvolníme pozici
-    pozice = db.query(Position).filter(Position.id == gb.position_id).first()
-    if pozice:
-        pozice.status = "volna"
-    
     # Označíme všechny položky jako neaktivní
     db.query(Item).filter(Item.gitterbox_id == gb.id).update({"stav": "neaktivni"})
     
-    db.commit()
+    _commit_or_conflict(db, f"Gitterbox #{gb.cislo_gb} byl mezitím změněn")
     
     print(f"✅ Gitterbox #{gb.cislo_gb} označen jako neaktivní a pozice uvolněna")
     
@@ -328,149 +362,79 @@ def delete_gitterbox(gb_id: int, db: Session = Depends(get_database)):
 def get_free_positions_count(db: Session = Depends(get_database)):
     """Vrátí počet volných pozic ve skladu"""
     
-    volne_pozice = db.query(Position).filter(Position.status == "volna").count()
-    max_pozice = get_total_positions()
+    pozice = ReportService.get_position_counts(db)
     
     return {
-        "volne_pozice": volne_pozice,
-        "celkem_pozic": max_pozice,
-        "obsazene_pozice": max_pozice - volne_pozice,
-        "obsazenost_procenta": round((max_pozice - volne_pozice) / max_pozice * 100, 1)
+        "volne_pozice": pozice["volne"],
+        "celkem_pozic": pozice["celkem"],
+        "obsazene_pozice": pozice["obsazene"],
+        "obsazenost_procenta": _procento(pozice["obsazene"], pozice["celkem"])
     }
 
+def _procento(cast: int, celek: int) -> float:
+    """Procentní podíl zaokrouhlený na 1 desetinné místo (0 pro prázdný celek)"""
+    return round(cast / celek * 100, 1) if celek > 0 else 0
+
 @router.get("/reports/capacity")
+@cached_response("reports/capacity")
 def get_capacity_report(db: Session = Depends(get_database)):
     """Komplexní report naplněnosti skladu a GB"""
     try:
-        # Základní statistiky pozic
-        volne_pozice = db.query(Position).filter(Position.status == "volna").count()
-        max_pozice = get_total_positions()
-        obsazene_pozice = max_pozice - volne_pozice
-        
-        # Statistiky GB
-        aktivni_gb = db.query(Gitterbox).filter(Gitterbox.stav == "aktivni").all()
-        celkem_gb = len(aktivni_gb)
-        
-        # Analýza naplněnosti GB
-        plne_naplnene = len([gb for gb in aktivni_gb if gb.naplnenost_procenta >= 90])
-        dobre_naplnene = len([gb for gb in aktivni_gb if 70 <= gb.naplnenost_procenta < 90])
-        nedostatecne_naplnene = len([gb for gb in aktivni_gb if gb.naplnenost_procenta < 70])
+        summary = ReportService.get_summary(db)
+        pozice = summary["pozice"]
+        gitterboxy = summary["gitterboxy"]
+        polozky = summary["polozky"]
         
-        # Průměrná naplněnost
-        prumerna_naplnenost = sum(gb.naplnenost_procenta for gb in aktivni_gb) / celkem_gb if celkem_gb > 0 else 0
-        
-        # GB s kritickými expiraci
-        gb_s_kritickymi_expiracemi = len([gb for gb in aktivni_gb if gb.ma_kriticke_expirace])
-        
-        # Statistiky položek
-        celkem_polozek = db.query(Item).filter(Item.stav == "aktivni").count()
-        
-        from datetime import datetime, timedelta
-        today = datetime.now().date()
-        expirované_položky = db.query(Item).filter(
-            Item.stav == "aktivni",
-            Item.sledovat_expiraci == True,
-            Item.expiracni_datum < today
-        ).count()
-        
-        kriticky_datum = today + timedelta(days=30)
-        blizko_expirace = db.query(Item).filter(
-            Item.stav == "aktivni",
-            Item.sledovat_expiraci == True,
-            Item.expiracni_datum >= today,
-            Item.expiracni_datum <= kriticky_datum
-        ).count()
-        
-        # Top 5 nejméně naplněných GB
-        nejmen_naplnene = sorted(aktivni_gb, key=lambda x: x.naplnenost_procenta)[:5]
-        top_nejmen_naplnene = []
-        for gb in nejmen_naplnene:
-            top_nejmen_naplnene.append({
-                "cislo_gb": gb.cislo_gb,
-                "naplnenost_procenta": gb.naplnenost_procenta,
-                "pocet_polozek": gb.pocet_polozek,
-                "zodpovedna_osoba": gb.zodpovedna_osoba,
-                "lokace": gb.pozice.regal.lokace.nazev,
-                "regal": gb.pozice.regal.nazev,
-                "pozice": f"{gb.pozice.radek}-{gb.pozice.sloupec}"
-            })
+        problematicke = polozky["expirovane"] + polozky["blizko_expirace"]
         
         return {
             "status": "success",
             "data": {
                 "pozice": {
-                    "celkem": max_pozice,
-                    "obsazene": obsazene_pozice,
-                    "volne": volne_pozice,
-                    "obsazenost_procenta": round(obsazene_pozice / max_pozice * 100, 1)
+                    **pozice,
+                    "obsazenost_procenta": _procento(pozice["obsazene"], pozice["celkem"])
                 },
                 "gitterboxy": {
-                    "celkem_aktivnich": celkem_gb,
-                    "prumerna_naplnenost": round(prumerna_naplnenost, 1),
-                    "plne_naplnene": plne_naplnene,  # >= 90%
-                    "dobre_naplnene": dobre_naplnene,  # 70-89%
-                    "nedostatecne_naplnene": nedostatecne_naplnene,  # < 70%
-                    "s_kritickymi_expiracemi": gb_s_kritickymi_expiracemi
+                    **gitterboxy,
+                    "prumerna_naplnenost": round(gitterboxy["prumerna_naplnenost"], 1)
                 },
                 "polozky": {
-                    "celkem_aktivnich": celkem_polozek,
-                    "expirovane": expirované_položky,
-                    "blizko_expirace": blizko_expirace,  # do 30 dní
-                    "procento_problematickych": round((expirované_položky + blizko_expirace) / celkem_polozek * 100, 1) if celkem_polozek > 0 else 0
+                    **polozky,
+                    "procento_problematickych": _procento(problematicke, polozky["celkem_aktivnich"])
                 },
                 "doporuceni": {
-                    "top_nejmen_naplnene_gb": top_nejmen_naplnene,
-                    "akce_potrebne": gb_s_kritickymi_expiracemi > 0 or expirované_položky > 0,
-                    "priorita_expiraci": expirované_položky + blizko_expirace,
-                    "optimalizace_kapacity": nedostatecne_naplnene
+                    "top_nejmen_naplnene_gb": ReportService.get_least_filled(db, limit=5),
+                    "akce_potrebne": gitterboxy["s_kritickymi_expiracemi"] > 0 or polozky["expirovane"] > 0,
+                    "priorita_expiraci": problematicke,
+                    "optimalizace_kapacity": gitterboxy["nedostatecne_naplnene"]
                 }
             },
-            "message": f"Report pro {celkem_gb} aktivních GB a {celkem_polozek} položek"
+            "message": f"Report pro {gitterboxy['celkem_aktivnich']} aktivních GB a {polozky['celkem_aktivnich']} položek"
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Chyba při generování reportu: {str(e)}")
 
 @router.get("/reports/dashboard")
+@cached_response("reports/dashboard")
+@coalesced("reports/dashboard")
 def get_dashboard_stats(db: Session = Depends(get_database)):
     """Rychlé statistiky pro dashboard"""
     try:
-        from datetime import datetime, timedelta
+        summary = ReportService.get_summary(db)
+        pozice = summary["pozice"]
         
         # Základní čísla
-        aktivni_gb = db.query(Gitterbox).filter(Gitterbox.stav == "aktivni").count()
-        celkem_polozek = db.query(Item).filter(Item.stav == "aktivni").count()
+        aktivni_gb = summary["gitterboxy"]["celkem_aktivnich"]
+        celkem_polozek = summary["polozky"]["celkem_aktivnich"]
         
         # Kritické stavy
-        today = datetime.now().date()
-        kriticky_datum = today + timedelta(days=30)
-        
-        gb_s_kritickymi_expiracemi = db.query(Gitterbox).filter(
-            Gitterbox.stav == "aktivni"
-        ).all()
-        
-        kriticke_gb = len([gb for gb in gb_s_kritickymi_expiracemi if gb.ma_kriticke_expirace])
-        
-        nedostatecne_naplnene_gb = len([gb for gb in gb_s_kritickymi_expiracemi if gb.naplnenost_procenta < 70])
+        kriticke_gb = summary["gitterboxy"]["s_kritickymi_expiracemi"]
+        nedostatecne_naplnene_gb = summary["gitterboxy"]["nedostatecne_naplnene"]
         
         # Expirace
-        expirované_položky = db.query(Item).filter(
-            Item.stav == "aktivni",
-            Item.sledovat_expiraci == True,
-            Item.expiracni_datum < today
-        ).count()
-        
-        blizko_expirace = db.query(Item).filter(
-            Item.stav == "aktivni",
-            Item.sledovat_expiraci == True,
-            Item.expiracni_datum >= today,
-            Item.expiracni_datum <= kriticky_datum
-        ).count()
-        
-        # Kapacita skladu
-        volne_pozice = db.query(Position).filter(Position.status == "volna").count()
-        max_pozice = get_total_positions()
-        max_cislo_gb = get_total_positions()  # Maximální číslo GB
+        expirované_položky = summary["polozky"]["expirovane"]
+        blizko_expirace = summary["polozky"]["blizko_expirace"]
         
         # Health score
         def calculate_health_score():
@@ -498,9 +462,9 @@ def get_dashboard_stats(db: Session = Depends(get_database)):
                 "nedostatecne_naplnene_gb": nedostatecne_naplnene_gb,
                 "expirovane_polozky": expirované_položky,
                 "blizko_expirace": blizko_expirace,
-                "volne_pozice": volne_pozice,
-                "max_cislo_gb": max_cislo_gb,
-                "obsazenost_skladu_procenta": round((max_pozice - volne_pozice) / max_pozice * 100, 1),
+                "volne_pozice": pozice["volne"],
+                "max_cislo_gb": pozice["celkem"],  # Čísla GB jdou 1..počet pozic
+                "obsazenost_skladu_procenta": _procento(pozice["obsazene"], pozice["celkem"]),
                 "celkovy_health_score": calculate_health_score()
             },
             "message": "Dashboard statistiky načteny"
@@ -4,17 +4,92 @@ Autor: GitHub Copilot
 Datum: 27.7.2025
 """
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, case, func
 from pydantic import BaseModel
 from typing import Optional
 from datetime import date, datetime, timedelta
 
 from database import get_database
 from models import Item, Gitterbox
+from services.cache_service import track_data_changes
+from services.pagination_service import MAX_LIMIT, VYCHOZI_LIMIT, keyset_page, page_info
+from services.fieldset_service import FieldSpec, needed_columns, parse_selection, serialize
+from services.read_model_service import ITEM_READ_MODEL
+from services.response_service import FastJSONRoute, listing_response
 
-router = APIRouter(prefix="/api/items", tags=["items"])
+router = APIRouter(
+    prefix="/api/items",
+    tags=["items"],
+    dependencies=[Depends(track_data_changes)],
+    route_class=FastJSONRoute
+)
+
+# Výpisy expirací: nejdříve expirující první (ID pro stabilní pořadí)
+EXPIRACE_RAZENI = (Item.expiracni_datum, Item.id)
+
+# Pole výpisů položek a sloupce read modelu, které každé z nich potřebuje
+_EXPIRACE_SLOUPCE = ("sledovat_expiraci", "expiracni_datum")
+_POLOZKA_POLE = {
+    "id": FieldSpec(lambda item: item.id, ("id",)),
+    "nazev_dilu": FieldSpec(lambda item: item.nazev_dilu, ("nazev_dilu",)),
+    "tma_cislo": FieldSpec(lambda item: item.tma_cislo, ("tma_cislo",)),
+    "projekt": FieldSpec(lambda item: item.projekt, ("projekt",)),
+    "popis_mnozstvi": FieldSpec(lambda item: item.popis_mnozstvi, ("pocet_kusu", "jednotka")),
+    "expiracni_datum": FieldSpec(
+        lambda item: item.expiracni_datum.isoformat() if item.expiracni_datum else None, ("expiracni_datum",)
+    ),
+}
+POLOZKY_POLE = {
+    "id": _POLOZKA_POLE["id"],
+    "gitterbox_id": FieldSpec(lambda item: item.gitterbox_id, ("gitterbox_id",)),
+    "tma_cislo": _POLOZKA_POLE["tma_cislo"],
+    "projekt": _POLOZKA_POLE["projekt"],
+    "nazev_dilu": _POLOZKA_POLE["nazev_dilu"],
+    "popis_mnozstvi": _POLOZKA_POLE["popis_mnozstvi"],
+    "datum_zaskladneni": FieldSpec(lambda item: item.datum_zaskladneni.isoformat(), ("datum_zaskladneni",)),
+    "sledovat_expiraci": FieldSpec(lambda item: item.sledovat_expiraci, ("sledovat_expiraci",)),
+    "expiracni_datum": _POLOZKA_POLE["expiracni_datum"],
+    "je_blizko_expirace": FieldSpec(lambda item: item.je_blizko_expirace, _EXPIRACE_SLOUPCE),
+    "dny_do_expirace": FieldSpec(lambda item: item.dny_do_expirace, _EXPIRACE_SLOUPCE),
+    "stav": FieldSpec(lambda item: item.stav, ("stav",)),
+}
+EXPIROVANE_POLE = {
+    **_POLOZKA_POLE,
+    "dny_po_expiraci": FieldSpec(lambda item: (date.today() - item.expiracni_datum).days, ("expiracni_datum",)),
+}
+BLIZKO_EXPIRACE_POLE = {
+    **_POLOZKA_POLE,
+    "dny_do_expirace": FieldSpec(lambda item: item.dny_do_expirace, _EXPIRACE_SLOUPCE),
+    "priorita": FieldSpec(
+        lambda item: "kritická" if item.dny_do_expirace <= 7 else "vysoká" if item.dny_do_expirace <= 14 else "střední",
+        _EXPIRACE_SLOUPCE,
+    ),
+}
+
+# GB položky s pozicí, regálem a lokací - připojí se jen pro embed=gitterbox
+POLOZKY_VNORENE = {
+    "gitterbox": FieldSpec(
+        lambda item: {
+            "cislo_gb": item.cislo_gb,
+            "zodpovedna_osoba": item.zodpovedna_osoba,
+            "lokace": item.lokace,
+            "regal": item.regal,
+            "pozice": f"{item.radek}-{item.sloupec}"
+        },
+        ("cislo_gb", "zodpovedna_osoba", "lokace", "regal", "radek", "sloupec"),
+    ),
+}
+
+def _items_page(query, razeni, cursor: Optional[str], limit: int, vse: bool):
+    """Stránka položek (ItemRow, převáděné při iteraci) podle kurzoru, nebo všechny položky pro vse=true"""
+    if vse:
+        rows, next_cursor = ITEM_READ_MODEL.stream(query.order_by(*razeni)), None
+    else:
+        rows, next_cursor = keyset_page(query, razeni, cursor, limit,
+                                        key=lambda row: tuple(getattr(row, column.key) for column in razeni))
+    return ITEM_READ_MODEL.to_rows(rows), next_cursor
 
 # Pydantic modely pro request/response
 class ItemCreate(BaseModel):
@@ -40,7 +115,7 @@ class ItemUpdate(BaseModel):
     stav: Optional[str] = None
 
 @router.post("/")
-async def create_item(item_data: ItemCreate, db: Session = Depends(get_database)):
+def create_item(item_data: ItemCreate, db: Session = Depends(get_database)):
     """Vytvoření nové položky"""
     try:
         # Ověř že Gitterbox existuje
@@ -94,106 +169,103 @@ async def create_item(item_data: ItemCreate, db: Session = Depends(get_database)
         raise HTTPException(status_code=500, detail=f"Chyba při vytváření položky: {str(e)}")
 
 @router.get("/expired")
-async def get_expired_items(db: Session = Depends(get_database)):
-    """Získání všech expirovaných položek"""
+def get_expired_items(
+    limit: int = Query(VYCHOZI_LIMIT, ge=1, le=MAX_LIMIT, description="Počet položek na stránku"),
+    cursor: Optional[str] = Query(None, description="Kurzor další stránky (next_cursor z předchozí odpovědi)"),
+    vse: bool = Query(False, description="Všechny položky najednou bez stránkování (původní chování)"),
+    fields: Optional[str] = Query(None, description="Jen vybraná pole oddělená čárkou (id vždy), např. id,nazev_dilu"),
+    embed: Optional[str] = Query(None, description="Vnořené objekty: gitterbox (výchozí), prázdné = žádné"),
+    db: Session = Depends(get_database)
+):
+    """Získání expirovaných položek (nejdéle expirované první, stránkované kurzorem)"""
     try:
         today = date.today()
         
-        # Najdeme všechny položky které už expirovali
-        expired_items = db.query(Item).filter(
+        # Položky které už expirovaly (částečný index ix_items_aktivni_expirace)
+        podminky = (
             Item.stav == "aktivni",
             Item.sledovat_expiraci == True,
             Item.expiracni_datum < today
-        ).all()
-        
-        result = []
-        for item in expired_items:
-            # Informace o GB
-            gb_info = {
-                "cislo_gb": item.gitterbox.cislo_gb,
-                "zodpovedna_osoba": item.gitterbox.zodpovedna_osoba,
-                "lokace": item.gitterbox.pozice.regal.lokace.nazev,
-                "regal": item.gitterbox.pozice.regal.nazev,
-                "pozice": f"{item.gitterbox.pozice.radek}-{item.gitterbox.pozice.sloupec}"
-            }
-            
-            result.append({
-                "id": item.id,
-                "nazev_dilu": item.nazev_dilu,
-                "tma_cislo": item.tma_cislo,
-                "projekt": item.projekt,
-                "popis_mnozstvi": item.popis_mnozstvi,
-                "expiracni_datum": item.expiracni_datum.isoformat(),
-                "dny_po_expiraci": (today - item.expiracni_datum).days,
-                "gitterbox": gb_info
-            })
-        
-        return {
-            "status": "success",
-            "data": result,
-            "message": f"Nalezeno {len(result)} expirovaných položek",
-            "pocet_expirovaných": len(result)
-        }
+        )
+        vyber = parse_selection(fields, embed, EXPIROVANE_POLE, POLOZKY_VNORENE, default_embed=("gitterbox",))
+        query = ITEM_READ_MODEL.query(
+            db, needed_columns(vyber, EXPIROVANE_POLE, POLOZKY_VNORENE, always=("expiracni_datum",))
+        ).filter(*podminky)
+        expired_items, next_cursor = _items_page(query, EXPIRACE_RAZENI, cursor, limit, vse)
+        celkem = db.query(func.count(Item.id)).filter(*podminky).scalar()
+        
+        return listing_response(
+            (serialize(item, vyber, EXPIROVANE_POLE, POLOZKY_VNORENE) for item in expired_items),
+            lambda pocet: {
+                "strankovani": page_info(None if vse else limit, next_cursor),
+                "message": f"Nalezeno {celkem} expirovaných položek",
+                "pocet_expirovaných": celkem
+            },
+            stream=vse
+        )
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Chyba při načítání expirovaných položek: {str(e)}")
 
 @router.get("/expiring-soon")
-async def get_expiring_soon_items(days_ahead: int = 30, db: Session = Depends(get_database)):
-    """Získání položek blízko expirace (default 30 dní)"""
+def get_expiring_soon_items(
+    days_ahead: int = 30,
+    limit: int = Query(VYCHOZI_LIMIT, ge=1, le=MAX_LIMIT, description="Počet položek na stránku"),
+    cursor: Optional[str] = Query(None, description="Kurzor další stránky (next_cursor z předchozí odpovědi)"),
+    vse: bool = Query(False, description="Všechny položky najednou bez stránkování (původní chování)"),
+    fields: Optional[str] = Query(None, description="Jen vybraná pole oddělená čárkou (id vždy), např. id,nazev_dilu"),
+    embed: Optional[str] = Query(None, description="Vnořené objekty: gitterbox (výchozí), prázdné = žádné"),
+    db: Session = Depends(get_database)
+):
+    """Získání položek blízko expirace (default 30 dní), nejkritičtější první"""
     try:
         today = date.today()
         target_date = today + timedelta(days=days_ahead)
         
         # Najdeme položky které expirují v následujících X dnech
-        expiring_items = db.query(Item).filter(
+        podminky = (
             Item.stav == "aktivni",
             Item.sledovat_expiraci == True,
             Item.expiracni_datum >= today,  # Ještě neexpirované
             Item.expiracni_datum <= target_date  # Ale blízko expirace
-        ).all()
-        
-        result = []
-        for item in expiring_items:
-            # Informace o GB
-            gb_info = {
-                "cislo_gb": item.gitterbox.cislo_gb,
-                "zodpovedna_osoba": item.gitterbox.zodpovedna_osoba,
-                "lokace": item.gitterbox.pozice.regal.lokace.nazev,
-                "regal": item.gitterbox.pozice.regal.nazev,
-                "pozice": f"{item.gitterbox.pozice.radek}-{item.gitterbox.pozice.sloupec}"
-            }
-            
-            result.append({
-                "id": item.id,
-                "nazev_dilu": item.nazev_dilu,
-                "tma_cislo": item.tma_cislo,
-                "projekt": item.projekt,
-                "popis_mnozstvi": item.popis_mnozstvi,
-                "expiracni_datum": item.expiracni_datum.isoformat(),
-                "dny_do_expirace": item.dny_do_expirace,
-                "priorita": "kritická" if item.dny_do_expirace <= 7 else "vysoká" if item.dny_do_expirace <= 14 else "střední",
-                "gitterbox": gb_info
-            })
-        
-        # Seřadíme podle priority (nejkritičtější první)
-        result.sort(key=lambda x: x["dny_do_expirace"])
-        
-        return {
-            "status": "success",
-            "data": result,
-            "message": f"Nalezeno {len(result)} položek blízko expirace (do {days_ahead} dní)",
-            "pocet_blizko_expirace": len(result),
-            "kriticke": len([x for x in result if x["priorita"] == "kritická"]),
-            "vysoke": len([x for x in result if x["priorita"] == "vysoká"]),
-            "stredni": len([x for x in result if x["priorita"] == "střední"])
-        }
+        )
+        vyber = parse_selection(fields, embed, BLIZKO_EXPIRACE_POLE, POLOZKY_VNORENE, default_embed=("gitterbox",))
+        query = ITEM_READ_MODEL.query(
+            db, needed_columns(vyber, BLIZKO_EXPIRACE_POLE, POLOZKY_VNORENE, always=("expiracni_datum",))
+        ).filter(*podminky)
+        expiring_items, next_cursor = _items_page(query, EXPIRACE_RAZENI, cursor, limit, vse)
+        
+        # Souhrn priorit za celý výběr (ne jen za stránku) jedním agregačním dotazem
+        souhrn = db.query(
+            func.count(Item.id),
+            func.sum(case((Item.expiracni_datum <= today + timedelta(days=7), 1), else_=0)),
+            func.sum(case((and_(Item.expiracni_datum > today + timedelta(days=7),
+                                Item.expiracni_datum <= today + timedelta(days=14)), 1), else_=0)),
+        ).filter(*podminky).one()
+        celkem, kriticke, vysoke = souhrn[0], souhrn[1] or 0, souhrn[2] or 0
+        
+        return listing_response(
+            (serialize(item, vyber, BLIZKO_EXPIRACE_POLE, POLOZKY_VNORENE) for item in expiring_items),
+            lambda pocet: {
+                "strankovani": page_info(None if vse else limit, next_cursor),
+                "message": f"Nalezeno {celkem} položek blízko expirace (do {days_ahead} dní)",
+                "pocet_blizko_expirace": celkem,
+                "kriticke": kriticke,
+                "vysoke": vysoke,
+                "stredni": celkem - kriticke - vysoke
+            },
+            stream=vse
+        )
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Chyba při načítání položek blízko expirace: {str(e)}")
 
 @router.post("/batch-expire")
-async def batch_expire_items(item_ids: list[int], db: Session = Depends(get_database)):
+def batch_expire_items(item_ids: list[int], db: Session = Depends(get_database)):
     """Batch označení položek jako expirované"""
     try:
         if not item_ids:
@@ -233,7 +305,7 @@ async def batch_expire_items(item_ids: list[int], db: Session = Depends(get_data
         raise HTTPException(status_code=500, detail=f"Chyba při batch operaci: {str(e)}")
 
 @router.get("/{item_id}")
-async def get_item(item_id: int, db: Session = Depends(get_database)):
+def get_item(item_id: int, db: Session = Depends(get_database)):
     """Získání konkrétní položky"""
     try:
         item = db.query(Item).filter(Item.id == item_id).first()
@@ -268,7 +340,7 @@ async def get_item(item_id: int, db: Session = Depends(get_database)):
         raise HTTPException(status_code=500, detail=f"Chyba při načítání položky: {str(e)}")
 
 @router.put("/{item_id}")
-async def update_item(item_id: int, item_data: ItemUpdate, db: Session = Depends(get_database)):
+def update_item(item_id: int, item_data: ItemUpdate, db: Session = Depends(get_database)):
     """Aktualizace položky"""
     try:
         item = db.query(Item).filter(Item.id == item_id).first()
@@ -314,7 +386,7 @@ async def update_item(item_id: int, item_data: ItemUpdate, db: Session = Depends
         raise HTTPException(status_code=500, detail=f"Chyba při aktualizaci položky: {str(e)}")
 
 @router.delete("/{item_id}")
-async def delete_item(item_id: int, db: Session = Depends(get_database)):
+def delete_item(item_id: int, db: Session = Depends(get_database)):
     """Smazání položky (soft delete)"""
     try:
         item = db.query(Item).filter(Item.id == item_id).first()
@@ -342,14 +414,21 @@ async def delete_item(item_id: int, db: Session = Depends(get_database)):
         raise HTTPException(status_code=500, detail=f"Chyba při mazání položky: {str(e)}")
 
 @router.get("/")
-async def get_all_items(
+def get_all_items(
     gitterbox_id: Optional[int] = None, 
     status: str = "aktivni",
+    limit: int = Query(VYCHOZI_LIMIT, ge=1, le=MAX_LIMIT, description="Počet položek na stránku"),
+    cursor: Optional[str] = Query(None, description="Kurzor další stránky (next_cursor z předchozí odpovědi)"),
+    vse: bool = Query(False, description="Všechny položky najednou bez stránkování (původní chování)"),
+    fields: Optional[str] = Query(None, description="Jen vybraná pole oddělená čárkou (id vždy), např. id,nazev_dilu"),
+    embed: Optional[str] = Query(None, description="Vnořené objekty: gitterbox (výchozí žádné)"),
     db: Session = Depends(get_database)
 ):
-    """Získání všech položek s filtrováním"""
+    """Získání položek s filtrováním (stránkované kurzorem podle ID)"""
     try:
-        query = db.query(Item)
+        vyber = parse_selection(fields, embed, POLOZKY_POLE, POLOZKY_VNORENE)
+        # Nevyžádané sloupce a GB se nenačítají, vypočtená pole se nepočítají
+        query = ITEM_READ_MODEL.query(db, needed_columns(vyber, POLOZKY_POLE, POLOZKY_VNORENE))
         
         # Filter podle GB
         if gitterbox_id:
@@ -359,30 +438,19 @@ async def get_all_items(
         if status:
             query = query.filter(Item.stav == status)
         
-        items = query.all()
-        
-        result = []
-        for item in items:
-            result.append({
-                "id": item.id,
-                "gitterbox_id": item.gitterbox_id,
-                "tma_cislo": item.tma_cislo,
-                "projekt": item.projekt,
-                "nazev_dilu": item.nazev_dilu,
-                "popis_mnozstvi": item.popis_mnozstvi,
-                "datum_zaskladneni": item.datum_zaskladneni.isoformat(),
-                "sledovat_expiraci": item.sledovat_expiraci,
-                "expiracni_datum": item.expiracni_datum.isoformat() if item.expiracni_datum else None,
-                "je_blizko_expirace": item.je_blizko_expirace,
-                "dny_do_expirace": item.dny_do_expirace,
-                "stav": item.stav
-            })
+        items, next_cursor = _items_page(query, (Item.id,), cursor, limit, vse)
         
-        return {
-            "status": "success",
-            "data": result,
-            "message": f"Načteno {len(result)} položek"
-        }
+        # Celý výpis (vse=true) se streamuje po blocích přímo z dávkového dotazu
+        return listing_response(
+            (serialize(item, vyber, POLOZKY_POLE, POLOZKY_VNORENE) for item in items),
+            lambda pocet: {
+                "strankovani": page_info(None if vse else limit, next_cursor),
+                "message": f"Načteno {pocet} položek"
+            },
+            stream=vse
+        )
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Chyba při načítání položek: {str(e)}")
@@ -4,19 +4,26 @@ Autor: GitHub Copilot
 Datum: 27.7.2025
 """
 
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy.orm import Session, joinedload, selectinload
+from typing import Optional
 
 from database import get_database
 from models import Position, Shelf, Location
+from services.occupancy_service import OccupancyService, BARVY
+from services.position_service import FreePositionService
+from services.pagination_service import MAX_LIMIT, VYCHOZI_LIMIT, keyset_page, page_info
+from services.fieldset_service import FieldSpec, needed_columns, parse_selection, serialize
+from services.read_model_service import POSITION_READ_MODEL
+from services.response_service import FastJSONRoute, listing_response
 
-router = APIRouter(prefix="/api/positions", tags=["positions"])
+router = APIRouter(prefix="/api/positions", tags=["positions"], route_class=FastJSONRoute)
 
 @router.get("/shelves")
-async def get_shelves(db: Session = Depends(get_database)):
+def get_shelves(db: Session = Depends(get_database)):
     """Získání všech regálů pro dropdown formuláře"""
     try:
-        shelves = db.query(Shelf).all()
+        shelves = db.query(Shelf).options(joinedload(Shelf.lokace)).all()
         
         result = []
         for shelf in shelves:
@@ -41,96 +48,157 @@ async def get_shelves(db: Session = Depends(get_database)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Chyba při načítání regálů: {str(e)}")
 
+# Pole výpisu pozic a sloupce read modelu, které každé z nich potřebuje
+POZICE_POLE = {
+    "id": FieldSpec(lambda pos: pos.id, ("id",)),
+    "shelf_id": FieldSpec(lambda pos: pos.shelf_id, ("shelf_id",)),
+    "radek": FieldSpec(lambda pos: pos.radek, ("radek",)),
+    "sloupec": FieldSpec(lambda pos: pos.sloupec, ("sloupec",)),
+    "nazev_pozice": FieldSpec(lambda pos: pos.nazev_pozice, ("radek", "sloupec")),
+    "status": FieldSpec(lambda pos: pos.status, ("status",)),
+    "je_obsazena": FieldSpec(lambda pos: pos.gitterbox_cislo is not None, ("gitterbox_cislo",)),
+    "gitterbox_cislo": FieldSpec(lambda pos: pos.gitterbox_cislo, ("gitterbox_cislo",)),
+}
+POZICE_VNORENE = {
+    "shelf": FieldSpec(
+        lambda pos: {
+            "id": pos.shelf_id,
+            "nazev": pos.shelf_nazev,
+            "location": {
+                "id": pos.location_id,
+                "nazev": pos.location_nazev
+            }
+        },
+        ("shelf_id", "shelf_nazev", "location_id", "location_nazev"),
+    ),
+}
+
 @router.get("/")
-async def get_all_positions(db: Session = Depends(get_database)):
-    """Získání všech pozic se základními informacemi"""
+def get_all_positions(
+    limit: int = Query(VYCHOZI_LIMIT, ge=1, le=MAX_LIMIT, description="Počet pozic na stránku"),
+    cursor: Optional[str] = Query(None, description="Kurzor další stránky (next_cursor z předchozí odpovědi)"),
+    vse: bool = Query(False, description="Všechny pozice najednou bez stránkování (původní chování)"),
+    fields: Optional[str] = Query(None, description="Jen vybraná pole oddělená čárkou (id vždy), např. id,nazev_pozice"),
+    embed: Optional[str] = Query(None, description="Vnořené objekty: shelf (výchozí), prázdné = žádné"),
+    db: Session = Depends(get_database)
+):
+    """Získání pozic se základními informacemi (stránkované kurzorem podle ID)"""
     try:
-        positions = db.query(Position).all()
+        vyber = parse_selection(fields, embed, POZICE_POLE, POZICE_VNORENE, default_embed=("shelf",))
+        # Jeden sloupcový dotaz - regál, lokace a GB se připojí jen pro vyžádaná pole
+        query = POSITION_READ_MODEL.query(db, needed_columns(vyber, POZICE_POLE, POZICE_VNORENE))
         
-        result = []
-        for pos in positions:
-            result.append({
-                "id": pos.id,
-                "shelf_id": pos.shelf_id,
-                "radek": pos.radek,
-                "sloupec": pos.sloupec,
-                "nazev_pozice": pos.nazev_pozice,
-                "status": pos.status,
-                "shelf": {
-                    "id": pos.regal.id,
-                    "nazev": pos.regal.nazev,
-                    "location": {
-                        "id": pos.regal.lokace.id,
-                        "nazev": pos.regal.lokace.nazev
-                    }
-                } if pos.regal else None,
-                "je_obsazena": pos.gitterbox is not None,
-                "gitterbox_cislo": pos.gitterbox.cislo_gb if pos.gitterbox else None
-            })
+        if vse:
+            rows = POSITION_READ_MODEL.stream(query.order_by(Position.id))
+            next_cursor = None
+        else:
+            rows, next_cursor = keyset_page(
+                query, (Position.id,), cursor, limit, key=lambda row: (row.id,)
+            )
+        
+        # Celý výpis (vse=true) se streamuje po blocích přímo z dávkového dotazu
+        return listing_response(
+            (serialize(pos, vyber, POZICE_POLE, POZICE_VNORENE) for pos in POSITION_READ_MODEL.to_rows(rows)),
+            lambda pocet: {
+                "strankovani": page_info(None if vse else limit, next_cursor),
+                "message": f"Načteno {pocet} pozic"
+            },
+            stream=vse
+        )
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Chyba při načítání pozic: {str(e)}")
+
+@router.get("/available")
+def get_available_positions(
+    shelf_id: Optional[int] = Query(None, description="Jen volné pozice regálu"),
+    location_id: Optional[int] = Query(None, description="Jen volné pozice lokace"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Počet pozic na stránku (bez limitu všechny)"),
+    offset: int = Query(0, ge=0, description="Posun stránky"),
+    db: Session = Depends(get_database)
+):
+    """Získání dostupných (volných) pozic pro nový Gitterbox"""
+    try:
+        # Řazení podle regálu a pozice i stránkování dělá SQL přes index volných pozic
+        result = FreePositionService.list_free(db, shelf_id=shelf_id, location_id=location_id,
+                                               limit=limit, offset=offset)
+        celkem = FreePositionService.count_free(db, shelf_id=shelf_id, location_id=location_id)
         
         return {
             "status": "success",
             "data": result,
-            "message": f"Načteno {len(result)} pozic"
+            "celkem": celkem,
+            "message": f"Nalezeno {celkem} dostupných pozic"
         }
         
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Chyba při načítání pozic: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Chyba při načítání dostupných pozic: {str(e)}")
 
-@router.get("/available")
-async def get_available_positions(db: Session = Depends(get_database)):
-    """Získání všech dostupných (volných) pozic pro nový Gitterbox"""
+@router.get("/available/next")
+def get_next_available_position(
+    shelf_id: Optional[int] = Query(None, description="Jen v regálu"),
+    location_id: Optional[int] = Query(None, description="Jen v lokaci"),
+    db: Session = Depends(get_database)
+):
+    """První volná pozice (podle regálu, řádku a sloupce)"""
     try:
-        # Najdi pozice, které nemají přiřazený GB
-        positions = db.query(Position).filter(
-            Position.status == "volna"
-        ).all()
+        pozice = FreePositionService.next_free(db, shelf_id=shelf_id, location_id=location_id)
+        if not pozice:
+            raise HTTPException(status_code=404, detail="Žádná volná pozice")
         
-        # Filtruj jen ty, které skutečně nemají GB
-        available_positions = [pos for pos in positions if not pos.gitterbox]
-        
-        result = []
-        for pos in available_positions:
-            result.append({
-                "id": pos.id,
-                "shelf_id": pos.shelf_id,
-                "radek": pos.radek,
-                "sloupec": pos.sloupec,
-                "nazev_pozice": pos.nazev_pozice,
-                "shelf": {
-                    "id": pos.regal.id,
-                    "nazev": pos.regal.nazev,
-                    "radky": pos.regal.radky,
-                    "sloupce": pos.regal.sloupce,
-                    "location": {
-                        "id": pos.regal.lokace.id,
-                        "nazev": pos.regal.lokace.nazev
-                    }
-                } if pos.regal else None
-            })
+        return {
+            "status": "success",
+            "data": pozice,
+            "message": f"Volná pozice {pozice['shelf']['nazev']} {pozice['nazev_pozice']}"
+        }
         
-        # Seřaď podle lokace, regálu a pozice
-        result.sort(key=lambda x: (
-            x['shelf']['location']['nazev'] if x['shelf'] else '',
-            x['shelf']['nazev'] if x['shelf'] else '',
-            x['radek'],
-            x['sloupec']
-        ))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Chyba při hledání volné pozice: {str(e)}")
+
+@router.get("/occupancy")
+def get_occupancy(
+    shelf_id: Optional[int] = Query(None, description="ID regálu"),
+    location_id: Optional[int] = Query(None, description="ID lokace"),
+    db: Session = Depends(get_database)
+):
+    """
+    Kompaktní mřížky obsazenosti regálu, lokace nebo celého skladu
+    
+    Každý regál má pole `mrizka` s kódem barvy pro každou buňku po řádcích
+    (index do `barvy`, 0 = volná), pole `pozice_id` ve stejném pořadí
+    a řídký slovník `gitterboxy` jen pro obsazené buňky.
+    """
+    try:
+        regaly = OccupancyService.get_grids(db, shelf_id=shelf_id, location_id=location_id)
+        if shelf_id is not None and not regaly:
+            raise HTTPException(status_code=404, detail="Regál nebyl nalezen")
         
         return {
             "status": "success",
-            "data": result,
-            "message": f"Nalezeno {len(result)} dostupných pozic"
+            "data": {
+                "barvy": BARVY,
+                "regaly": regaly
+            },
+            "message": f"Načtena obsazenost {len(regaly)} regálů"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Chyba při načítání dostupných pozic: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Chyba při načítání obsazenosti: {str(e)}")
 
 @router.get("/{position_id}")
-async def get_position(position_id: int, db: Session = Depends(get_database)):
+def get_position(position_id: int, db: Session = Depends(get_database)):
     """Získání konkrétní pozice s detaily"""
     try:
-        position = db.query(Position).filter(Position.id == position_id).first()
+        position = db.query(Position).options(
+            joinedload(Position.regal).joinedload(Shelf.lokace),
+            selectinload(Position.gitterbox)
+        ).filter(Position.id == position_id).first()
         if not position:
             raise HTTPException(status_code=404, detail="Pozice nebyla nalezena")
         
@@ -182,7 +250,7 @@ async def get_position(position_id: int, db: Session = Depends(get_database)):
         raise HTTPException(status_code=500, detail=f"Chyba při načítání pozice: {str(e)}")
 
 @router.get("/shelves/{shelf_id}/positions")
-async def get_shelf_positions(shelf_id: int, db: Session = Depends(get_database)):
+def get_shelf_positions(shelf_id: int, db: Session = Depends(get_database)):
     """Získání všech pozic konkrétního regálu"""
     try:
         # Ověř že regál existuje
@@ -190,7 +258,10 @@ async def get_shelf_positions(shelf_id: int, db: Session = Depends(get_database)
         if not shelf:
             raise HTTPException(status_code=404, detail="Regál nebyl nalezen")
 
-        positions = db.query(Position).filter(Position.shelf_id == shelf_id).all()
+        # GB všech pozic regálu jedním dotazem (ne dotaz na každou pozici)
+        positions = db.query(Position).options(selectinload(Position.gitterbox)).filter(
+            Position.shelf_id == shelf_id
+        ).all()
         
         result = []
         for pos in positions:
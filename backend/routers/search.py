@@ -0,0 +1,56 @@
+"""
+Router pro fulltext vyhledávání
+Autor: GitHub Copilot
+Datum: 17.10.2026
+"""
+
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from database import get_database
+from services.search_service import SearchService
+from services.listing_service import GitterboxListingService
+from services.response_service import FastJSONRoute
+
+router = APIRouter(prefix="/api/search", tags=["search"], route_class=FastJSONRoute)
+
+
+@router.get("")
+def search(
+    q: Optional[str] = Query(None, description="Vyhledávací dotaz"),
+    limit: int = Query(50, ge=1, le=500, description="Počet výsledků na stránku"),
+    offset: int = Query(0, ge=0, description="Posun stránky"),
+    db: Session = Depends(get_database),
+):
+    """Fulltext vyhledávání v položkách a Gitterboxech seřazené podle relevance"""
+    try:
+        if not q or not q.strip():
+            raise HTTPException(
+                status_code=422, detail="Vyhledávací dotaz nesmí být prázdný"
+            )
+
+        result = SearchService.search(db, q, limit=limit, offset=offset)
+
+        # Doplň informace o GB jedním dotazem pro celou stránku
+        gitterboxy = GitterboxListingService.get_gitterboxes_by_ids(
+            db, [hit["gitterbox_id"] for hit in result["vysledky"]]
+        )
+        for hit in result["vysledky"]:
+            hit["gitterbox"] = gitterboxy.get(hit["gitterbox_id"])
+
+        return {
+            "status": "success",
+            "data": result["vysledky"],
+            "strankovani": {
+                "limit": limit,
+                "offset": offset,
+                "ma_dalsi": result["ma_dalsi"],
+            },
+            "message": f"Nalezeno {len(result['vysledky'])} výsledků pro '{q}'",
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Chyba při vyhledávání: {str(e)}")
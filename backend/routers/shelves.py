@@ -5,14 +5,22 @@ Datum: 27.7.2025
 """
 
 from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, noload
 from pydantic import BaseModel, validator
 from typing import Optional
 
 from database import get_database
 from models import Shelf, Position, Location
+from services.cache_service import track_data_changes
+from services.position_service import PositionGridService
+from services.response_service import FastJSONRoute
 
-router = APIRouter(prefix="/api/shelves", tags=["shelves"])
+router = APIRouter(
+    prefix="/api/shelves",
+    tags=["shelves"],
+    dependencies=[Depends(track_data_changes)],
+    route_class=FastJSONRoute
+)
 
 class ShelfUpdateRequest(BaseModel):
     nazev: Optional[str] = None
@@ -64,10 +72,10 @@ class ShelfCreateRequest(BaseModel):
         return v
 
 @router.get("/")
-async def get_all_shelves(db: Session = Depends(get_database)):
+def get_all_shelves(db: Session = Depends(get_database)):
     """Získání všech regálů s detaily"""
     try:
-        shelves = db.query(Shelf).all()
+        shelves = db.query(Shelf).options(joinedload(Shelf.lokace)).all()
         
         result = []
         for shelf in shelves:
@@ -106,10 +114,10 @@ async def get_all_shelves(db: Session = Depends(get_database)):
         raise HTTPException(status_code=500, detail=f"Chyba při načítání regálů: {str(e)}")
 
 @router.get("/{shelf_id}")
-async def get_shelf(shelf_id: int, db: Session = Depends(get_database)):
+def get_shelf(shelf_id: int, db: Session = Depends(get_database)):
     """Získání konkrétního regálu s detaily"""
     try:
-        shelf = db.query(Shelf).filter(Shelf.id == shelf_id).first()
+        shelf = db.query(Shelf).options(joinedload(Shelf.lokace)).filter(Shelf.id == shelf_id).first()
         if not shelf:
             raise HTTPException(status_code=404, detail="Regál nebyl nalezen")
         
@@ -151,46 +159,44 @@ async def get_shelf(shelf_id: int, db: Session = Depends(get_database)):
         raise HTTPException(status_code=500, detail=f"Chyba při načítání regálu: {str(e)}")
 
 @router.put("/{shelf_id}")
-async def update_shelf(shelf_id: int, request: ShelfUpdateRequest, db: Session = Depends(get_database)):
+def update_shelf(shelf_id: int, request: ShelfUpdateRequest, db: Session = Depends(get_database)):
     """Úprava regálu - změna názvu nebo velikosti"""
     try:
         shelf = db.query(Shelf).filter(Shelf.id == shelf_id).first()
         if not shelf:
             raise HTTPException(status_code=404, detail="Regál nebyl nalezen")
         
-        # Kontrola, jestli regál neobsahuje gitterboxy při změně velikosti
-        if (request.radky is not None or request.sloupce is not None):
-            occupied_positions = db.query(Position).filter(
-                Position.shelf_id == shelf.id,
-                Position.status == "obsazena"
-            ).count()
+        # Uložit původní hodnoty
+        old_radky = shelf.radky
+        old_sloupce = shelf.sloupce
+        new_radky = request.radky if request.radky is not None else old_radky
+        new_sloupce = request.sloupce if request.sloupce is not None else old_sloupce
+        resized = (new_radky, new_sloupce) != (old_radky, old_sloupce)
+        
+        # Zmenšení nesmí zrušit pozice, na kterých stojí gitterboxy
+        if resized:
+            occupied_positions = PositionGridService.count_occupied_outside(db, shelf.id, new_radky, new_sloupce)
             
             if occupied_positions > 0:
                 raise HTTPException(
                     status_code=400, 
-                    detail=f"Nelze měnit velikost regálu s {occupied_positions} obsazenými pozicemi. Nejprve přesuňte nebo archivujte všechny Gitterboxy."
+                    detail=f"Nelze zmenšit regál - {occupied_positions} obsazených pozic by zaniklo. Nejprve přesuňte nebo archivujte Gitterboxy z odebíraných řádků a sloupců."
                 )
         
-        # Uložit původní hodnoty
-        old_radky = shelf.radky
-        old_sloupce = shelf.sloupce
-        
         # Aktualizace hodnot
         if request.nazev is not None:
             shelf.nazev = request.nazev
         if request.typ is not None:
             shelf.typ = request.typ
-        if request.radky is not None:
-            shelf.radky = request.radky
-        if request.sloupce is not None:
-            shelf.sloupce = request.sloupce
-            
-        db.commit()
+        shelf.radky = new_radky
+        shelf.sloupce = new_sloupce
+        
+        # Pokud se změnila velikost, přidej/odeber jen rozdílové pozice
+        added = removed = 0
+        if resized:
+            added, removed = PositionGridService.resize(db, shelf, old_radky, old_sloupce)
         
-        # Pokud se změnila velikost, přegeneruj pozice
-        if (request.radky is not None and request.radky != old_radky) or \
-           (request.sloupce is not None and request.sloupce != old_sloupce):
-            await _regenerate_positions(shelf, db)
+        db.commit()
             
         return {
             "status": "success",
@@ -201,7 +207,9 @@ async def update_shelf(shelf_id: int, request: ShelfUpdateRequest, db: Session =
                 "radky": shelf.radky,
                 "sloupce": shelf.sloupce,
                 "typ": shelf.typ,
-                "positions_regenerated": request.radky is not None or request.sloupce is not None
+                "positions_regenerated": resized,
+                "positions_added": added,
+                "positions_removed": removed
             }
         }
         
@@ -212,7 +220,7 @@ async def update_shelf(shelf_id: int, request: ShelfUpdateRequest, db: Session =
         raise HTTPException(status_code=500, detail=f"Chyba při aktualizaci regálu: {str(e)}")
 
 @router.post("/")
-async def create_shelf(request: ShelfCreateRequest, db: Session = Depends(get_database)):
+def create_shelf(request: ShelfCreateRequest, db: Session = Depends(get_database)):
     """Vytvoření nového regálu"""
     try:
         # Kontrola existence lokace
@@ -230,11 +238,11 @@ async def create_shelf(request: ShelfCreateRequest, db: Session = Depends(get_da
         )
         
         db.add(shelf)
-        db.commit()
-        db.refresh(shelf)
+        db.flush()
         
         # Vygeneruj pozice pro nový regál
-        await _regenerate_positions(shelf, db)
+        PositionGridService.materialize(db, shelf.id, shelf.radky, shelf.sloupce)
+        db.commit()
         
         return {
             "status": "success",
@@ -256,10 +264,11 @@ async def create_shelf(request: ShelfCreateRequest, db: Session = Depends(get_da
         raise HTTPException(status_code=500, detail=f"Chyba při vytváření regálu: {str(e)}")
 
 @router.delete("/{shelf_id}")
-async def delete_shelf(shelf_id: int, db: Session = Depends(get_database)):
+def delete_shelf(shelf_id: int, db: Session = Depends(get_database)):
     """Smazání regálu (pouze pokud je prázdný)"""
     try:
-        shelf = db.query(Shelf).filter(Shelf.id == shelf_id).first()
+        # Pozice se mažou hromadně níže, ORM je při mazání regálu nemusí načítat
+        shelf = db.query(Shelf).options(noload(Shelf.pozice)).filter(Shelf.id == shelf_id).first()
         if not shelf:
             raise HTTPException(status_code=404, detail="Regál nebyl nalezen")
         
@@ -292,21 +301,3 @@ async def delete_shelf(shelf_id: int, db: Session = Depends(get_database)):
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Chyba při mazání regálu: {str(e)}")
-
-async def _regenerate_positions(shelf: Shelf, db: Session):
-    """Přegenerování pozic regálu po změně velikosti"""
-    # Smaž VŠECHNY stávající pozice regálu (volné i obsazené pozice už byly zkontrolovány dříve)
-    db.query(Position).filter(Position.shelf_id == shelf.id).delete()
-    
-    # Vygeneruj nové pozice podle nové velikosti
-    for radek in range(1, shelf.radky + 1):
-        for sloupec in range(1, shelf.sloupce + 1):
-            position = Position(
-                shelf_id=shelf.id,
-                radek=radek,
-                sloupec=sloupec,
-                status="volna"
-            )
-            db.add(position)
-    
-    db.commit()
@@ -4,217 +4,462 @@ Autor: GitHub Copilot
 Datum: 2.8.2025
 
 Funkcionalita:
-- Export položek/GB do Excel před smazáním z DB
+- Záznam položek/GB do archivní tabulky před smazáním z DB
 - Sledování Windows uživatelů
 - Důvody vyskladnění
-- Ukládání do docs/ složky
+- Export archivu do Excel na vyžádání (docs/ složka slouží jen pro import starého archivu)
 """
 
 import os
-import pandas as pd
-from datetime import datetime
+import tempfile
+from collections import Counter
+from datetime import datetime, date
 import getpass
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 
+from openpyxl import Workbook, load_workbook
+from openpyxl.utils import get_column_letter
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from models import ArchivePeriodStat, ArchiveRecord, ArchiveStat
+from services.metrics_service import track_job
+
+# Období souhrnného počítadla za celou historii (ostatní období jsou měsíce RRRR-MM)
+OBDOBI_CELKEM = "celkem"
+
+# Měsíční a celková počítadla odvozená z denních (migrace, přepočet)
+_REBUILD_PERIOD_STATS = [
+    "DELETE FROM archive_period_stats",
+    """
+    INSERT INTO archive_period_stats (obdobi, duvod, uzivatel, pocet)
+    SELECT strftime('%Y-%m', den), duvod, uzivatel, SUM(pocet) FROM archive_stats
+    GROUP BY strftime('%Y-%m', den), duvod, uzivatel
+    """,
+    f"""
+    INSERT INTO archive_period_stats (obdobi, duvod, uzivatel, pocet)
+    SELECT '{OBDOBI_CELKEM}', duvod, uzivatel, SUM(pocet) FROM archive_stats
+    GROUP BY duvod, uzivatel
+    """,
+]
+
 # Cesta k docs složce
 DOCS_DIR = Path(__file__).parent.parent / "docs"
 ARCHIVE_FILE = DOCS_DIR / "vyskladneno_archiv.xlsx"
 
+# Sloupce Excel exportu: (hlavička, atribut ArchiveRecord, šířka sloupce)
+ARCHIVE_COLUMNS = [
+    ('Datum', None, 12),
+    ('Čas', None, 10),
+    ('Windows_User', 'windows_user', 16),
+    ('Typ', 'typ', 14),
+    ('GB_Číslo', 'gb_cislo', 10),
+    ('Název_dílu', 'nazev_dilu', 40),
+    ('TMA_číslo', 'tma_cislo', 16),
+    ('Projekt', 'projekt', 20),
+    ('Množství', 'mnozstvi', 14),
+    ('Expirace', 'expirace', 12),
+    ('Důvod_vyskladnění', 'duvod', 24),
+    ('Poznámka', 'poznamka', 50),
+    ('Datum_zaskladnění', 'datum_zaskladneni', 18),
+    ('Zodpovědná_osoba', 'zodpovedna_osoba', 22),
+]
+
+# Počet řádků načítaných z DB najednou při exportu
+EXPORT_BATCH_SIZE = 1000
+
+
 class ArchiveService:
-    
+
     @staticmethod
     def get_windows_user() -> str:
         """Získá jméno Windows uživatele"""
         return os.environ.get('USERNAME') or getpass.getuser()
-    
+
     @staticmethod
     def get_timestamp() -> str:
         """Získá aktuální timestamp"""
         return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
+
     @staticmethod
-    def archive_item(item_data: Dict[str, Any], reason: str, gb_info: Optional[Dict] = None) -> bool:
+    @track_job("archive_item")
+    def archive_item(db: Session, item_data: Dict[str, Any], reason: str, gb_info: Optional[Dict] = None) -> bool:
         """
-        Archivuje jednotlivou položku do Excel souboru
-        
+        Archivuje jednotlivou položku do archivní tabulky
+
+        Záznam se přidá do session volajícího, takže se potvrdí ve stejné
+        transakci jako smazání položky.
+
         Args:
+            db: Databázová session volajícího
             item_data: Data položky z databáze
             reason: Důvod vyskladnění (expirace, rozbito, chyba, jiné)
             gb_info: Informace o GB (volitelné)
-        
+
         Returns:
             bool: True při úspěchu
         """
         try:
-            # Připrav záznam pro Excel
             record = {
-                'Datum': datetime.now().strftime("%Y-%m-%d"),
-                'Čas': datetime.now().strftime("%H:%M:%S"),
-                'Windows_User': ArchiveService.get_windows_user(),
-                'Typ': 'Položka',
-                'GB_Číslo': gb_info.get('cislo_gb') if gb_info else item_data.get('gb_cislo', ''),
-                'Název_dílu': item_data.get('nazev_dilu', ''),
-                'TMA_číslo': item_data.get('tma_cislo', ''),
-                'Projekt': item_data.get('projekt', ''),
-                'Množství': item_data.get('popis_mnozstvi', ''),
-                'Expirace': item_data.get('expiracni_datum', ''),
-                'Důvod_vyskladnění': reason,
-                'Poznámka': item_data.get('poznamka', ''),
-                'Datum_zaskladnění': item_data.get('datum_zaskladneni', ''),
-                'Zodpovědná_osoba': gb_info.get('zodpovedna_osoba') if gb_info else ''
+                'vytvoreno': datetime.now(),
+                'windows_user': ArchiveService.get_windows_user(),
+                'typ': 'Položka',
+                'gb_cislo': gb_info.get('cislo_gb') if gb_info else item_data.get('gb_cislo') or None,
+                'nazev_dilu': item_data.get('nazev_dilu', ''),
+                'tma_cislo': item_data.get('tma_cislo', ''),
+                'projekt': item_data.get('projekt', ''),
+                'mnozstvi': item_data.get('popis_mnozstvi', ''),
+                'expirace': item_data.get('expiracni_datum', ''),
+                'duvod': reason,
+                'poznamka': item_data.get('poznamka', ''),
+                'datum_zaskladneni': item_data.get('datum_zaskladneni', ''),
+                'zodpovedna_osoba': gb_info.get('zodpovedna_osoba') if gb_info else ''
             }
-            
-            return ArchiveService._append_to_excel([record])
-            
+
+            return ArchiveService._append_records(db, [record])
+
         except Exception as e:
             print(f"Chyba při archivaci položky: {e}")
             return False
-    
+
     @staticmethod
-    def archive_gitterbox(gb_data: Dict[str, Any], items_data: List[Dict], reason: str) -> bool:
+    @track_job("archive_gitterbox")
+    def archive_gitterbox(db: Session, gb_data: Dict[str, Any], items_data: List[Dict], reason: str) -> bool:
         """
         Archivuje celý Gitterbox včetně všech položek
-        
+
         Args:
+            db: Databázová session volajícího
             gb_data: Data GB z databáze
             items_data: Seznam všech položek v GB
             reason: Důvod vyskladnění
-        
+
         Returns:
             bool: True při úspěchu
         """
         try:
             records = []
-            timestamp = ArchiveService.get_timestamp()
+            vytvoreno = datetime.now()
             user = ArchiveService.get_windows_user()
-            
+
             # Záznam pro celý GB
             gb_record = {
-                'Datum': datetime.now().strftime("%Y-%m-%d"),
-                'Čas': datetime.now().strftime("%H:%M:%S"),
-                'Windows_User': user,
-                'Typ': 'Celý_GB',
-                'GB_Číslo': gb_data.get('cislo_gb', ''),
-                'Název_dílu': f"KOMPLETNÍ GB #{gb_data.get('cislo_gb', '')}",
-                'TMA_číslo': '',
-                'Projekt': '',
-                'Množství': f"{len(items_data)} položek",
-                'Expirace': '',
-                'Důvod_vyskladnění': reason,
-                'Poznámka': gb_data.get('poznamka', ''),
-                'Datum_zaskladnění': gb_data.get('datum_zalozeni', ''),
-                'Zodpovědná_osoba': gb_data.get('zodpovedna_osoba', '')
+                'vytvoreno': vytvoreno,
+                'windows_user': user,
+                'typ': 'Celý_GB',
+                'gb_cislo': gb_data.get('cislo_gb'),
+                'nazev_dilu': f"KOMPLETNÍ GB #{gb_data.get('cislo_gb', '')}",
+                'tma_cislo': '',
+                'projekt': '',
+                'mnozstvi': f"{len(items_data)} položek",
+                'expirace': '',
+                'duvod': reason,
+                'poznamka': gb_data.get('poznamka', ''),
+                'datum_zaskladneni': gb_data.get('datum_zalozeni', ''),
+                'zodpovedna_osoba': gb_data.get('zodpovedna_osoba', '')
             }
             records.append(gb_record)
-            
+
             # Záznamy pro jednotlivé položky
             for item in items_data:
                 item_record = {
-                    'Datum': datetime.now().strftime("%Y-%m-%d"),
-                    'Čas': datetime.now().strftime("%H:%M:%S"),
-                    'Windows_User': user,
-                    'Typ': 'Položka_z_GB',
-                    'GB_Číslo': gb_data.get('cislo_gb', ''),
-                    'Název_dílu': item.get('nazev_dilu', ''),
-                    'TMA_číslo': item.get('tma_cislo', ''),
-                    'Projekt': item.get('projekt', ''),
-                    'Množství': item.get('popis_mnozstvi', ''),
-                    'Expirace': item.get('expiracni_datum', ''),
-                    'Důvod_vyskladnění': reason,
-                    'Poznámka': item.get('poznamka', ''),
-                    'Datum_zaskladnění': item.get('datum_zaskladneni', ''),
-                    'Zodpovědná_osoba': gb_data.get('zodpovedna_osoba', '')
+                    'vytvoreno': vytvoreno,
+                    'windows_user': user,
+                    'typ': 'Položka_z_GB',
+                    'gb_cislo': gb_data.get('cislo_gb'),
+                    'nazev_dilu': item.get('nazev_dilu', ''),
+                    'tma_cislo': item.get('tma_cislo', ''),
+                    'projekt': item.get('projekt', ''),
+                    'mnozstvi': item.get('popis_mnozstvi', ''),
+                    'expirace': item.get('expiracni_datum', ''),
+                    'duvod': reason,
+                    'poznamka': item.get('poznamka', ''),
+                    'datum_zaskladneni': item.get('datum_zaskladneni', ''),
+                    'zodpovedna_osoba': gb_data.get('zodpovedna_osoba', '')
                 }
                 records.append(item_record)
-            
-            return ArchiveService._append_to_excel(records)
-            
+
+            return ArchiveService._append_records(db, records)
+
         except Exception as e:
             print(f"Chyba při archivaci GB: {e}")
             return False
-    
+
     @staticmethod
-    def _append_to_excel(records: List[Dict[str, Any]]) -> bool:
+    def _append_records(db: Session, records: List[Dict[str, Any]]) -> bool:
         """
-        Přidá záznamy do Excel souboru
-        
+        Přidá záznamy do archivní tabulky
+
+        Jde o čistý INSERT (bez čtení existujícího archivu), cena nezávisí
+        na velikosti historie a souběžné zápisy více workerů serializuje SQLite.
+
         Args:
+            db: Databázová session volajícího (commit provádí volající)
             records: Seznam záznamů k přidání
-        
+
         Returns:
             bool: True při úspěchu
         """
+        db.execute(ArchiveRecord.__table__.insert(), records)
+        ArchiveService._increment_stats(db, records)
+        print(f"✅ Archivováno {len(records)} záznamů")
+        return True
+
+    @staticmethod
+    def _increment_stats(db: Session, records: List[Dict[str, Any]]) -> None:
+        """
+        Přičte záznamy k denním, měsíčním a celkovým počítadlům (období, důvod, uživatel)
+
+        Používá UPSERT, takže počítadla jsou aktualizována ve stejné
+        transakci jako samotný zápis do archivu.
+        """
+        counts = Counter(
+            (record['vytvoreno'].date(), record['duvod'], record.get('windows_user') or '')
+            for record in records
+        )
+        period_counts = Counter()
+        for (den, duvod, uzivatel), pocet in counts.items():
+            period_counts[(den.strftime("%Y-%m"), duvod, uzivatel)] += pocet
+            period_counts[(OBDOBI_CELKEM, duvod, uzivatel)] += pocet
+
+        table = ArchiveStat.__table__
+        for (den, duvod, uzivatel), pocet in counts.items():
+            stmt = sqlite_insert(table).values(den=den, duvod=duvod, uzivatel=uzivatel, pocet=pocet)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.den, table.c.duvod, table.c.uzivatel],
+                set_={'pocet': table.c.pocet + stmt.excluded.pocet}
+            )
+            db.execute(stmt)
+
+        period_table = ArchivePeriodStat.__table__
+        for (obdobi, duvod, uzivatel), pocet in period_counts.items():
+            stmt = sqlite_insert(period_table).values(obdobi=obdobi, duvod=duvod, uzivatel=uzivatel, pocet=pocet)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[period_table.c.obdobi, period_table.c.duvod, period_table.c.uzivatel],
+                set_={'pocet': period_table.c.pocet + stmt.excluded.pocet}
+            )
+            db.execute(stmt)
+
+    @staticmethod
+    def rebuild_period_stats(connection) -> None:
+        """Odvodí měsíční a celková počítadla z denních"""
+        for statement in _REBUILD_PERIOD_STATS:
+            connection.exec_driver_sql(statement)
+
+    @staticmethod
+    def rebuild_archive_stats(db: Session) -> None:
+        """
+        Přepočítá počítadla z archivní tabulky, pokud chybí
+
+        Volá se při startu - doplní počítadla pro záznamy, které vznikly
+        dříve, než počítadla existovala.
+        """
+        if db.query(ArchiveStat.id).first() or not db.query(ArchiveRecord.id).first():
+            return
+
+        den = func.date(ArchiveRecord.vytvoreno)
+        rows = db.query(
+            den, ArchiveRecord.duvod, func.coalesce(ArchiveRecord.windows_user, ''), func.count(ArchiveRecord.id)
+        ).group_by(den, ArchiveRecord.duvod, func.coalesce(ArchiveRecord.windows_user, '')).all()
+
+        db.query(ArchiveStat).delete()
+        db.execute(ArchiveStat.__table__.insert(), [
+            {'den': date.fromisoformat(row[0]), 'duvod': row[1], 'uzivatel': row[2], 'pocet': row[3]}
+            for row in rows
+        ])
+        ArchiveService.rebuild_period_stats(db.connection())
+        db.commit()
+        print(f"✅ Archivní statistiky přepočítány ({len(rows)} denních záznamů)")
+
+    @staticmethod
+    @track_job("archive_export_excel")
+    def export_to_excel(db: Session) -> Optional[str]:
+        """
+        Vygeneruje Excel s celým archivem (nejnovější záznamy nahoře)
+
+        Používá write-only workbook, záznamy se čtou po dávkách, takže
+        paměť nezávisí na velikosti archivu.
+
+        Returns:
+            str: Cesta k vygenerovanému souboru, None pokud je archiv prázdný
+        """
+        if not db.query(ArchiveRecord.id).first():
+            return None
+
+        export_dir = Path(tempfile.gettempdir()) / "storage_app_exports"
+        export_dir.mkdir(exist_ok=True)
+        excel_path = export_dir / f"vyskladneno_archiv_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.xlsx"
+
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet('Vyskladněno')
+
+        # Šířky sloupců musí být nastaveny před zápisem řádků
+        for index, (_, _, width) in enumerate(ARCHIVE_COLUMNS, 1):
+            ws.column_dimensions[get_column_letter(index)].width = width
+
+        ws.append([header for header, _, _ in ARCHIVE_COLUMNS])
+
+        records = (
+            db.query(ArchiveRecord)
+            .order_by(ArchiveRecord.vytvoreno.desc(), ArchiveRecord.id.desc())
+            .yield_per(EXPORT_BATCH_SIZE)
+        )
+        for record in records:
+            ws.append(ArchiveService._record_to_row(record))
+
+        wb.save(excel_path)
+        return str(excel_path)
+
+    @staticmethod
+    def _record_to_row(record: ArchiveRecord) -> List[Any]:
+        """Převede archivní záznam na řádek Excel exportu"""
+        row = [
+            record.vytvoreno.strftime("%Y-%m-%d"),
+            record.vytvoreno.strftime("%H:%M:%S"),
+        ]
+        for _, attribute, _ in ARCHIVE_COLUMNS[2:]:
+            value = getattr(record, attribute)
+            row.append(value if value is not None else '')
+        return row
+
+    @staticmethod
+    def import_legacy_excel(db: Session) -> int:
+        """
+        Jednorázově převede starý vyskladneno_archiv.xlsx do archivní tabulky
+
+        Soubor se před importem atomicky přejmenuje, takže při startu více
+        workerů ho naimportuje právě jeden z nich.
+
+        Returns:
+            int: Počet naimportovaných záznamů
+        """
+        if not ARCHIVE_FILE.exists():
+            return 0
+
+        importing_file = ARCHIVE_FILE.with_suffix('.importing.xlsx')
+        try:
+            os.replace(ARCHIVE_FILE, importing_file)
+        except FileNotFoundError:
+            # Soubor mezitím převzal jiný worker
+            return 0
+
         try:
-            # Ujisti se, že docs složka existuje
-            DOCS_DIR.mkdir(exist_ok=True)
-            
-            # Vytvoř DataFrame z nových záznamů
-            new_df = pd.DataFrame(records)
-            
-            # Pokud soubor existuje, načti ho a přidej nové záznamy
-            if ARCHIVE_FILE.exists():
-                existing_df = pd.read_excel(ARCHIVE_FILE)
-                combined_df = pd.concat([existing_df, new_df], ignore_index=True)
-            else:
-                combined_df = new_df
-            
-            # Seřaď podle data (nejnovější nahoře)
-            combined_df['Datum_Time'] = pd.to_datetime(combined_df['Datum'] + ' ' + combined_df['Čas'])
-            combined_df = combined_df.sort_values('Datum_Time', ascending=False)
-            combined_df = combined_df.drop('Datum_Time', axis=1)
-            
-            # Ulož do Excel
-            with pd.ExcelWriter(ARCHIVE_FILE, engine='openpyxl') as writer:
-                combined_df.to_excel(writer, sheet_name='Vyskladněno', index=False)
-                
-                # Formátování
-                worksheet = writer.sheets['Vyskladněno']
-                
-                # Automatické šířky sloupců
-                for column in worksheet.columns:
-                    max_length = 0
-                    column = [cell for cell in column]
-                    for cell in column:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    adjusted_width = min(max_length + 2, 50)
-                    worksheet.column_dimensions[column[0].column_letter].width = adjusted_width
-            
-            print(f"✅ Archivováno {len(records)} záznamů do {ARCHIVE_FILE}")
-            return True
-            
+            wb = load_workbook(importing_file, read_only=True)
+            rows = wb.active.iter_rows(values_only=True)
+            headers = list(next(rows, []))
+
+            records = []
+            for values in rows:
+                data = dict(zip(headers, values))
+                if not data.get('Datum'):
+                    continue
+                cas = data.get('Čas') or '00:00:00'
+                record = {'vytvoreno': datetime.strptime(f"{data['Datum']} {cas}", "%Y-%m-%d %H:%M:%S")}
+                for header, attribute, _ in ARCHIVE_COLUMNS[2:]:
+                    value = data.get(header)
+                    record[attribute] = str(value) if value is not None and attribute != 'gb_cislo' else value
+                records.append(record)
+            wb.close()
+
+            if records:
+                ArchiveService._append_records(db, records)
+            db.commit()
+
+            os.replace(importing_file, ARCHIVE_FILE.with_suffix('.imported.xlsx'))
+            print(f"✅ Starý archiv převeden do databáze ({len(records)} záznamů)")
+            return len(records)
+
         except Exception as e:
-            print(f"❌ Chyba při ukládání do Excel: {e}")
-            return False
-    
+            db.rollback()
+            # Vrať soubor zpět, aby se import zkusil při dalším startu
+            os.replace(importing_file, ARCHIVE_FILE)
+            print(f"❌ Chyba při importu starého archivu: {e}")
+            return 0
+
     @staticmethod
-    def get_archive_stats() -> Dict[str, Any]:
-        """Vrátí statistiky archivních dat"""
+    def get_archive_stats(db: Session, od: Optional[date] = None, do: Optional[date] = None) -> Dict[str, Any]:
+        """
+        Vrátí statistiky archivních dat z počítadel
+
+        Souhrn čte jen řádky dneška, tohoto měsíce a celkového období
+        (po jednom na důvod a uživatele), jeho cena nezávisí na délce historie.
+
+        Args:
+            db: Databázová session
+            od: Začátek období pro rozpis (včetně, volitelné)
+            do: Konec období pro rozpis (včetně, volitelné)
+
+        Returns:
+            Dict: Souhrn (celkem/dnes/tento měsíc) a při zadaném období
+                  rozpis podle dnů, důvodů a uživatelů
+        """
         try:
-            if not ARCHIVE_FILE.exists():
-                return {"celkem": 0, "dnes": 0, "tento_mesic": 0}
-            
-            df = pd.read_excel(ARCHIVE_FILE)
-            today = datetime.now().strftime("%Y-%m-%d")
-            this_month = datetime.now().strftime("%Y-%m")
-            
-            return {
-                "celkem": len(df),
-                "dnes": len(df[df['Datum'] == today]),
-                "tento_mesic": len(df[df['Datum'].str.startswith(this_month)]),
-                "posledni_archiv": df.iloc[0]['Datum'] + ' ' + df.iloc[0]['Čas'] if len(df) > 0 else None
+            today = date.today()
+            this_month = today.strftime("%Y-%m")
+
+            celkem, tento_mesic = db.query(
+                func.coalesce(func.sum(ArchivePeriodStat.pocet).filter(ArchivePeriodStat.obdobi == OBDOBI_CELKEM), 0),
+                func.coalesce(func.sum(ArchivePeriodStat.pocet).filter(ArchivePeriodStat.obdobi == this_month), 0)
+            ).filter(ArchivePeriodStat.obdobi.in_([OBDOBI_CELKEM, this_month])).one()
+            dnes = db.query(func.coalesce(func.sum(ArchiveStat.pocet), 0)).filter(ArchiveStat.den == today).scalar()
+
+            # Nejnovější čas archivace z indexu ix_archive_records_vytvoreno - podle id
+            # to nejde, import starého archivu ukládá záznamy od nejnovějšího
+            posledni = db.query(func.max(ArchiveRecord.vytvoreno)).scalar()
+
+            stats = {
+                "celkem": celkem,
+                "dnes": dnes,
+                "tento_mesic": tento_mesic,
+                "posledni_archiv": posledni.strftime("%Y-%m-%d %H:%M:%S") if posledni else None
             }
-            
+
+            if od or do:
+                stats["obdobi"] = ArchiveService._get_period_breakdown(db, od, do)
+
+            return stats
+
         except Exception as e:
             print(f"Chyba při načítání archivních statistik: {e}")
             return {"celkem": 0, "dnes": 0, "tento_mesic": 0}
 
+    @staticmethod
+    def _get_period_breakdown(db: Session, od: Optional[date], do: Optional[date]) -> Dict[str, Any]:
+        """Rozpis počítadel za období podle dnů, důvodů a uživatelů"""
+        filters = []
+        if od:
+            filters.append(ArchiveStat.den >= od)
+        if do:
+            filters.append(ArchiveStat.den <= do)
+
+        def breakdown(column):
+            rows = (
+                db.query(column, func.sum(ArchiveStat.pocet))
+                .filter(*filters)
+                .group_by(column)
+                .order_by(column)
+                .all()
+            )
+            return {str(key): pocet for key, pocet in rows}
+
+        po_dnech = breakdown(ArchiveStat.den)
+
+        return {
+            "od": od.isoformat() if od else None,
+            "do": do.isoformat() if do else None,
+            "celkem": sum(po_dnech.values()),
+            "po_dnech": po_dnech,
+            "podle_duvodu": breakdown(ArchiveStat.duvod),
+            "podle_uzivatele": breakdown(ArchiveStat.uzivatel)
+        }
+
 
 # Konstanty pro důvody vyskladnění
 VYSSKLADNENI_DUVODY = {
     "expirace": "Expirace",
-    "rozbito": "Rozbito/Poškozeno", 
+    "rozbito": "Rozbito/Poškozeno",
     "chyba": "Chyba/Špatně zaskladněno",
     "jine": "Jiné"
 }
@@ -0,0 +1,145 @@
+"""
+Cache odpovědí reportů podle globální verze dat
+Autor: GitHub Copilot
+Datum: 17.10.2026
+
+Funkcionalita:
+- Globální čítač verze dat v tabulce data_version (sdílený všemi workery)
+- Zapisující routery čítač zvyšují ve stejné transakci jako změnu dat
+- Cache odpovědí v procesu workeru platná do další změny dat nebo do konce dne
+"""
+
+import functools
+import threading
+from datetime import date
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from fastapi import Depends, Request
+from sqlalchemy import event, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from database import SessionLocal, get_database
+from models import DataVersion
+
+# Metody, které data nemění
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Klíč v Session.info označující session zapisujícího požadavku
+_ZAPIS_KEY = "zmena_dat"
+
+
+class DataVersionService:
+    """Čítač verze dat v databázi"""
+
+    @staticmethod
+    def ensure_row(connection) -> None:
+        """Založí řádek čítače, pokud ještě neexistuje (idempotentní)"""
+        stmt = sqlite_insert(DataVersion.__table__).values(id=1, verze=0)
+        connection.execute(stmt.on_conflict_do_nothing(index_elements=["id"]))
+
+    @staticmethod
+    def get(db: Session) -> int:
+        """Aktuální verze dat (dotaz přes primární klíč)"""
+        return db.query(DataVersion.verze).filter(DataVersion.id == 1).scalar() or 0
+
+    @staticmethod
+    def bump(db: Session) -> None:
+        """Zvýší verzi dat v aktuální transakci"""
+        db.execute(
+            update(DataVersion)
+            .where(DataVersion.id == 1)
+            .values(verze=DataVersion.verze + 1)
+        )
+
+
+def track_data_changes(request: Request, db: Session = Depends(get_database)) -> None:
+    """
+    Dependency zapisujících routerů
+
+    Označí session zapisujícího požadavku (POST/PUT/DELETE). FastAPI předá
+    endpointu stejnou session, takže její commit zvýší verzi dat.
+    """
+    if request.method not in READ_METHODS:
+        db.info[_ZAPIS_KEY] = True
+
+
+@event.listens_for(SessionLocal, "before_commit")
+def _bump_data_version(session: Session) -> None:
+    """Každý commit zapisujícího požadavku zneplatní cache ve všech workerech"""
+    if session.info.get(_ZAPIS_KEY):
+        DataVersionService.bump(session)
+
+
+def current_stamp(db: Session) -> Tuple[int, date]:
+    """
+    Razítko platnosti odvozených dat: verze dat a dnešní datum
+
+    Datum je součástí razítka, protože expirace a barvy GB se počítají
+    vůči dnešku a mění se i bez zápisu.
+    """
+    return DataVersionService.get(db), date.today()
+
+
+class ResponseCache:
+    """
+    Cache hotových odpovědí v paměti workeru
+
+    Záznam je platný pro jedno razítko (current_stamp). Neúspěšné
+    výpočty se neukládají.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Hashable, Tuple[Tuple[int, date], Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(
+        self, db: Session, key: Hashable, compute: Callable[[], Any]
+    ) -> Any:
+        # Verze se čte před výpočtem - zápis během výpočtu vynutí nový výpočet
+        stamp = current_stamp(db)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = compute()
+
+        with self._lock:
+            current = self._entries.get(key)
+            # Pomalejší výpočet se starší verzí nepřepíše novější záznam
+            if current is None or current[0] <= stamp:
+                self._entries[key] = (stamp, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+response_cache = ResponseCache()
+
+
+def cached_response(name: str):
+    """
+    Dekorátor synchronního endpointu, který cachuje jeho odpověď
+
+    Endpoint musí mít parametr `db`; ostatní parametry jsou součástí klíče.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            params = tuple(sorted((k, v) for k, v in kwargs.items() if k != "db"))
+            return response_cache.get_or_compute(
+                kwargs["db"], (name, params), lambda: func(*args, **kwargs)
+            )
+
+        return wrapper
+
+    return decorator
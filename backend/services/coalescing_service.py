@@ -0,0 +1,141 @@
+"""
+Sloučení souběžných stejných požadavků (single-flight)
+Autor: GitHub Copilot
+Datum: 17.10.2026
+
+Funkcionalita:
+- Souběžné stejné požadavky v rámci workeru čekají na jeden běžící výpočet
+  a dostanou jeho výsledek (nebo stejnou chybu)
+- Zapíná se dekorátorem na konkrétním endpointu, vypnout jde proměnnou
+  COALESCING_DISABLED (názvy endpointů oddělené čárkou)
+- Počítadla požadavků, výpočtů a sdílených výsledků pro každý endpoint
+"""
+
+import functools
+import os
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from services.cache_service import current_stamp
+
+# Endpointy, u kterých je slučování vypnuté (např. "gitterboxes/list,export/search/pdf")
+COALESCING_DISABLED = {
+    name.strip()
+    for name in os.getenv("COALESCING_DISABLED", "").split(",")
+    if name.strip()
+}
+
+
+class _Call:
+    """Jeden běžící výpočet a požadavky, které na něj čekají"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.cekajici = 0
+        self.result: Any = None
+        self.follower_results: List[Any] = []
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Registr běžících výpočtů podle klíče"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, name: str, counter: str) -> None:
+        stats = self._stats.setdefault(
+            name, {"pozadavky": 0, "vypocty": 0, "sdilene": 0}
+        )
+        stats[counter] += 1
+
+    def do(
+        self,
+        name: str,
+        key: Hashable,
+        compute: Callable[[], Any],
+        share: Optional[Callable[[Any, int], List[Any]]] = None,
+    ) -> Any:
+        """
+        Spustí výpočet, nebo počká na už běžící výpočet se stejným klíčem
+
+        Args:
+            name: Název endpointu (pro počítadla a COALESCING_DISABLED)
+            key: Klíč požadavku (endpoint + parametry + razítko verze dat)
+            compute: Funkce provádějící výpočet
+            share: Volitelně připraví pro každý čekající požadavek vlastní
+                   kopii výsledku (např. soubor, který si každý po odeslání smaže)
+        """
+        if name in COALESCING_DISABLED:
+            return compute()
+
+        with self._lock:
+            self._count(name, "pozadavky")
+            call = self._calls.get(key)
+            if call is not None:
+                # Výsledek sdílíme s běžícím výpočtem
+                self._count(name, "sdilene")
+                index = call.cekajici
+                call.cekajici += 1
+            else:
+                self._count(name, "vypocty")
+                call = self._calls[key] = _Call()
+                index = None
+
+        if index is not None:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.follower_results[index] if share else call.result
+
+        try:
+            call.result = compute()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            # Po odebrání klíče se už nikdo nepřipojí, počet čekajících je konečný
+            with self._lock:
+                del self._calls[key]
+            try:
+                if call.error is None and share and call.cekajici:
+                    call.follower_results = share(call.result, call.cekajici)
+            except BaseException as e:
+                call.error = e
+            call.done.set()
+        return call.result
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Kopie počítadel pro všechny endpointy"""
+        with self._lock:
+            return {name: dict(counters) for name, counters in self._stats.items()}
+
+
+single_flight = SingleFlight()
+
+
+def coalesced(name: str):
+    """
+    Dekorátor synchronního endpointu, který slučuje souběžné stejné požadavky
+
+    Klíč tvoří název endpointu, jeho parametry kromě `db` a razítko verze
+    dat (current_stamp) - požadavek odeslaný po vlastním zápisu se tak
+    nepřipojí k výpočtu, který začal před tímto zápisem. Výsledek sdílí
+    všechny čekající požadavky, nesmí se proto dále upravovat.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            params = tuple(sorted((k, v) for k, v in kwargs.items() if k != "db"))
+            db = kwargs.get("db")
+            stamp = current_stamp(db) if db is not None else None
+            return single_flight.do(
+                name, (name, params, stamp), lambda: func(*args, **kwargs)
+            )
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,78 @@
+"""
+Denormalizované údaje Gitterboxů o jejich položkách
+Autor: GitHub Copilot
+Datum: 17.10.2026
+
+Funkcionalita:
+- Počet aktivních položek, nejbližší sledovaná expirace a mix sledovaných/nesledovaných
+  položek uložené přímo v tabulce gitterboxes
+- SQL triggery nad items je přepočítají ve stejné transakci jako změnu položky
+  (vytvoření, úprava, vyskladnění, expirace, smazání)
+- Hromadný přepočet pro migraci existujících dat
+"""
+
+# Přepočet jednoho GB - korelované poddotazy jdou přes index ix_items_gitterbox_stav
+_RECALCULATE = """
+    UPDATE gitterboxes SET
+        pocet_polozek = (
+            SELECT count(*) FROM items i
+            WHERE i.gitterbox_id = gitterboxes.id AND i.stav = 'aktivni'
+        ),
+        nejblizsi_expirace = (
+            SELECT min(i.expiracni_datum) FROM items i
+            WHERE i.gitterbox_id = gitterboxes.id AND i.stav = 'aktivni' AND i.sledovat_expiraci = 1
+        ),
+        ma_sledovane = EXISTS (
+            SELECT 1 FROM items i
+            WHERE i.gitterbox_id = gitterboxes.id AND i.stav = 'aktivni' AND i.sledovat_expiraci = 1
+        ),
+        ma_nesledovane = EXISTS (
+            SELECT 1 FROM items i
+            WHERE i.gitterbox_id = gitterboxes.id AND i.stav = 'aktivni' AND i.sledovat_expiraci = 0
+        )
+"""
+
+COUNTER_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS gitterbox_counters_items_ai AFTER INSERT ON items
+    BEGIN
+        {_RECALCULATE}
+        WHERE id = new.gitterbox_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS gitterbox_counters_items_ad AFTER DELETE ON items
+    BEGIN
+        {_RECALCULATE}
+        WHERE id = old.gitterbox_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS gitterbox_counters_items_au
+    AFTER UPDATE OF gitterbox_id, stav, sledovat_expiraci, expiracni_datum ON items
+    BEGIN
+        {_RECALCULATE}
+        WHERE id IN (old.gitterbox_id, new.gitterbox_id);
+    END
+    """,
+]
+
+
+class GitterboxCounterService:
+    """Správa triggerů pro denormalizované údaje Gitterboxů"""
+
+    @staticmethod
+    def create_triggers(connection) -> None:
+        """
+        Vytvoří triggery nad tabulkou items (idempotentní)
+
+        Args:
+            connection: SQLAlchemy Connection v otevřené transakci
+        """
+        for trigger in COUNTER_TRIGGERS:
+            connection.exec_driver_sql(trigger)
+
+    @staticmethod
+    def recalculate_all(connection) -> None:
+        """Přepočítá údaje všech GB z tabulky items (migrace, oprava dat)"""
+        connection.exec_driver_sql(_RECALCULATE)
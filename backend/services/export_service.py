@@ -5,10 +5,19 @@ Datum: 6.8.2025
 """
 
 import os
+import shutil
 import tempfile
-from datetime import datetime
+import threading
+from datetime import datetime, date, timedelta
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Iterator
+
+from sqlalchemy import and_
+from sqlalchemy.orm import Session
+
+from models import Gitterbox, Item, Position, Shelf, Location
+from services.listing_service import KRITICKA_EXPIRACE_DNI
+from services.metrics_service import track_job
 
 # PDF generování
 from reportlab.lib import colors
@@ -46,8 +55,102 @@ else:
 
 # Excel generování
 from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-from openpyxl.worksheet.table import Table as ExcelTable, TableStyleInfo
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment, PatternFill, Border, Side, NamedStyle
+from openpyxl.utils import get_column_letter
+
+# Počet řádků načítaných z DB najednou při exportu
+EXPORT_BATCH_SIZE = 1000
+# Velikost bloku při streamování souboru klientovi
+STREAM_CHUNK_SIZE = 64 * 1024
+# Počet flowables držených v paměti při skládání PDF
+PDF_FLOWABLE_BUFFER = 50
+# Maximální počet současně generovaných PDF (ostatní požadavky čekají)
+PDF_EXPORT_WORKERS = int(os.getenv("PDF_EXPORT_WORKERS", "2"))
+_pdf_export_slots = threading.BoundedSemaphore(PDF_EXPORT_WORKERS)
+
+# Sloupce Excel exportu vyhledávání (hlavička, šířka)
+SEARCH_EXCEL_COLUMNS = [
+    ('GB #', 8),
+    ('Zodpovědná osoba', 22),
+    ('Pozice', 10),
+    ('Lokace', 18),
+    ('Regál', 18),
+    ('Naplněnost', 12),
+    ('Položek', 10),
+    ('Datum založení', 15),
+    ('TMA', 20),
+    ('Projekt', 20),
+    ('Název dílu', 35),
+    ('Množství', 12),
+    ('Expirace', 12),
+    ('Dny do exp.', 12),
+    ('Poznámka GB', 40),
+]
+
+FILTER_NAMES = {
+    'query': 'Vyhledávání',
+    'location_id': 'Lokace ID',
+    'project': 'Projekt',
+    'person': 'Zodpovědná osoba',
+    'status': 'Stav'
+}
+
+
+class _StreamingDocTemplate(SimpleDocTemplate):
+    """
+    SimpleDocTemplate, který si flowables dočítá z generátoru
+
+    build() zpracovává seznam flowables zepředu, seznam se proto průběžně
+    doplňuje na PDF_FLOWABLE_BUFFER položek (rezerva pro keepWithNext).
+    """
+
+    def build_from(self, flowables: Iterable) -> None:
+        """Sestaví dokument z libovolného iterátoru flowables"""
+        self._flowable_source = iter(flowables)
+        self._flowable_buffer: List = []
+        self._refill(self._flowable_buffer)
+        self.build(self._flowable_buffer)
+
+    def _refill(self, flowables: List) -> None:
+        # handle_flowable se volá i pro interní seznamy (např. _hanging)
+        if flowables is not getattr(self, "_flowable_buffer", None):
+            return
+        while len(flowables) < PDF_FLOWABLE_BUFFER:
+            flowable = next(self._flowable_source, None)
+            if flowable is None:
+                break
+            flowables.append(flowable)
+
+    def handle_flowable(self, flowables):
+        self._refill(flowables)
+        super().handle_flowable(flowables)
+        # build() končí na prázdném seznamu - doplň dřív, než ho zkontroluje
+        self._refill(flowables)
+
+
+def _excel_named_styles() -> List[NamedStyle]:
+    """Pojmenované styly sdílené všemi buňkami exportu (Arial kvůli českým znakům)"""
+    border = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+    return [
+        NamedStyle(name="export_title", font=Font(bold=True, size=16, name="Arial")),
+        NamedStyle(name="export_text", font=Font(name="Arial")),
+        NamedStyle(name="export_bold", font=Font(bold=True, name="Arial")),
+        NamedStyle(
+            name="export_header",
+            font=Font(bold=True, color="FFFFFF", name="Arial"),
+            fill=PatternFill("solid", fgColor="366092"),
+            border=border,
+            alignment=Alignment(horizontal='center')
+        ),
+        NamedStyle(name="export_cell", font=Font(name="Arial"), border=border),
+    ]
+
 
 class ExportService:
     """Service pro generování exportů"""
@@ -56,15 +159,36 @@ class ExportService:
         self.temp_dir = Path(tempfile.gettempdir()) / "storage_app_exports"
         self.temp_dir.mkdir(exist_ok=True)
         
-    def create_search_pdf(self, results: List[Dict], filters: Dict) -> str:
-        """Vytvoří PDF z výsledků vyhledávání"""
+    @track_job("export_search_pdf")
+    def create_search_pdf(self, rows: Iterable, celkem: int, filters: Dict) -> str:
+        """
+        Vytvoří PDF z výsledků vyhledávání
+
+        Flowables se generují průběžně z iterátoru řádků (dotaz s yield_per)
+        a dokument je skládá stránku po stránce, v paměti je vždy jen malá
+        zásoba flowables. Souběžné generování je omezeno na PDF_EXPORT_WORKERS.
+
+        Args:
+            rows: Řádky z ExportService.search_rows (GB + položka, seřazené podle GB)
+            celkem: Počet exportovaných GB
+            filters: Použité filtry pro hlavičku exportu
+
+        Returns:
+            str: Cesta k vygenerovanému souboru
+        """
         
         # Vytvoř dočasný soubor
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
         pdf_path = self.temp_dir / f"search_export_{timestamp}.pdf"
         
-        # Vytvoř PDF dokument
-        doc = SimpleDocTemplate(str(pdf_path), pagesize=A4)
+        with _pdf_export_slots:
+            doc = _StreamingDocTemplate(str(pdf_path), pagesize=A4)
+            doc.build_from(self._search_pdf_flowables(rows, celkem, filters))
+        
+        return str(pdf_path)
+    
+    def _search_pdf_flowables(self, rows: Iterable, celkem: int, filters: Dict) -> Iterator:
+        """Generátor flowables PDF exportu - hlavička, pak GB a jejich položky"""
         styles = getSampleStyleSheet()
         
         # Vlastní styly s Unicode fonty
@@ -103,14 +227,11 @@ class ExportService:
             fontName=NORMAL_FONT
         )
         
-        # Obsah dokumentu
-        story = []
-        
         # Nadpis
-        story.append(Paragraph("📦 Export výsledků vyhledávání", title_style))
+        yield Paragraph("📦 Export výsledků vyhledávání", title_style)
         
         # Informace o exportu
-        export_info = f"Datum: {datetime.now().strftime('%d.%m.%Y %H:%M')} | Celkem: {len(results)} GB"
+        export_info = f"Datum: {datetime.now().strftime('%d.%m.%Y %H:%M')} | Celkem: {celkem} GB"
         
         # Přidej informace o filtrech
         if any(filters.values()):
@@ -127,208 +248,229 @@ class ExportService:
             if filter_parts:
                 export_info += f" | Filtry: {' | '.join(filter_parts)}"
         
-        story.append(Paragraph(export_info, info_style))
-        story.append(Spacer(1, 10))
+        yield Paragraph(export_info, info_style)
+        yield Spacer(1, 10)
+        
+        today = date.today()
+        kriticky_datum = today + timedelta(days=KRITICKA_EXPIRACE_DNI)
+        previous_gb_id = None
         
         # Výsledky - jednoduchý seznam
-        for i, result in enumerate(results, 1):
-            gb = result['gitterbox']
-            items = result['items']
-            location = result['location']
-            shelf = result['shelf']
-            position = result['position']
+        for row in rows:
+            if row.gitterbox_id != previous_gb_id:
+                previous_gb_id = row.gitterbox_id
+                
+                # Hlavní řádek GB
+                gb_info = f"#{row.cislo_gb} - {row.zodpovedna_osoba} | {row.radek}-{row.sloupec} ({row.lokace} - {row.regal}) | {row.naplnenost_procenta}% | {row.pocet_polozek} položek"
+                
+                if row.datum_zalozeni:
+                    gb_info += f" | {row.datum_zalozeni.strftime('%d.%m.%Y')}"
+                
+                if row.gb_poznamka:
+                    gb_info += f" | {row.gb_poznamka}"
+                
+                yield Paragraph(gb_info, gb_style)
             
-            # Hlavní řádek GB
-            gb_info = f"#{gb.cislo_gb} - {gb.zodpovedna_osoba} | {position.nazev_pozice} ({location.nazev} - {shelf.nazev}) | {gb.naplnenost_procenta}% | {gb.pocet_polozek} položek"
+            # GB bez položek má jediný řádek s prázdnými sloupci položky
+            if row.item_id is None:
+                yield Paragraph("• Žádné položky", item_style)
+                continue
             
-            if gb.datum_zalozeni:
-                gb_info += f" | {gb.datum_zalozeni.strftime('%d.%m.%Y')}"
+            # Položky s odsazením
+            item_parts = []
             
-            if gb.poznamka:
-                gb_info += f" | {gb.poznamka}"
+            if row.tma_cislo:
+                item_parts.append(f"TMA: {row.tma_cislo}")
             
-            story.append(Paragraph(gb_info, gb_style))
+            if row.projekt:
+                item_parts.append(f"Projekt: {row.projekt}")
             
-            # Položky s odsazením
-            if items:
-                for item in items:
-                    item_parts = []
-                    
-                    if item.tma_cislo:
-                        item_parts.append(f"TMA: {item.tma_cislo}")
-                    
-                    if item.projekt:
-                        item_parts.append(f"Projekt: {item.projekt}")
-                    
-                    item_parts.append(item.nazev_dilu)
-                    
-                    if item.popis_mnozstvi:
-                        item_parts.append(f"({item.popis_mnozstvi})")
-                    
-                    # Expirace
-                    if item.sledovat_expiraci and item.expiracni_datum:
-                        expiry = item.expiracni_datum.strftime('%d.%m.%Y')
-                        if item.je_blizko_expirace:
-                            expiry += f" ⚠️ {item.dny_do_expirace} dní"
-                        item_parts.append(f"Exp: {expiry}")
-                    
-                    item_text = " • ".join(item_parts)
-                    story.append(Paragraph(item_text, item_style))
-            else:
-                story.append(Paragraph("• Žádné položky", item_style))
-        
-        # Vygeneruj PDF
-        doc.build(story)
-        
-        return str(pdf_path)
+            item_parts.append(row.nazev_dilu)
+            item_parts.append(f"({row.pocet_kusu} {row.jednotka})")
+            
+            # Expirace
+            if row.sledovat_expiraci and row.expiracni_datum:
+                expiry = row.expiracni_datum.strftime('%d.%m.%Y')
+                if row.expiracni_datum <= kriticky_datum:
+                    expiry += f" ⚠️ {(row.expiracni_datum - today).days} dní"
+                item_parts.append(f"Exp: {expiry}")
+            
+            yield Paragraph(" • ".join(item_parts), item_style)
     
-    def create_search_excel(self, results: List[Dict], filters: Dict) -> str:
-        """Vytvoří Excel z výsledků vyhledávání"""
+    @track_job("export_search_excel")
+    def create_search_excel(self, rows: Iterable, celkem: int, filters: Dict) -> str:
+        """
+        Vytvoří Excel z výsledků vyhledávání
+
+        Používá write-only workbook se sdílenými pojmenovanými styly, řádky se
+        zapisují průběžně z iterátoru (dotaz s yield_per), takže paměť nezávisí
+        na počtu exportovaných položek.
+
+        Args:
+            rows: Řádky z ExportService.search_rows (GB + položka, seřazené podle GB)
+            celkem: Počet exportovaných GB
+            filters: Použité filtry pro hlavičku exportu
+
+        Returns:
+            str: Cesta k vygenerovanému souboru
+        """
         
         # Vytvoř dočasný soubor
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
         excel_path = self.temp_dir / f"search_export_{timestamp}.xlsx"
         
-        # Vytvoř workbook s UTF-8 podporou
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Výsledky vyhledávání"
+        wb = Workbook(write_only=True)
+        for style in _excel_named_styles():
+            wb.add_named_style(style)
         
-        # Styly s Unicode podporou
-        header_font = Font(bold=True, color="FFFFFF", name="Arial")
-        header_fill = PatternFill("solid", fgColor="366092")
-        normal_font = Font(name="Arial")  # Arial má lepší podporu českých znaků
-        border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'), 
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
+        ws = wb.create_sheet("Výsledky vyhledávání")
+        
+        # Šířky sloupců musí být nastaveny před zápisem řádků
+        for index, (_, width) in enumerate(SEARCH_EXCEL_COLUMNS, 1):
+            ws.column_dimensions[get_column_letter(index)].width = width
+        
+        def styled(value, style="export_cell"):
+            cell = WriteOnlyCell(ws, value=value)
+            cell.style = style
+            return cell
         
-        # Header informace s Unicode fontem
-        ws['A1'] = "📦 Export výsledků vyhledávání"
-        ws['A1'].font = Font(bold=True, size=16, name="Arial")
-        ws['A2'] = f"Datum exportu: {datetime.now().strftime('%d.%m.%Y %H:%M')}"
-        ws['A2'].font = normal_font
-        ws['A3'] = f"Celkem výsledků: {len(results)}"
-        ws['A3'].font = normal_font
+        # Header informace
+        ws.append([styled("📦 Export výsledků vyhledávání", "export_title")])
+        ws.append([styled(f"Datum exportu: {datetime.now().strftime('%d.%m.%Y %H:%M')}", "export_text")])
+        ws.append([styled(f"Celkem výsledků: {celkem}", "export_text")])
+        ws.append([])
         
         # Filtry
-        row = 5
         if any(filters.values()):
-            ws[f'A{row}'] = "Aplikované filtry:"
-            ws[f'A{row}'].font = Font(bold=True, name="Arial")
-            row += 1
-            
+            ws.append([styled("Aplikované filtry:", "export_bold")])
             for key, value in filters.items():
                 if value:
-                    filter_names = {
-                        'query': 'Vyhledávání',
-                        'location_id': 'Lokace ID',
-                        'project': 'Projekt', 
-                        'person': 'Zodpovědná osoba',
-                        'status': 'Stav'
-                    }
-                    cell = ws[f'A{row}']
-                    cell.value = f"• {filter_names.get(key, key)}: {value}"
-                    cell.font = normal_font
-                    row += 1
-        
-        # Hlavní tabulka začíná
-        row += 2
+                    ws.append([styled(f"• {FILTER_NAMES.get(key, key)}: {value}", "export_text")])
         
-        # Headers
-        headers = [
-            'GB #', 'Zodpovědná osoba', 'Pozice', 'Lokace', 'Regál', 
-            'Naplněnost', 'Položek', 'Datum založení', 'TMA', 'Projekt',
-            'Název dílu', 'Množství', 'Expirace', 'Dny do exp.', 'Poznámka GB'
-        ]
+        # Hlavní tabulka
+        ws.append([])
+        ws.append([])
+        ws.append([styled(header, "export_header") for header, _ in SEARCH_EXCEL_COLUMNS])
         
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=row, column=col, value=header)
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.border = border
-            cell.alignment = Alignment(horizontal='center')
+        today = date.today()
+        kriticky_datum = today + timedelta(days=KRITICKA_EXPIRACE_DNI)
+        previous_gb_id = None
         
-        # Data
-        row += 1
-        for result in results:
-            gb = result['gitterbox']
-            items = result['items']
-            location = result['location']
-            shelf = result['shelf']
-            position = result['position']
-            
-            if not items:
-                # GB bez položek - jeden řádek
-                ws.cell(row=row, column=1, value=gb.cislo_gb)
-                ws.cell(row=row, column=2, value=gb.zodpovedna_osoba)
-                ws.cell(row=row, column=3, value=position.nazev_pozice)
-                ws.cell(row=row, column=4, value=location.nazev)
-                ws.cell(row=row, column=5, value=shelf.nazev)
-                ws.cell(row=row, column=6, value=f"{gb.naplnenost_procenta}%")
-                ws.cell(row=row, column=7, value=gb.pocet_polozek)
-                ws.cell(row=row, column=8, value=gb.datum_zalozeni.strftime('%d.%m.%Y') if gb.datum_zalozeni else '')
-                ws.cell(row=row, column=15, value=gb.poznamka or '')
-                
-                # Aplikuj border a font
-                for col in range(1, 16):
-                    cell = ws.cell(row=row, column=col)
-                    cell.border = border
-                    cell.font = normal_font
-                    
-                row += 1
+        for row in rows:
+            # Informace o GB jen na prvním řádku GB
+            if row.gitterbox_id != previous_gb_id:
+                gb_values = [
+                    row.cislo_gb,
+                    row.zodpovedna_osoba,
+                    f"{row.radek}-{row.sloupec}",
+                    row.lokace,
+                    row.regal,
+                    f"{row.naplnenost_procenta}%",
+                    row.pocet_polozek,
+                    row.datum_zalozeni.strftime('%d.%m.%Y') if row.datum_zalozeni else '',
+                ]
+                previous_gb_id = row.gitterbox_id
             else:
-                # GB s položkami - řádek pro každou položku
-                first_item = True
-                for item in items:
-                    if first_item:
-                        # První řádek má info o GB
-                        ws.cell(row=row, column=1, value=gb.cislo_gb)
-                        ws.cell(row=row, column=2, value=gb.zodpovedna_osoba)
-                        ws.cell(row=row, column=3, value=position.nazev_pozice)
-                        ws.cell(row=row, column=4, value=location.nazev)
-                        ws.cell(row=row, column=5, value=shelf.nazev)
-                        ws.cell(row=row, column=6, value=f"{gb.naplnenost_procenta}%")
-                        ws.cell(row=row, column=7, value=gb.pocet_polozek)
-                        ws.cell(row=row, column=8, value=gb.datum_zalozeni.strftime('%d.%m.%Y') if gb.datum_zalozeni else '')
-                        ws.cell(row=row, column=15, value=gb.poznamka or '')
-                        first_item = False
-                    
-                    # Info o položce
-                    ws.cell(row=row, column=9, value=item.tma_cislo or '')
-                    ws.cell(row=row, column=10, value=item.projekt or '')
-                    ws.cell(row=row, column=11, value=item.nazev_dilu)
-                    ws.cell(row=row, column=12, value=item.popis_mnozstvi or '')
-                    
-                    if item.sledovat_expiraci and item.expiracni_datum:
-                        ws.cell(row=row, column=13, value=item.expiracni_datum.strftime('%d.%m.%Y'))
-                        if item.je_blizko_expirace:
-                            ws.cell(row=row, column=14, value=item.dny_do_expirace)
-                    
-                    # Aplikuj border a font
-                    for col in range(1, 16):
-                        cell = ws.cell(row=row, column=col)
-                        cell.border = border
-                        cell.font = normal_font
-                    
-                    row += 1
-        
-        # Auto-šířka sloupců
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
+                gb_values = [None] * 8
+            
+            # Info o položce (GB bez položek má prázdné sloupce)
+            expirace = dny_do_expirace = None
+            if row.item_id is not None and row.sledovat_expiraci and row.expiracni_datum:
+                expirace = row.expiracni_datum.strftime('%d.%m.%Y')
+                if row.expiracni_datum <= kriticky_datum:
+                    dny_do_expirace = (row.expiracni_datum - today).days
+            
+            item_values = [
+                row.tma_cislo or '',
+                row.projekt or '',
+                row.nazev_dilu,
+                f"{row.pocet_kusu} {row.jednotka}" if row.item_id is not None else '',
+                expirace,
+                dny_do_expirace,
+            ]
+            
+            ws.append([styled(value) for value in gb_values + item_values + [row.gb_poznamka or '']])
         
-        # Uložení
         wb.save(excel_path)
         
         return str(excel_path)
+
+    @staticmethod
+    def search_rows(db: Session, gitterbox_ids) -> Iterator:
+        """
+        Plochý dotaz GB + pozice + regál + lokace + aktivní položky pro export
+
+        Řádky se čtou po dávkách (yield_per), GB bez položek mají sloupce
+        položky prázdné.
+
+        Args:
+            db: Databázová session
+            gitterbox_ids: Poddotaz s ID exportovaných GB
+        """
+        return (
+            db.query(
+                Gitterbox.id.label("gitterbox_id"),
+                Gitterbox.cislo_gb,
+                Gitterbox.zodpovedna_osoba,
+                Gitterbox.naplnenost_procenta,
+                Gitterbox.datum_zalozeni,
+                Gitterbox.poznamka.label("gb_poznamka"),
+                Position.radek,
+                Position.sloupec,
+                Location.nazev.label("lokace"),
+                Shelf.nazev.label("regal"),
+                Gitterbox.pocet_polozek,
+                Item.id.label("item_id"),
+                Item.tma_cislo,
+                Item.projekt,
+                Item.nazev_dilu,
+                Item.pocet_kusu,
+                Item.jednotka,
+                Item.sledovat_expiraci,
+                Item.expiracni_datum,
+            )
+            .join(Position, Gitterbox.position_id == Position.id)
+            .join(Shelf, Position.shelf_id == Shelf.id)
+            .join(Location, Shelf.location_id == Location.id)
+            .outerjoin(Item, and_(Item.gitterbox_id == Gitterbox.id, Item.stav == "aktivni"))
+            .filter(Gitterbox.id.in_(gitterbox_ids))
+            .order_by(Gitterbox.cislo_gb, Item.id)
+            .yield_per(EXPORT_BATCH_SIZE)
+        )
+
+    @staticmethod
+    def share_file(path: str, count: int) -> List[str]:
+        """
+        Vytvoří další odkazy na hotový soubor exportu
+
+        Každý odkaz se streamuje a maže samostatně (iter_file), data na
+        disku zůstanou do odeslání posledního z nich. Bez podpory hard
+        linků se soubor zkopíruje.
+        """
+        paths = []
+        try:
+            for index in range(1, count + 1):
+                shared_path = f"{path}.{index}"
+                try:
+                    os.link(path, shared_path)
+                except OSError:
+                    shutil.copyfile(path, shared_path)
+                paths.append(shared_path)
+        except Exception:
+            for shared_path in paths:
+                os.remove(shared_path)
+            raise
+        return paths
+
+    @staticmethod
+    def iter_file(path: str, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+        """Čte soubor po blocích pro StreamingResponse a po odeslání ho smaže"""
+        try:
+            with open(path, "rb") as file:
+                while True:
+                    chunk = file.read(chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+        finally:
+            os.remove(path)
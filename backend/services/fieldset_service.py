@@ -0,0 +1,136 @@
+"""
+Výběr polí a vnořených objektů ve výpisech (fields= / embed=)
+Autor: GitHub Copilot
+Datum: 17.10.2026
+
+Funkcionalita:
+- fields=id,nazev_dilu vrátí jen vyjmenovaná pole (id vždy), bez parametru
+  se vrací všechna pole jako dřív
+- embed=gitterbox,shelf určuje vnořené objekty, bez parametru se vnoří
+  výchozí objekty výpisu, prázdné embed= nevnoří nic
+- Každé pole zná sloupce read modelu, které potřebuje - nevyžádané
+  sloupce, joiny ani vypočtené hodnoty se z databáze nenačítají
+  a neserializují
+"""
+
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+)
+
+
+class FieldSpec(NamedTuple):
+    """Jedno pole (nebo vnořený objekt) výpisu"""
+
+    value: Callable[[Any], Any]  # Hodnota pole z řádku výsledku
+    columns: Sequence[str] = ()  # Atributy read modelu potřebné pro hodnotu
+
+
+class FieldSelection:
+    """Pole a vnořené objekty vyžádané klientem"""
+
+    def __init__(self, fields: Optional[FrozenSet[str]], embed: FrozenSet[str]):
+        self.fields = fields  # None = všechna pole
+        self.embed = embed
+
+    def wants(self, name: str) -> bool:
+        return self.fields is None or name in self.fields
+
+    def embeds(self, name: str) -> bool:
+        return name in self.embed
+
+
+def _split(value: Optional[str]) -> Optional[List[str]]:
+    if value is None:
+        return None
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+
+def parse_selection(
+    fields: Optional[str],
+    embed: Optional[str],
+    allowed: Iterable[str],
+    allowed_embed: Iterable[str] = (),
+    default_embed: Iterable[str] = (),
+) -> FieldSelection:
+    """
+    Zpracuje parametry fields= a embed= výpisu
+
+    Args:
+        fields: Čárkami oddělená pole (None = všechna)
+        embed: Čárkami oddělené vnořené objekty (None = default_embed)
+        allowed: Názvy polí výpisu (stačí předat slovník FieldSpec)
+        allowed_embed: Názvy vnořených objektů výpisu
+        default_embed: Vnořené objekty, které výpis vrací bez parametru embed
+
+    Raises:
+        ValueError: Neznámé pole nebo vnořený objekt
+    """
+    allowed, allowed_embed = list(allowed), list(allowed_embed)
+
+    pole = _split(fields)
+    if pole is not None:
+        nezname = sorted(set(pole) - set(allowed))
+        if nezname:
+            raise ValueError(
+                f"Neznámá pole: {', '.join(nezname)} (dostupná: {', '.join(allowed)})"
+            )
+        pole = frozenset(pole) | {"id"}
+
+    vnorene = _split(embed)
+    if vnorene is None:
+        vnorene = list(default_embed)
+    nezname = sorted(set(vnorene) - set(allowed_embed))
+    if nezname:
+        dostupne = ", ".join(allowed_embed) or "žádné"
+        raise ValueError(
+            f"Neznámé vnořené objekty: {', '.join(nezname)} (dostupné: {dostupne})"
+        )
+
+    return FieldSelection(pole, frozenset(vnorene))
+
+
+def needed_columns(
+    selection: FieldSelection,
+    specs: Dict[str, FieldSpec],
+    embeds: Optional[Dict[str, FieldSpec]] = None,
+    always: Sequence[str] = (),
+) -> Set[str]:
+    """
+    Atributy read modelu, které vyžádaná pole a vnořené objekty potřebují
+
+    Args:
+        always: Atributy, které dotaz potřebuje vždy (např. řadicí sloupce kurzoru)
+    """
+    columns = set(always)
+    for name, spec in specs.items():
+        if selection.wants(name):
+            columns.update(spec.columns)
+    for name, spec in (embeds or {}).items():
+        if selection.embeds(name):
+            columns.update(spec.columns)
+    return columns
+
+
+def serialize(
+    row: Any,
+    selection: FieldSelection,
+    specs: Dict[str, FieldSpec],
+    embeds: Optional[Dict[str, FieldSpec]] = None,
+) -> Dict[str, Any]:
+    """Slovník jen s vyžádanými poli a vnořenými objekty"""
+    data = {
+        name: spec.value(row) for name, spec in specs.items() if selection.wants(name)
+    }
+    for name, spec in (embeds or {}).items():
+        if selection.embeds(name):
+            data[name] = spec.value(row)
+    return data
@@ -0,0 +1,185 @@
+"""
+Service pro hromadné výpisy Gitterboxů
+Autor: GitHub Copilot
+Datum: 17.10.2026
+
+Funkcionalita:
+- Výpis GB včetně pozice, regálu a lokace jedním dotazem
+- Počet aktivních položek a příznak kritické expirace z uložených sloupců GB
+- Stejný dotaz slouží i pro detail jednoho GB
+- Stránkování výpisu kurzorem podle (číslo GB, ID)
+- Výběr sloupců (fields=) - nevyžádané sloupce ani joiny se nedotazují
+"""
+
+from datetime import date, timedelta
+from typing import Iterable, List, Dict, Any, Optional, Tuple
+
+from sqlalchemy import case
+from sqlalchemy.orm import Session
+
+from models import Gitterbox, Position, Shelf, Location
+from services.pagination_service import keyset_page
+
+# Počet dní, od kterého se expirace považuje za kritickou
+KRITICKA_EXPIRACE_DNI = 30
+
+# Stabilní řazení výpisu GB (číslo je unikátní jen mezi aktivními GB)
+GB_RAZENI = (Gitterbox.cislo_gb, Gitterbox.id)
+
+
+class GitterboxListingService:
+    """Set-based dotazy pro výpisy Gitterboxů (bez N+1 dotazů)"""
+
+    @staticmethod
+    def _listing_query(db: Session, pole: Optional[Iterable[str]] = None):
+        """
+        Sestaví dotaz GB + pozice + regál + lokace + statistiky položek
+
+        Počet aktivních položek a nejbližší expirace jsou uložené přímo
+        v tabulce gitterboxes (udržují je triggery), tabulka items se tak
+        při výpisu vůbec nečte.
+
+        Args:
+            pole: Jen vybrané sloupce výpisu (fields=), None = všechny.
+                  ID a číslo GB se vybírají vždy (řazení a kurzor), pozice,
+                  regál a lokace se připojují jen pro jejich sloupce.
+        """
+        kriticky_datum = date.today() + timedelta(days=KRITICKA_EXPIRACE_DNI)
+
+        ma_kriticke_expirace = case(
+            (Gitterbox.nejblizsi_expirace <= kriticky_datum, True),
+            else_=False,
+        )
+
+        sloupce = {
+            "id": Gitterbox.id,
+            "cislo_gb": Gitterbox.cislo_gb,
+            "zodpovedna_osoba": Gitterbox.zodpovedna_osoba,
+            "datum_zalozeni": Gitterbox.datum_zalozeni,
+            "naplnenost_procenta": Gitterbox.naplnenost_procenta,
+            "stav": Gitterbox.stav,
+            "poznamka": Gitterbox.poznamka,
+            "position_id": Gitterbox.position_id,
+            "lokace": Location.nazev.label("lokace"),
+            "regal": Shelf.nazev.label("regal"),
+            "radek": Position.radek,
+            "sloupec": Position.sloupec,
+            "pocet_polozek": Gitterbox.pocet_polozek,
+            "verze": Gitterbox.verze,
+            "ma_kriticke_expirace": ma_kriticke_expirace.label("ma_kriticke_expirace"),
+        }
+        if pole is not None:
+            pole = set(pole) | {"id", "cislo_gb"}
+            sloupce = {
+                nazev: sloupec for nazev, sloupec in sloupce.items() if nazev in pole
+            }
+
+        query = db.query(*sloupce.values()).select_from(Gitterbox)
+        # position_id je NOT NULL s cizím klíčem - vynechaný join řádky neubere
+        if sloupce.keys() & {"lokace", "regal", "radek", "sloupec"}:
+            query = query.join(Position, Gitterbox.position_id == Position.id)
+        if sloupce.keys() & {"lokace", "regal"}:
+            query = query.join(Shelf, Position.shelf_id == Shelf.id)
+        if "lokace" in sloupce:
+            query = query.join(Location, Shelf.location_id == Location.id)
+        return query
+
+    @staticmethod
+    def _row_to_dict(row) -> Dict[str, Any]:
+        """Převede řádek dotazu výpisu na slovník pro GitterboxResponse"""
+        data = dict(row._mapping)
+        if "ma_kriticke_expirace" in data:
+            data["ma_kriticke_expirace"] = bool(data["ma_kriticke_expirace"])
+        return data
+
+    @staticmethod
+    def _filtered_query(
+        db: Session,
+        stav: Optional[str] = None,
+        zodpovedna_osoba: Optional[str] = None,
+        pole: Optional[Iterable[str]] = None,
+    ):
+        query = GitterboxListingService._listing_query(db, pole)
+
+        if stav:
+            query = query.filter(Gitterbox.stav == stav)
+        if zodpovedna_osoba:
+            query = query.filter(
+                Gitterbox.zodpovedna_osoba.ilike(f"%{zodpovedna_osoba}%")
+            )
+        return query
+
+    @staticmethod
+    def list_gitterboxes(
+        db: Session,
+        stav: Optional[str] = None,
+        zodpovedna_osoba: Optional[str] = None,
+        pole: Optional[Iterable[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Vrátí seznam GB s pozicí a statistikami položek
+
+        Args:
+            db: Databázová session
+            stav: Filtr podle stavu GB (volitelné)
+            zodpovedna_osoba: Filtr podle zodpovědné osoby, částečná shoda (volitelné)
+            pole: Jen vybrané sloupce (volitelné, ID a číslo GB vždy)
+
+        Returns:
+            List[Dict]: Řádky seřazené podle čísla GB
+        """
+        query = GitterboxListingService._filtered_query(
+            db, stav, zodpovedna_osoba, pole
+        )
+        rows = query.order_by(*GB_RAZENI).all()
+        return [GitterboxListingService._row_to_dict(row) for row in rows]
+
+    @staticmethod
+    def page_gitterboxes(
+        db: Session,
+        limit: int,
+        cursor: Optional[str] = None,
+        stav: Optional[str] = None,
+        zodpovedna_osoba: Optional[str] = None,
+        pole: Optional[Iterable[str]] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Jedna stránka seznamu GB (řazení podle čísla GB a ID)
+
+        Returns:
+            Tuple[List[Dict], Optional[str]]: Řádky a kurzor další stránky
+
+        Raises:
+            ValueError: Neplatný kurzor
+        """
+        query = GitterboxListingService._filtered_query(
+            db, stav, zodpovedna_osoba, pole
+        )
+        rows, next_cursor = keyset_page(
+            query, GB_RAZENI, cursor, limit, key=lambda row: (row.cislo_gb, row.id)
+        )
+        return [GitterboxListingService._row_to_dict(row) for row in rows], next_cursor
+
+    @staticmethod
+    def get_gitterboxes_by_ids(
+        db: Session, gb_ids: List[int]
+    ) -> Dict[int, Dict[str, Any]]:
+        """Vrátí GB podle seznamu ID jako slovník id -> řádek (jeden dotaz)"""
+        if not gb_ids:
+            return {}
+        rows = (
+            GitterboxListingService._listing_query(db)
+            .filter(Gitterbox.id.in_(set(gb_ids)))
+            .all()
+        )
+        return {row.id: GitterboxListingService._row_to_dict(row) for row in rows}
+
+    @staticmethod
+    def get_gitterbox(db: Session, gb_id: int) -> Optional[Dict[str, Any]]:
+        """Vrátí jeden GB ve stejném tvaru jako výpis, nebo None"""
+        row = (
+            GitterboxListingService._listing_query(db)
+            .filter(Gitterbox.id == gb_id)
+            .first()
+        )
+        return GitterboxListingService._row_to_dict(row) if row else None
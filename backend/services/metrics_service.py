@@ -0,0 +1,231 @@
+"""
+Metriky pro Prometheus (/metrics)
+Autor: GitHub Copilot
+Datum: 17.10.2026
+
+Funkcionalita:
+- Histogram latence požadavků podle šablony cesty (/api/items/{item_id})
+  a počet právě zpracovávaných požadavků
+- Čekání SQLite na zápisový zámek (BEGIN IMMEDIATE) a chyby "database is locked"
+- Doba exportů a archivace (dekorátor track_job)
+- Připojení v poolu, RSS a CPU čas každého workeru
+- Při více workerech (PROMETHEUS_MULTIPROC_DIR) zapisuje každý worker
+  do sdíleného adresáře a /metrics vrací součet za všechny workery
+- Bez balíčku prometheus-client (jen v requirements.prod.txt) se nic neměří
+"""
+
+import asyncio
+import functools
+import os
+import time
+from typing import Callable, Optional, Tuple
+
+from sqlalchemy import event
+from starlette.routing import Match
+
+from database import engine
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST,
+        REGISTRY,
+        CollectorRegistry,
+        Counter,
+        Gauge,
+        Histogram,
+        generate_latest,
+        multiprocess,
+    )
+except ImportError:
+    Histogram = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Adresář sdílených metrik workerů, musí být nastavený před spuštěním workerů
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+METRICS_ENABLED = (
+    Histogram is not None and os.getenv("METRICS_ENABLED", "True").lower() == "true"
+)
+
+# Interval vzorkování poolu a prostředků procesu (s)
+METRICS_SAMPLE_INTERVAL = float(os.getenv("METRICS_SAMPLE_INTERVAL", "15"))
+
+# Chyby SQLite, které znamenají vypršení busy_timeout při čekání na zámek
+_BUSY_ERRORS = ("database is locked", "database is busy")
+
+if METRICS_ENABLED:
+    REQUEST_LATENCY = Histogram(
+        "http_request_duration_seconds",
+        "Doba zpracování HTTP požadavku",
+        ["method", "route", "status"],
+        buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+    )
+    REQUESTS_IN_FLIGHT = Gauge(
+        "http_requests_in_flight",
+        "Právě zpracovávané HTTP požadavky",
+        ["method", "route"],
+        multiprocess_mode="livesum",
+    )
+    SQLITE_LOCK_WAIT = Histogram(
+        "sqlite_lock_wait_seconds",
+        "Čekání na zápisový zámek SQLite (BEGIN IMMEDIATE)",
+        buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+    )
+    SQLITE_BUSY_ERRORS = Counter(
+        "sqlite_busy_errors_total",
+        "Příkazy, kterým vypršel busy_timeout (database is locked)",
+    )
+    JOB_DURATION = Histogram(
+        "storage_job_duration_seconds",
+        "Doba exportů a archivace",
+        ["job", "status"],
+        buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+    )
+    DB_POOL_CONNECTIONS = Gauge(
+        "db_pool_connections",
+        "Připojení v poolu workeru podle stavu",
+        ["state"],
+        multiprocess_mode="liveall",
+    )
+    PROCESS_RSS = Gauge(
+        "storage_process_resident_memory_bytes",
+        "RSS paměť workeru",
+        multiprocess_mode="liveall",
+    )
+    PROCESS_CPU = Gauge(
+        "storage_process_cpu_seconds",
+        "Spotřebovaný CPU čas workeru (user + system)",
+        multiprocess_mode="liveall",
+    )
+
+
+def track_job(job: str) -> Callable:
+    """Dekorátor měřící dobu úlohy (export, archivace), výjimka nebo False = error"""
+
+    def decorator(func):
+        if not METRICS_ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            status = "error"
+            try:
+                result = func(*args, **kwargs)
+                status = "error" if result is False else "ok"
+                return result
+            finally:
+                JOB_DURATION.labels(job, status).observe(time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+def sample_process() -> None:
+    """Aktualizuje metriky poolu a prostředků tohoto workeru"""
+    if not METRICS_ENABLED:
+        return
+    pool = engine.pool
+    if hasattr(pool, "checkedout"):
+        DB_POOL_CONNECTIONS.labels("checked_out").set(pool.checkedout())
+        DB_POOL_CONNECTIONS.labels("idle").set(pool.checkedin())
+        DB_POOL_CONNECTIONS.labels("overflow").set(max(pool.overflow(), 0))
+    if psutil is not None:
+        process = psutil.Process()
+        cpu = process.cpu_times()
+        PROCESS_RSS.set(process.memory_info().rss)
+        PROCESS_CPU.set(cpu.user + cpu.system)
+
+
+async def sample_process_loop() -> None:
+    """Pravidelné vzorkování workeru (spouští se při startu aplikace)"""
+    while True:
+        sample_process()
+        await asyncio.sleep(METRICS_SAMPLE_INTERVAL)
+
+
+def mark_process_dead() -> None:
+    """Odstraní živé gauge ukončeného workeru ze sdíleného adresáře"""
+    if METRICS_ENABLED and MULTIPROC_DIR:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Metriky ve formátu Prometheus (při více workerech součet za všechny)"""
+    sample_process()
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+if METRICS_ENABLED:
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_lock_wait(conn, cursor, statement, parameters, context, executemany):
+        if context is not None and statement.startswith("BEGIN"):
+            context._lock_wait_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _record_lock_wait(conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, "_lock_wait_start", None)
+        if start is not None:
+            SQLITE_LOCK_WAIT.observe(time.perf_counter() - start)
+
+    @event.listens_for(engine, "handle_error")
+    def _count_busy_errors(exception_context):
+        if any(
+            chyba in str(exception_context.original_exception) for chyba in _BUSY_ERRORS
+        ):
+            SQLITE_BUSY_ERRORS.inc()
+
+
+class MetricsMiddleware:
+    """ASGI middleware: latence a počet běžících požadavků podle šablony cesty"""
+
+    def __init__(self, app):
+        self.app = app
+
+    @staticmethod
+    def _route_template(scope) -> str:
+        """Šablona cesty požadavku - s ID v cestě by metrik přibývalo bez omezení"""
+        partial: Optional[str] = None
+        for route in scope["app"].router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route.path
+            if match == Match.PARTIAL and partial is None:
+                partial = route.path
+        return partial or "unmatched"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = self._route_template(scope)
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        in_flight = REQUESTS_IN_FLIGHT.labels(method, route)
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_flight.dec()
+            REQUEST_LATENCY.labels(method, route, str(status["code"])).observe(
+                time.perf_counter() - start
+            )
@@ -0,0 +1,219 @@
+"""
+Přidělování čísel Gitterboxů
+Autor: GitHub Copilot
+Datum: 17.10.2026
+
+Funkcionalita:
+- Volná čísla jako intervaly (od, do) spočítané v SQL z mezer mezi
+  obsazenými a rezervovanými čísly (window funkce LEAD přes index)
+- Další volné číslo a rezervace bloku N čísel pro hromadný příjem
+- Rezervace běží v BEGIN IMMEDIATE transakci a čísla hlídá unikátní
+  index, dva workery tak nikdy nedostanou stejné číslo
+"""
+
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, literal, select, union
+from sqlalchemy.orm import Session
+
+from database import begin_immediate
+from models import Gitterbox, GbNumberReservation, Position
+
+# Výchozí platnost rezervace čísel
+REZERVACE_PLATNOST_MINUT = 15
+
+Interval = Tuple[int, int]
+
+
+def _pocet(intervaly: List[Interval]) -> int:
+    return sum(do - od + 1 for od, do in intervaly)
+
+
+class GbNumberAllocator:
+    """Volná čísla GB v rozsahu 1..počet pozic skladu"""
+
+    @staticmethod
+    def max_number(db: Session) -> int:
+        """Nejvyšší přidělitelné číslo GB (čísla jdou 1..počet pozic)"""
+        return db.query(func.count(Position.id)).scalar()
+
+    @staticmethod
+    def free_ranges(db: Session, max_cislo: Optional[int] = None) -> List[Interval]:
+        """
+        Volná čísla jako seřazené intervaly (od, do)
+
+        Obsazená čísla (aktivní GB a platné rezervace) se doplní o hranice
+        0 a max + 1, každá mezera mezi sousedy je jeden volný interval.
+        Výsledek má velikost podle počtu mezer, ne podle počtu čísel.
+        """
+        if max_cislo is None:
+            max_cislo = GbNumberAllocator.max_number(db)
+        if max_cislo < 1:
+            return []
+
+        obsazena = union(
+            select(literal(0).label("cislo")),
+            select(Gitterbox.cislo_gb).where(
+                Gitterbox.stav == "aktivni", Gitterbox.cislo_gb <= max_cislo
+            ),
+            select(GbNumberReservation.cislo_gb).where(
+                GbNumberReservation.vyprsi > datetime.now(),
+                GbNumberReservation.cislo_gb <= max_cislo,
+            ),
+            select(literal(max_cislo + 1)),
+        ).subquery()
+        sousede = select(
+            obsazena.c.cislo,
+            func.lead(obsazena.c.cislo).over(order_by=obsazena.c.cislo).label("dalsi"),
+        ).subquery()
+
+        rows = db.execute(
+            select(sousede.c.cislo + 1, sousede.c.dalsi - 1)
+            .where(sousede.c.dalsi - sousede.c.cislo > 1)
+            .order_by(sousede.c.cislo)
+        )
+        return [(od, do) for od, do in rows]
+
+    @staticmethod
+    def summary(db: Session) -> Dict[str, Any]:
+        """Přehled čísel GB s volnými čísly zakódovanými jako intervaly"""
+        max_cislo = GbNumberAllocator.max_number(db)
+        intervaly = GbNumberAllocator.free_ranges(db, max_cislo)
+        celkem_rezervovanych = (
+            db.query(func.count(GbNumberReservation.id))
+            .filter(
+                GbNumberReservation.vyprsi > datetime.now(),
+                GbNumberReservation.cislo_gb <= max_cislo,
+            )
+            .scalar()
+        )
+        celkem_volnych = _pocet(intervaly)
+
+        return {
+            "volne_rozsahy": [[od, do] for od, do in intervaly],
+            "dalsi_volne": intervaly[0][0] if intervaly else None,
+            "celkem_volnych": celkem_volnych,
+            "celkem_rezervovanych": celkem_rezervovanych,
+            "celkem_obsazenych": max_cislo - celkem_volnych - celkem_rezervovanych,
+            "max_cislo": max_cislo,
+        }
+
+    @staticmethod
+    def next_free(db: Session) -> Optional[int]:
+        """Nejnižší volné a nerezervované číslo GB (bez rezervace)"""
+        intervaly = GbNumberAllocator.free_ranges(db)
+        return intervaly[0][0] if intervaly else None
+
+    @staticmethod
+    def reserve(
+        db: Session,
+        pocet: int,
+        souvisle: bool = False,
+        platnost_minut: int = REZERVACE_PLATNOST_MINUT,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Rezervuje `pocet` nejnižších volných čísel a potvrdí transakci
+
+        Args:
+            db: Databázová session (bez rozpracovaných změn)
+            pocet: Počet čísel
+            souvisle: Čísla musí tvořit jeden souvislý blok
+            platnost_minut: Jak dlouho rezervace platí
+
+        Returns:
+            Dict s tokenem, intervaly čísel a koncem platnosti,
+            nebo None pokud volných čísel není dost
+        """
+        begin_immediate(db)
+        try:
+            now = datetime.now()
+            # Propadlé rezervace by blokovaly unikátní index
+            db.query(GbNumberReservation).filter(
+                GbNumberReservation.vyprsi <= now
+            ).delete(synchronize_session=False)
+
+            vybrane: List[Interval] = []
+            zbyva = pocet
+            for od, do in GbNumberAllocator.free_ranges(db):
+                velikost = do - od + 1
+                if souvisle:
+                    if velikost >= pocet:
+                        vybrane = [(od, od + pocet - 1)]
+                        zbyva = 0
+                        break
+                    continue
+                vybrane.append((od, od + min(velikost, zbyva) - 1))
+                zbyva -= min(velikost, zbyva)
+                if not zbyva:
+                    break
+
+            if zbyva:
+                db.rollback()
+                return None
+
+            token = str(uuid.uuid4())
+            vyprsi = now + timedelta(minutes=platnost_minut)
+            db.bulk_insert_mappings(
+                GbNumberReservation,
+                [
+                    {
+                        "cislo_gb": cislo,
+                        "token": token,
+                        "vyprsi": vyprsi,
+                        "vytvoreno": now,
+                    }
+                    for od, do in vybrane
+                    for cislo in range(od, do + 1)
+                ],
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        return {
+            "token": token,
+            "rozsahy": [[od, do] for od, do in vybrane],
+            "pocet": pocet,
+            "vyprsi": vyprsi.isoformat(),
+        }
+
+    @staticmethod
+    def release(db: Session, token: str) -> int:
+        """Zruší rezervaci (bez commitu), vrací počet uvolněných čísel"""
+        return (
+            db.query(GbNumberReservation)
+            .filter(GbNumberReservation.token == token)
+            .delete(synchronize_session=False)
+        )
+
+    @staticmethod
+    def check_reservation(
+        db: Session, cislo_gb: int, token: Optional[str]
+    ) -> Optional[str]:
+        """
+        Ověří, že číslo není rezervované někým jiným
+
+        Returns:
+            Chybová zpráva, nebo None pokud číslo lze použít
+        """
+        rezervace = (
+            db.query(GbNumberReservation.token)
+            .filter(
+                GbNumberReservation.cislo_gb == cislo_gb,
+                GbNumberReservation.vyprsi > datetime.now(),
+            )
+            .first()
+        )
+        if rezervace and rezervace.token != token:
+            return f"Číslo GB #{cislo_gb} je rezervované"
+        return None
+
+    @staticmethod
+    def consume(db: Session, cislo_gb: int) -> None:
+        """Odebere rezervaci použitého čísla (bez commitu)"""
+        db.query(GbNumberReservation).filter(
+            GbNumberReservation.cislo_gb == cislo_gb
+        ).delete(synchronize_session=False)
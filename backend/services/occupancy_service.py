@@ -0,0 +1,333 @@
+"""
+Kompaktní model obsazenosti regálů
+Autor: GitHub Copilot
+Datum: 17.10.2026
+
+Funkcionalita:
+- Obsazenost a barva každé pozice jako 1 bajt v bytearray regálu (po řádcích),
+  ID pozic v kompaktním poli, údaje GB jen pro obsazené buňky
+- Celý sklad se načte dvěma dotazy (regály, pozice) a drží v paměti workeru
+- SQL triggery zvyšují verzi regálu (tabulka shelf_versions) při změně jeho GB
+  nebo regálu samotného, po zápisu se znovu načtou jen regály se změněnou verzí,
+  celý sklad až při změně dne (barvy podle blížící se expirace)
+- Kompaktní payload mřížky pro regál, lokaci nebo celý sklad jedním voláním
+"""
+
+import threading
+from array import array
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, case, select
+from sqlalchemy.orm import Session
+
+from models import Gitterbox, Position, Shelf, ShelfVersion
+from services.cache_service import current_stamp
+from services.listing_service import KRITICKA_EXPIRACE_DNI
+
+# Kód buňky v mřížce = index do tohoto seznamu (0 = volná pozice)
+BARVY = ["volna", "zelena", "modra", "oranzova", "oranzova_srafovana", "cervena"]
+VOLNA, ZELENA, MODRA, ORANZOVA, ORANZOVA_SRAFOVANA, CERVENA = range(len(BARVY))
+
+# Naplněnost, od které je sledovaný GB plný (viz Gitterbox.barva_indikace)
+PLNY_GB_OD = 80
+
+
+# Zvýšení verze regálů z SELECTu (shelf_id, 1), řádek verze se založí při první změně.
+# SELECT musí mít WHERE, jinak SQLite nerozliší ON CONFLICT od JOIN ... ON
+def _bump(shelf_ids_select: str) -> str:
+    return f"""
+        INSERT INTO shelf_versions (shelf_id, verze)
+        {shelf_ids_select}
+        ON CONFLICT(shelf_id) DO UPDATE SET verze = verze + 1;
+    """
+
+
+_GB_SHELVES = "SELECT shelf_id, 1 FROM positions WHERE id IN ({})"
+
+SHELF_VERSION_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS shelf_version_gitterboxes_ai AFTER INSERT ON gitterboxes
+    BEGIN
+        {_bump(_GB_SHELVES.format("new.position_id"))}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS shelf_version_gitterboxes_ad AFTER DELETE ON gitterboxes
+    BEGIN
+        {_bump(_GB_SHELVES.format("old.position_id"))}
+    END
+    """,
+    # Změny položek se do gitterboxes promítají triggery čítačů (counter_service.py)
+    f"""
+    CREATE TRIGGER IF NOT EXISTS shelf_version_gitterboxes_au AFTER UPDATE ON gitterboxes
+    BEGIN
+        {_bump(_GB_SHELVES.format("old.position_id, new.position_id"))}
+    END
+    """,
+    # Pozice se mění jen spolu s regálem (založení, změna rozměrů, smazání)
+    f"""
+    CREATE TRIGGER IF NOT EXISTS shelf_version_shelves_ai AFTER INSERT ON shelves
+    BEGIN
+        {_bump("SELECT new.id, 1 WHERE true")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS shelf_version_shelves_ad AFTER DELETE ON shelves
+    BEGIN
+        {_bump("SELECT old.id, 1 WHERE true")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS shelf_version_shelves_au AFTER UPDATE ON shelves
+    BEGIN
+        {_bump("SELECT new.id, 1 WHERE true")}
+    END
+    """,
+]
+
+
+class ShelfGrid:
+    """Mřížka jednoho regálu, index buňky = (radek - 1) * sloupce + (sloupec - 1)"""
+
+    __slots__ = (
+        "id",
+        "location_id",
+        "nazev",
+        "typ",
+        "radky",
+        "sloupce",
+        "barvy",
+        "pozice",
+        "gitterboxy",
+    )
+
+    def __init__(
+        self,
+        shelf_id: int,
+        location_id: int,
+        nazev: str,
+        typ: str,
+        radky: int,
+        sloupce: int,
+    ):
+        self.id = shelf_id
+        self.location_id = location_id
+        self.nazev = nazev
+        self.typ = typ
+        self.radky = radky
+        self.sloupce = sloupce
+        self.barvy = bytearray(radky * sloupce)
+        self.pozice = array("i", [0]) * (radky * sloupce)
+        # Jen obsazené buňky: index -> (id, cislo_gb, zodpovedna_osoba, naplnenost, pocet_polozek)
+        self.gitterboxy: Dict[int, Tuple] = {}
+
+    def to_payload(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "location_id": self.location_id,
+            "nazev": self.nazev,
+            "typ": self.typ,
+            "radky": self.radky,
+            "sloupce": self.sloupce,
+            "mrizka": list(self.barvy),
+            "pozice_id": self.pozice.tolist(),
+            "gitterboxy": {
+                str(index): {
+                    "id": gb[0],
+                    "cislo_gb": gb[1],
+                    "zodpovedna_osoba": gb[2],
+                    "naplnenost_procenta": gb[3],
+                    "pocet_polozek": gb[4],
+                }
+                for index, gb in self.gitterboxy.items()
+            },
+        }
+
+
+class _Snapshot:
+    def __init__(
+        self,
+        stamp: Tuple[int, date],
+        versions: Dict[int, int],
+        shelves: Dict[int, ShelfGrid],
+    ):
+        self.stamp = stamp
+        self.versions = versions
+        self.shelves = shelves
+
+
+def _barva_kod(today: date):
+    """SQL výraz pro kód barvy buňky (stejná pravidla jako Gitterbox.barva_indikace)"""
+    kriticky_datum = today + timedelta(days=KRITICKA_EXPIRACE_DNI)
+    return case(
+        (Gitterbox.id.is_(None), VOLNA),
+        (Gitterbox.nejblizsi_expirace <= kriticky_datum, CERVENA),
+        (
+            and_(
+                Gitterbox.ma_sledovane == False,  # noqa: E712
+                Gitterbox.ma_nesledovane == True,  # noqa: E712
+            ),
+            MODRA,
+        ),
+        (
+            and_(
+                Gitterbox.ma_sledovane == True,  # noqa: E712
+                Gitterbox.naplnenost_procenta < PLNY_GB_OD,
+            ),
+            ORANZOVA_SRAFOVANA,
+        ),
+        (Gitterbox.ma_sledovane == True, ORANZOVA),  # noqa: E712
+        else_=ZELENA,
+    )
+
+
+class OccupancyService:
+    """Obsazenost skladu v paměti workeru"""
+
+    _snapshot: Optional[_Snapshot] = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def create_triggers(connection) -> None:
+        """Vytvoří triggery verzí regálů (idempotentní)"""
+        for trigger in SHELF_VERSION_TRIGGERS:
+            connection.exec_driver_sql(trigger)
+
+    @staticmethod
+    def _load_shelves(
+        db: Session, today: date, shelf_ids: Optional[List[int]] = None
+    ) -> Dict[int, ShelfGrid]:
+        """Načte mřížky regálů (jeden dotaz na regály, jeden na pozice), bez shelf_ids všechny"""
+        shelf_query = db.query(
+            Shelf.id,
+            Shelf.location_id,
+            Shelf.nazev,
+            Shelf.typ,
+            Shelf.radky,
+            Shelf.sloupce,
+        ).order_by(Shelf.location_id, Shelf.id)
+        position_query = select(
+            Position.id,
+            Position.shelf_id,
+            Position.radek,
+            Position.sloupec,
+            _barva_kod(today).label("barva"),
+            Gitterbox.id,
+            Gitterbox.cislo_gb,
+            Gitterbox.zodpovedna_osoba,
+            Gitterbox.naplnenost_procenta,
+            Gitterbox.pocet_polozek,
+        ).outerjoin(
+            Gitterbox,
+            and_(Gitterbox.position_id == Position.id, Gitterbox.stav == "aktivni"),
+        )
+        if shelf_ids is not None:
+            shelf_query = shelf_query.filter(Shelf.id.in_(shelf_ids))
+            position_query = position_query.where(Position.shelf_id.in_(shelf_ids))
+
+        shelves = {
+            row.id: ShelfGrid(
+                row.id, row.location_id, row.nazev, row.typ, row.radky, row.sloupce
+            )
+            for row in shelf_query
+        }
+
+        # Core select přes připojení (bez ORM zpracování řádků) - řádků jsou desítky tisíc
+        for (
+            position_id,
+            shelf_id,
+            radek,
+            sloupec,
+            barva,
+            *gitterbox,
+        ) in db.connection().execute(position_query):
+            grid = shelves.get(shelf_id)
+            if grid is None or not (
+                1 <= radek <= grid.radky and 1 <= sloupec <= grid.sloupce
+            ):
+                continue
+            index = (radek - 1) * grid.sloupce + (sloupec - 1)
+            grid.pozice[index] = position_id
+            grid.barvy[index] = barva
+            if gitterbox[0] is not None:
+                grid.gitterboxy[index] = tuple(gitterbox)
+        return shelves
+
+    @staticmethod
+    def _refresh(
+        db: Session, snapshot: Optional[_Snapshot], stamp: Tuple[int, date]
+    ) -> _Snapshot:
+        """
+        Nový snapshot pro verzi dat stamp
+
+        Znovu načte jen regály se změněnou verzí (nebo všechny po změně dne).
+        Původní snapshot se nemění, požadavky, které ho právě čtou, ho dočtou celý.
+        """
+        versions = dict(db.query(ShelfVersion.shelf_id, ShelfVersion.verze))
+        if snapshot is None or snapshot.stamp[1] != stamp[1]:
+            shelves = OccupancyService._load_shelves(db, stamp[1])
+        else:
+            changed = [
+                shelf_id
+                for shelf_id in versions.keys() | snapshot.versions.keys()
+                if versions.get(shelf_id) != snapshot.versions.get(shelf_id)
+            ]
+            shelves = dict(snapshot.shelves)
+            if changed:
+                for shelf_id in changed:
+                    shelves.pop(shelf_id, None)
+                shelves.update(OccupancyService._load_shelves(db, stamp[1], changed))
+
+        # Pořadí jako při úplném načtení (podle lokace a ID regálu)
+        ordered = {
+            grid.id: grid
+            for grid in sorted(shelves.values(), key=lambda g: (g.location_id, g.id))
+        }
+        return _Snapshot(stamp, versions, ordered)
+
+    @staticmethod
+    def get_shelves(db: Session) -> Dict[int, ShelfGrid]:
+        """
+        Aktuální mřížky všech regálů
+
+        Snapshot se sdílí mezi požadavky workeru. Po změně verze dat se znovu
+        načtou jen změněné regály, po změně dne celý sklad. Souběžné požadavky
+        čekají na jedno načtení.
+        """
+        stamp = current_stamp(db)
+        snapshot = OccupancyService._snapshot
+        if snapshot is not None and snapshot.stamp == stamp:
+            return snapshot.shelves
+
+        with OccupancyService._lock:
+            snapshot = OccupancyService._snapshot
+            if snapshot is None or snapshot.stamp != stamp:
+                snapshot = OccupancyService._snapshot = OccupancyService._refresh(
+                    db, snapshot, stamp
+                )
+        return snapshot.shelves
+
+    @staticmethod
+    def get_grids(
+        db: Session, shelf_id: Optional[int] = None, location_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Kompaktní mřížky regálu, lokace nebo celého skladu
+
+        Args:
+            db: Databázová session
+            shelf_id: Jen jeden regál (volitelné)
+            location_id: Jen regály lokace (volitelné)
+
+        Returns:
+            List[Dict]: Payload mřížky pro každý vybraný regál
+        """
+        shelves = OccupancyService.get_shelves(db)
+        if shelf_id is not None:
+            grids = [shelves[shelf_id]] if shelf_id in shelves else []
+        else:
+            grids = list(shelves.values())
+        if location_id is not None:
+            grids = [grid for grid in grids if grid.location_id == location_id]
+        return [grid.to_payload() for grid in grids]
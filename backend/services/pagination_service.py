@@ -0,0 +1,123 @@
+"""
+Stránkování výpisů kurzorem (keyset)
+Autor: GitHub Copilot
+Datum: 17.10.2026
+
+Funkcionalita:
+- Stránka se čte od hodnot řadicích sloupců posledního řádku předchozí
+  stránky (WHERE (a, b) > (?, ?) ORDER BY a, b LIMIT n), cena stránky
+  nezávisí na tom, jak hluboko klient listuje
+- Kurzor je neprůhledný řetězec (base64 JSON s hodnotami řadicích sloupců)
+- Řazení musí končit unikátním sloupcem (obvykle id), aby bylo stabilní
+"""
+
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, tuple_
+
+# Výchozí a maximální velikost stránky výpisů
+VYCHOZI_LIMIT = 100
+MAX_LIMIT = 1000
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Zakóduje hodnoty řadicích sloupců do kurzoru"""
+    data = [
+        value.isoformat() if isinstance(value, (date, datetime)) else value
+        for value in values
+    ]
+    return (
+        base64.urlsafe_b64encode(json.dumps(data, separators=(",", ":")).encode())
+        .decode()
+        .rstrip("=")
+    )
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> List[Any]:
+    """
+    Dekóduje kurzor na hodnoty řadicích sloupců
+
+    Raises:
+        ValueError: Kurzor je poškozený nebo patří k jinému řazení
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise ValueError("Neplatný kurzor stránkování")
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError("Neplatný kurzor stránkování")
+
+    result = []
+    for column, value in zip(columns, values):
+        try:
+            python_type = column.type.python_type
+        except NotImplementedError:
+            python_type = None
+        try:
+            if value is not None and python_type is date:
+                value = date.fromisoformat(value)
+            elif value is not None and python_type is datetime:
+                value = datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise ValueError("Neplatný kurzor stránkování")
+        result.append(value)
+    return result
+
+
+def keyset_page(
+    query,
+    columns: Sequence,
+    cursor: Optional[str],
+    limit: int,
+    key: Callable[[Any], Tuple],
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Jedna stránka dotazu seřazeného podle `columns`
+
+    Args:
+        query: ORM dotaz s filtry (bez ORDER BY a LIMIT)
+        columns: Řadicí sloupce, poslední musí být unikátní (NULL hodnoty nepodporuje)
+        cursor: Kurzor z předchozí stránky (None = první stránka)
+        limit: Velikost stránky
+        key: Vrátí hodnoty řadicích sloupců pro řádek výsledku
+
+    Returns:
+        Tuple[List, Optional[str]]: Řádky stránky a kurzor další stránky
+        (None na poslední stránce)
+
+    Raises:
+        ValueError: Neplatný kurzor
+    """
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        query = query.filter(
+            tuple_(*columns)
+            > tuple_(
+                *[
+                    bindparam(None, value, type_=column.type)
+                    for column, value in zip(columns, values)
+                ]
+            )
+        )
+
+    # O řádek víc, než je potřeba - pozná se tak, zda existuje další stránka
+    rows = query.order_by(*columns).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    return rows, encode_cursor(key(rows[-1]))
+
+
+def page_info(limit: int, next_cursor: Optional[str]) -> dict:
+    """Blok `strankovani` v odpovědi výpisu"""
+    return {
+        "limit": limit,
+        "next_cursor": next_cursor,
+        "ma_dalsi": next_cursor is not None,
+    }
@@ -0,0 +1,294 @@
+"""
+Hromadné generování pozic regálů
+Autor: GitHub Copilot
+Datum: 17.10.2026
+
+Funkcionalita:
+- Mřížka pozic regálu vzniká jedním INSERT ... SELECT nad rekurzivními CTE
+  (bez ORM objektu pro každou pozici)
+- Změna velikosti regálu přidá/odebere jen rozdílové pozice, ID ostatních
+  pozic (a tedy i umístění GB) zůstávají beze změny
+- Seznam volných pozic: status pozice udržují SQL triggery nad gitterboxes
+  (založení, přesun, vyskladnění) a index ix_positions_status_shelf
+  (status, regál, řádek, sloupec) slouží jako seřazený seznam volných buněk
+- Obsazení pozice jedním podmíněným UPDATE (jen pokud je pozice volná),
+  dva souběžné požadavky tak nikdy neobsadí stejnou pozici
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, insert, literal, or_, select, true, update
+from sqlalchemy.orm import Session
+
+from models import Position, Shelf, Location
+
+# Status pozice podle toho, zda na ní stojí aktivní GB
+_STATUS_PODLE_GB = """CASE WHEN EXISTS (
+        SELECT 1 FROM gitterboxes g WHERE g.position_id = positions.id AND g.stav = 'aktivni'
+    ) THEN 'obsazena' ELSE 'volna' END"""
+
+_RESYNC_STATUS = f"UPDATE positions SET status = {_STATUS_PODLE_GB}"
+
+
+def _sync_status(where: str) -> str:
+    """UPDATE statusu vybraných pozic, verze se zvýší jen při skutečné změně"""
+    return f"""
+        UPDATE positions SET status = {_STATUS_PODLE_GB}, verze = verze + 1
+        WHERE {where} AND status IS NOT {_STATUS_PODLE_GB};
+    """
+
+
+POSITION_STATUS_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS position_status_gitterboxes_ai AFTER INSERT ON gitterboxes
+    BEGIN
+        {_sync_status("id = new.position_id")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS position_status_gitterboxes_ad AFTER DELETE ON gitterboxes
+    BEGIN
+        {_sync_status("id = old.position_id")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS position_status_gitterboxes_au
+    AFTER UPDATE OF position_id, stav ON gitterboxes
+    BEGIN
+        {_sync_status("id IN (old.position_id, new.position_id)")}
+    END
+    """,
+]
+
+
+def _sequence(name: str, count: int):
+    """Rekurzivní CTE s čísly 1..count"""
+    cte = select(literal(1).label("n")).cte(name, recursive=True)
+    return cte.union_all(select(cte.c.n + 1).where(cte.c.n < count))
+
+
+def _outside(radky: int, sloupce: int):
+    """Podmínka pro pozice mimo mřížku radky x sloupce"""
+    return or_(Position.radek > radky, Position.sloupec > sloupce)
+
+
+class PositionGridService:
+    """Vytváření a úprava mřížky pozic regálu"""
+
+    @staticmethod
+    def materialize(
+        db: Session,
+        shelf_id: int,
+        radky: int,
+        sloupce: int,
+        puvodni_radky: int = 0,
+        puvodni_sloupce: int = 0,
+    ) -> int:
+        """
+        Vloží volné pozice mřížky radky x sloupce, které ještě neexistují
+
+        Pozice se vkládají po řádcích, nové ID tedy odpovídají pořadí
+        řádek-sloupec jako při ručním procházení mřížky.
+
+        Args:
+            db: Databázová session
+            shelf_id: ID regálu
+            radky, sloupce: Nová velikost mřížky
+            puvodni_radky, puvodni_sloupce: Velikost už existující mřížky
+
+        Returns:
+            int: Počet vložených pozic
+        """
+        radek = _sequence("radky", radky)
+        sloupec = _sequence("sloupce", sloupce)
+
+        # Každý řádek s každým sloupcem, bez buněk původní mřížky
+        nove_pozice = (
+            select(literal(shelf_id), radek.c.n, sloupec.c.n, literal("volna"))
+            .select_from(radek.join(sloupec, true()))
+            .where(or_(radek.c.n > puvodni_radky, sloupec.c.n > puvodni_sloupce))
+            .order_by(radek.c.n, sloupec.c.n)
+        )
+        db.execute(
+            insert(Position).from_select(
+                ["shelf_id", "radek", "sloupec", "status"], nove_pozice
+            )
+        )
+        # rowcount u INSERT s WITH sqlite3 nevrací, počet plyne z rozměrů
+        return radky * sloupce - min(radky, puvodni_radky) * min(
+            sloupce, puvodni_sloupce
+        )
+
+    @staticmethod
+    def count_occupied_outside(
+        db: Session, shelf_id: int, radky: int, sloupce: int
+    ) -> int:
+        """Počet obsazených pozic, které by po zmenšení regálu zanikly"""
+        return (
+            db.query(func.count(Position.id))
+            .filter(
+                Position.shelf_id == shelf_id,
+                Position.status == "obsazena",
+                _outside(radky, sloupce),
+            )
+            .scalar()
+        )
+
+    @staticmethod
+    def resize(
+        db: Session, shelf: Shelf, puvodni_radky: int, puvodni_sloupce: int
+    ) -> Tuple[int, int]:
+        """
+        Upraví pozice regálu po změně velikosti (bez commitu)
+
+        Smaže jen pozice mimo novou mřížku a doplní jen chybějící,
+        obsazenost odebíraných pozic musí zkontrolovat volající.
+
+        Returns:
+            Tuple[int, int]: (přidané pozice, odebrané pozice)
+        """
+        odebrano = (
+            db.query(Position)
+            .filter(
+                Position.shelf_id == shelf.id,
+                _outside(shelf.radky, shelf.sloupce),
+            )
+            .delete(synchronize_session=False)
+        )
+
+        pridano = PositionGridService.materialize(
+            db, shelf.id, shelf.radky, shelf.sloupce, puvodni_radky, puvodni_sloupce
+        )
+        return pridano, odebrano
+
+
+class FreePositionService:
+    """Dotazy nad seznamem volných pozic (index ix_positions_status_shelf)"""
+
+    @staticmethod
+    def create_triggers(connection) -> None:
+        """Vytvoří triggery udržující status pozic (idempotentní)"""
+        for trigger in POSITION_STATUS_TRIGGERS:
+            connection.exec_driver_sql(trigger)
+
+    @staticmethod
+    def resync_all(connection) -> None:
+        """Nastaví status všech pozic podle aktivních GB (migrace, oprava dat)"""
+        connection.exec_driver_sql(_RESYNC_STATUS)
+
+    @staticmethod
+    def _free_query(
+        db: Session, shelf_id: Optional[int] = None, location_id: Optional[int] = None
+    ):
+        query = (
+            db.query(
+                Position.id,
+                Position.shelf_id,
+                Position.radek,
+                Position.sloupec,
+                Shelf.nazev.label("regal"),
+                Shelf.radky,
+                Shelf.sloupce,
+                Shelf.location_id,
+                Location.nazev.label("lokace"),
+            )
+            .join(Shelf, Position.shelf_id == Shelf.id)
+            .join(Location, Shelf.location_id == Location.id)
+            .filter(Position.status == "volna")
+        )
+        if shelf_id is not None:
+            query = query.filter(Position.shelf_id == shelf_id)
+        if location_id is not None:
+            query = query.filter(Shelf.location_id == location_id)
+        return query
+
+    @staticmethod
+    def _row_to_dict(row) -> Dict[str, Any]:
+        return {
+            "id": row.id,
+            "shelf_id": row.shelf_id,
+            "radek": row.radek,
+            "sloupec": row.sloupec,
+            "nazev_pozice": f"{row.radek}-{row.sloupec}",
+            "shelf": {
+                "id": row.shelf_id,
+                "nazev": row.regal,
+                "radky": row.radky,
+                "sloupce": row.sloupce,
+                "location": {
+                    "id": row.location_id,
+                    "nazev": row.lokace,
+                },
+            },
+        }
+
+    @staticmethod
+    def count_free(
+        db: Session, shelf_id: Optional[int] = None, location_id: Optional[int] = None
+    ) -> int:
+        """Počet volných pozic (celý sklad, lokace nebo regál)"""
+        query = db.query(func.count(Position.id)).filter(Position.status == "volna")
+        if shelf_id is not None:
+            query = query.filter(Position.shelf_id == shelf_id)
+        if location_id is not None:
+            query = query.join(Shelf, Position.shelf_id == Shelf.id).filter(
+                Shelf.location_id == location_id
+            )
+        return query.scalar()
+
+    @staticmethod
+    def list_free(
+        db: Session,
+        shelf_id: Optional[int] = None,
+        location_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """
+        Volné pozice seřazené podle regálu, řádku a sloupce
+
+        Pořadí odpovídá indexu, stránka se čte přímo z něj bez řazení.
+
+        Args:
+            db: Databázová session
+            shelf_id: Jen volné pozice regálu (volitelné)
+            location_id: Jen volné pozice lokace (volitelné)
+            limit, offset: Stránkování (bez limitu vrací všechny)
+        """
+        query = FreePositionService._free_query(db, shelf_id, location_id).order_by(
+            Position.shelf_id, Position.radek, Position.sloupec
+        )
+        if limit is not None:
+            query = query.limit(limit).offset(offset)
+        return [FreePositionService._row_to_dict(row) for row in query]
+
+    @staticmethod
+    def next_free(
+        db: Session, shelf_id: Optional[int] = None, location_id: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        """První volná pozice podle regálu, řádku a sloupce (jedno hledání v indexu)"""
+        row = (
+            FreePositionService._free_query(db, shelf_id, location_id)
+            .order_by(Position.shelf_id, Position.radek, Position.sloupec)
+            .first()
+        )
+        return FreePositionService._row_to_dict(row) if row else None
+
+    @staticmethod
+    def claim(db: Session, position_id: int) -> bool:
+        """
+        Obsadí pozici, pokud je volná (bez commitu)
+
+        Kontrola i zápis jsou jeden příkaz, mezi nimi nemůže pozici
+        obsadit jiný požadavek.
+
+        Returns:
+            bool: True pokud pozici obsadil tento požadavek
+        """
+        result = db.execute(
+            update(Position)
+            .where(Position.id == position_id, Position.status == "volna")
+            .values(status="obsazena", verze=Position.verze + 1)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
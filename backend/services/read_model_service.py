@@ -0,0 +1,217 @@
+"""
+Read modely výpisů (řádky bez ORM entit)
+Autor: GitHub Copilot
+Datum: 17.10.2026
+
+Funkcionalita:
+- Výpisy pozic a položek čtou jen sloupce (db.query(sloupce) jako výpis GB),
+  řádky se nedostanou do identity mapy session a nemají lazy relace
+- Každý řádek se převede na malý DTO objekt se __slots__
+- Nevyžádané sloupce (fields=) se vyberou jako NULL a jejich joiny se vynechají
+- Celé výpisy se čtou po dávkách a řádek se hned převádí, v paměti tak
+  nezůstává seznam řádků dotazu ani seznam DTO
+"""
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from sqlalchemy import and_, null
+
+from models import Gitterbox, Item, Location, Position, Shelf
+
+# Velikost dávky při čtení celého výpisu (vse=true)
+READ_BATCH_SIZE = 1000
+
+
+@dataclass
+class PositionRow:
+    """Řádek výpisu pozic"""
+
+    __slots__ = (
+        "id",
+        "shelf_id",
+        "radek",
+        "sloupec",
+        "status",
+        "gitterbox_cislo",
+        "shelf_nazev",
+        "location_id",
+        "location_nazev",
+    )
+    id: int
+    shelf_id: Optional[int]
+    radek: Optional[int]
+    sloupec: Optional[int]
+    status: Optional[str]
+    gitterbox_cislo: Optional[int]
+    shelf_nazev: Optional[str]
+    location_id: Optional[int]
+    location_nazev: Optional[str]
+
+    nazev_pozice = Position.nazev_pozice
+
+
+@dataclass
+class ItemRow:
+    """Řádek výpisu položek (s údaji GB pro vnořený objekt gitterbox)"""
+
+    __slots__ = (
+        "id",
+        "gitterbox_id",
+        "tma_cislo",
+        "projekt",
+        "nazev_dilu",
+        "pocet_kusu",
+        "jednotka",
+        "datum_zaskladneni",
+        "sledovat_expiraci",
+        "expiracni_datum",
+        "stav",
+        "cislo_gb",
+        "zodpovedna_osoba",
+        "radek",
+        "sloupec",
+        "regal",
+        "lokace",
+    )
+    id: int
+    gitterbox_id: Optional[int]
+    tma_cislo: Optional[str]
+    projekt: Optional[str]
+    nazev_dilu: Optional[str]
+    pocet_kusu: Optional[int]
+    jednotka: Optional[str]
+    datum_zaskladneni: Optional[date]
+    sledovat_expiraci: Optional[bool]
+    expiracni_datum: Optional[date]
+    stav: Optional[str]
+    cislo_gb: Optional[int]
+    zodpovedna_osoba: Optional[str]
+    radek: Optional[int]
+    sloupec: Optional[int]
+    regal: Optional[str]
+    lokace: Optional[str]
+
+    # Vypočtené hodnoty se počítají stejně jako na modelu Item
+    je_blizko_expirace = Item.je_blizko_expirace
+    dny_do_expirace = Item.dny_do_expirace
+    popis_mnozstvi = Item.popis_mnozstvi
+
+
+class ReadModel:
+    """Sloupcový dotaz jednoho výpisu a převod řádků na DTO"""
+
+    def __init__(
+        self,
+        dto,
+        base,
+        columns: Dict[str, Tuple[Any, Tuple[str, ...]]],
+        joins: Dict[str, Tuple[Any, Any, bool]],
+    ):
+        """
+        Args:
+            dto: Třída řádku, pořadí __slots__ odpovídá pořadí sloupců
+            base: Hlavní entita dotazu
+            columns: Atribut DTO -> (SQL výraz, joiny které výraz potřebuje)
+            joins: Název -> (tabulka, podmínka, outer join), v pořadí připojení
+        """
+        assert tuple(columns) == dto.__slots__, f"Sloupce neodpovídají {dto.__name__}"
+        self.dto = dto
+        self.base = base
+        self.columns = columns
+        self.joins = joins
+
+    def query(self, db, needed: Optional[Iterable[str]] = None):
+        """
+        Sloupcový dotaz výpisu (bez ORDER BY a LIMIT)
+
+        Args:
+            needed: Potřebné atributy DTO (None = všechny, id vždy)
+        """
+        needed = set(self.columns) if needed is None else set(needed) | {"id"}
+
+        vyrazy, potrebne_joiny = [], set()
+        for name, (vyraz, joiny) in self.columns.items():
+            if name in needed:
+                vyrazy.append(vyraz.label(name))
+                potrebne_joiny.update(joiny)
+            else:
+                vyrazy.append(null().label(name))
+
+        query = db.query(*vyrazy).select_from(self.base)
+        for name, (tabulka, podminka, outer) in self.joins.items():
+            if name in potrebne_joiny:
+                query = query.join(tabulka, podminka, isouter=outer)
+        return query
+
+    @staticmethod
+    def stream(query):
+        """Seřazený dotaz čtený po dávkách (pro výpis bez stránkování)"""
+        return query.yield_per(READ_BATCH_SIZE)
+
+    def to_rows(self, rows) -> Iterator[Any]:
+        """Převádí řádky dotazu na DTO průběžně při iteraci"""
+        dto = self.dto
+        return (dto(*row) for row in rows)
+
+
+_GB_JOINY = ("gitterbox",)
+_POZICE_JOINY = ("gitterbox", "position")
+_REGAL_JOINY = ("gitterbox", "position", "shelf")
+
+POSITION_READ_MODEL = ReadModel(
+    PositionRow,
+    Position,
+    columns={
+        "id": (Position.id, ()),
+        "shelf_id": (Position.shelf_id, ()),
+        "radek": (Position.radek, ()),
+        "sloupec": (Position.sloupec, ()),
+        "status": (Position.status, ()),
+        "gitterbox_cislo": (Gitterbox.cislo_gb, ("gitterbox",)),
+        "shelf_nazev": (Shelf.nazev, ("shelf",)),
+        "location_id": (Shelf.location_id, ("shelf",)),
+        "location_nazev": (Location.nazev, ("shelf", "location")),
+    },
+    joins={
+        # Na pozici smí být nejvýš jeden aktivní GB (ux_gitterboxes_aktivni_pozice)
+        "gitterbox": (
+            Gitterbox,
+            and_(Gitterbox.position_id == Position.id, Gitterbox.stav == "aktivni"),
+            True,
+        ),
+        "shelf": (Shelf, Position.shelf_id == Shelf.id, False),
+        "location": (Location, Shelf.location_id == Location.id, False),
+    },
+)
+
+ITEM_READ_MODEL = ReadModel(
+    ItemRow,
+    Item,
+    columns={
+        "id": (Item.id, ()),
+        "gitterbox_id": (Item.gitterbox_id, ()),
+        "tma_cislo": (Item.tma_cislo, ()),
+        "projekt": (Item.projekt, ()),
+        "nazev_dilu": (Item.nazev_dilu, ()),
+        "pocet_kusu": (Item.pocet_kusu, ()),
+        "jednotka": (Item.jednotka, ()),
+        "datum_zaskladneni": (Item.datum_zaskladneni, ()),
+        "sledovat_expiraci": (Item.sledovat_expiraci, ()),
+        "expiracni_datum": (Item.expiracni_datum, ()),
+        "stav": (Item.stav, ()),
+        "cislo_gb": (Gitterbox.cislo_gb, _GB_JOINY),
+        "zodpovedna_osoba": (Gitterbox.zodpovedna_osoba, _GB_JOINY),
+        "radek": (Position.radek, _POZICE_JOINY),
+        "sloupec": (Position.sloupec, _POZICE_JOINY),
+        "regal": (Shelf.nazev, _REGAL_JOINY),
+        "lokace": (Location.nazev, _REGAL_JOINY + ("location",)),
+    },
+    joins={
+        "gitterbox": (Gitterbox, Item.gitterbox_id == Gitterbox.id, False),
+        "position": (Position, Gitterbox.position_id == Position.id, False),
+        "shelf": (Shelf, Position.shelf_id == Shelf.id, False),
+        "location": (Location, Shelf.location_id == Location.id, False),
+    },
+)
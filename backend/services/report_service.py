@@ -0,0 +1,169 @@
+"""
+Reporty naplněnosti skladu počítané v SQL
+Autor: GitHub Copilot
+Datum: 17.10.2026
+
+Funkcionalita:
+- Souhrnné statistiky pozic, GB a položek jedním agregovaným dotazem
+- Počty pozic ze skutečné tabulky positions (ne ze statické konfigurace)
+- Nejméně naplněné GB přes ORDER BY + LIMIT
+"""
+
+from datetime import date, timedelta
+from typing import List, Dict, Any
+
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.orm import Session
+
+from models import Gitterbox, Position, Shelf, Location, Item
+from services.listing_service import KRITICKA_EXPIRACE_DNI
+
+# Hranice naplněnosti GB v procentech
+PLNE_NAPLNENE_OD = 90
+DOBRE_NAPLNENE_OD = 70
+
+
+def _count(*conditions):
+    """Počet řádků splňujících podmínky jako SUM(CASE ...)"""
+    return func.coalesce(func.sum(case((and_(*conditions), 1), else_=0)), 0)
+
+
+class ReportService:
+    """Agregované reporty pro dashboard a report kapacity"""
+
+    @staticmethod
+    def get_summary(db: Session) -> Dict[str, Any]:
+        """
+        Vrátí všechny souhrnné statistiky jedním dotazem
+
+        Pozice a GB se agregují přes tabulky positions/gitterboxes, počet
+        položek se sčítá z uložených počítadel GB a expirace se počítají
+        přes částečný index aktivních sledovaných položek.
+
+        Returns:
+            Dict: pozice, GB podle naplněnosti a položky podle expirace
+        """
+        today = date.today()
+        kriticky_datum = today + timedelta(days=KRITICKA_EXPIRACE_DNI)
+        aktivni_gb = Gitterbox.stav == "aktivni"
+        sledovane = and_(
+            Item.stav == "aktivni", Item.sledovat_expiraci == True  # noqa: E712
+        )
+
+        pozice_celkem = select(func.count(Position.id)).scalar_subquery()
+        pozice_volne = (
+            select(func.count(Position.id))
+            .where(Position.status == "volna")
+            .scalar_subquery()
+        )
+
+        expirovane = (
+            select(func.count(Item.id))
+            .where(sledovane, Item.expiracni_datum < today)
+            .scalar_subquery()
+        )
+        blizko_expirace = (
+            select(func.count(Item.id))
+            .where(
+                sledovane,
+                Item.expiracni_datum >= today,
+                Item.expiracni_datum <= kriticky_datum,
+            )
+            .scalar_subquery()
+        )
+
+        # Agregace přes gitterboxes, ostatní počty jako skalární poddotazy přes indexy
+        row = db.execute(
+            select(
+                pozice_celkem.label("celkem"),
+                pozice_volne.label("volne"),
+                _count(aktivni_gb).label("celkem_aktivnich"),
+                func.avg(case((aktivni_gb, Gitterbox.naplnenost_procenta))).label(
+                    "prumerna_naplnenost"
+                ),
+                _count(
+                    aktivni_gb, Gitterbox.naplnenost_procenta >= PLNE_NAPLNENE_OD
+                ).label("plne_naplnene"),
+                _count(
+                    aktivni_gb,
+                    Gitterbox.naplnenost_procenta >= DOBRE_NAPLNENE_OD,
+                    Gitterbox.naplnenost_procenta < PLNE_NAPLNENE_OD,
+                ).label("dobre_naplnene"),
+                _count(
+                    aktivni_gb, Gitterbox.naplnenost_procenta < DOBRE_NAPLNENE_OD
+                ).label("nedostatecne_naplnene"),
+                _count(
+                    aktivni_gb, Gitterbox.nejblizsi_expirace <= kriticky_datum
+                ).label("s_kritickymi_expiracemi"),
+                # Každá položka patří do GB, součet počítadel = všechny aktivní položky
+                func.coalesce(func.sum(Gitterbox.pocet_polozek), 0).label(
+                    "celkem_polozek"
+                ),
+                expirovane.label("expirovane"),
+                blizko_expirace.label("blizko_expirace"),
+            ).select_from(Gitterbox)
+        ).one()
+
+        return {
+            "pozice": {
+                "celkem": row.celkem,
+                "volne": row.volne,
+                "obsazene": row.celkem - row.volne,
+            },
+            "gitterboxy": {
+                "celkem_aktivnich": row.celkem_aktivnich,
+                "prumerna_naplnenost": float(row.prumerna_naplnenost or 0),
+                "plne_naplnene": row.plne_naplnene,
+                "dobre_naplnene": row.dobre_naplnene,
+                "nedostatecne_naplnene": row.nedostatecne_naplnene,
+                "s_kritickymi_expiracemi": row.s_kritickymi_expiracemi,
+            },
+            "polozky": {
+                "celkem_aktivnich": row.celkem_polozek,
+                "expirovane": row.expirovane,
+                "blizko_expirace": row.blizko_expirace,
+            },
+        }
+
+    @staticmethod
+    def get_position_counts(db: Session) -> Dict[str, int]:
+        """Počet všech a volných pozic ze skutečné tabulky positions"""
+        celkem, volne = db.query(
+            func.count(Position.id), _count(Position.status == "volna")
+        ).one()
+        return {"celkem": celkem, "volne": volne, "obsazene": celkem - volne}
+
+    @staticmethod
+    def get_least_filled(db: Session, limit: int = 5) -> List[Dict[str, Any]]:
+        """Nejméně naplněné aktivní GB (index ix_gitterboxes_stav_naplnenost)"""
+        rows = (
+            db.query(
+                Gitterbox.cislo_gb,
+                Gitterbox.naplnenost_procenta,
+                Gitterbox.pocet_polozek,
+                Gitterbox.zodpovedna_osoba,
+                Location.nazev.label("lokace"),
+                Shelf.nazev.label("regal"),
+                Position.radek,
+                Position.sloupec,
+            )
+            .join(Position, Gitterbox.position_id == Position.id)
+            .join(Shelf, Position.shelf_id == Shelf.id)
+            .join(Location, Shelf.location_id == Location.id)
+            .filter(Gitterbox.stav == "aktivni")
+            .order_by(Gitterbox.naplnenost_procenta, Gitterbox.cislo_gb)
+            .limit(limit)
+            .all()
+        )
+        return [
+            {
+                "cislo_gb": row.cislo_gb,
+                "naplnenost_procenta": row.naplnenost_procenta,
+                "pocet_polozek": row.pocet_polozek,
+                "zodpovedna_osoba": row.zodpovedna_osoba,
+                "lokace": row.lokace,
+                "regal": row.regal,
+                "pozice": f"{row.radek}-{row.sloupec}",
+            }
+            for row in rows
+        ]
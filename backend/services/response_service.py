@@ -0,0 +1,117 @@
+"""
+Rychlá serializace JSON odpovědí (orjson)
+Autor: GitHub Copilot
+Datum: 17.10.2026
+
+Funkcionalita:
+- FastJSONResponse kóduje odpověď přes orjson (datumy, vnořené slovníky
+  a seznamy nativně v C), ostatní typy přes jsonable_encoder
+- FastJSONRoute: endpoint bez response_model, který vrátí slovník nebo
+  seznam, dostane rovnou FastJSONResponse - FastAPI pak odpověď znovu
+  neprochází rekurzivně přes jsonable_encoder
+- Endpointy s response_model dál validuje pydantic, kóduje je orjson
+- listing_response: celé výpisy (vse=true) se streamují po dávkách řádků,
+  v paměti tak není seznam všech řádků ani celé tělo odpovědi
+"""
+
+import functools
+import inspect
+from typing import Any, Callable, Dict, Iterable, Iterator, Union
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.routing import APIRoute
+
+# Počet řádků v jednom bloku streamovaného výpisu
+STREAM_CHUNK_ROWS = 1000
+
+
+def _dumps(content) -> bytes:
+    # Typy, které orjson nezná (pydantic modely, Decimal, množiny ...), převede jsonable_encoder
+    return orjson.dumps(
+        content, default=jsonable_encoder, option=orjson.OPT_NON_STR_KEYS
+    )
+
+
+def _stream_listing(
+    data: Iterable, tail: Callable[[int], Dict[str, Any]]
+) -> Iterator[bytes]:
+    """Tělo {"status": "success", "data": [...], **tail(pocet)} po blocích řádků"""
+    yield b'{"status":"success","data":['
+    pocet = 0
+    chunk = []
+    for row in data:
+        # Čárka před prvním řádkem každého bloku kromě prvního
+        chunk.append(_dumps(row) if pocet == 0 else b"," + _dumps(row))
+        pocet += 1
+        if len(chunk) >= STREAM_CHUNK_ROWS:
+            yield b"".join(chunk)
+            chunk = []
+    if chunk:
+        yield b"".join(chunk)
+
+    konec = tail(pocet)
+    yield (b"]," + _dumps(konec)[1:]) if konec else b"]}"
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON odpověď kódovaná přes orjson"""
+
+    def render(self, content) -> bytes:
+        return _dumps(content)
+
+
+def listing_response(
+    data: Iterable, tail: Callable[[int], Dict[str, Any]], stream: bool = False
+) -> Union[Dict[str, Any], StreamingResponse]:
+    """
+    Odpověď výpisu {"status": "success", "data": [...], **tail(pocet)}
+
+    Args:
+        data: Serializované řádky (generátor, u celého výpisu čtený přes yield_per)
+        tail: Klíče za seznamem data podle počtu řádků (stránkování, message ...)
+        stream: Tělo se kóduje a posílá po blocích STREAM_CHUNK_ROWS řádků
+
+    Streamovaný výpis čte řádky až při odesílání těla - session z get_database
+    se zavírá až po odeslání odpovědi. Chyba během čtení už nemůže vrátit 500,
+    spojení se ukončí s neúplným tělem.
+    """
+    if stream:
+        return StreamingResponse(
+            _stream_listing(data, tail), media_type="application/json"
+        )
+    result = list(data)
+    return {"status": "success", "data": result, **tail(len(result))}
+
+
+class FastJSONRoute(APIRoute):
+    """Route, jejíž slovníkové odpovědi obcházejí jsonable_encoder"""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        # Router vložený přes include_router předává už obalený endpoint
+        if not getattr(endpoint, "_fast_json", False):
+            endpoint = self._wrap_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+    def _wrap_endpoint(self, endpoint):
+        def to_response(result):
+            # S response_model rozhoduje o tvaru odpovědi FastAPI (validace)
+            if self.response_field is None and isinstance(result, (dict, list)):
+                return FastJSONResponse(result)
+            return result
+
+        if inspect.iscoroutinefunction(endpoint):
+
+            @functools.wraps(endpoint)
+            async def wrapper(*args, **kwargs):
+                return to_response(await endpoint(*args, **kwargs))
+
+        else:
+
+            @functools.wraps(endpoint)
+            def wrapper(*args, **kwargs):
+                return to_response(endpoint(*args, **kwargs))
+
+        wrapper._fast_json = True
+        return wrapper
@@ -0,0 +1,283 @@
+"""
+Fulltext vyhledávání nad položkami a Gitterboxy (SQLite FTS5)
+Autor: GitHub Copilot
+Datum: 17.10.2026
+
+Funkcionalita:
+- Virtuální tabulka search_index nad položkami a GB
+- Triggery, které drží index v synchronizaci s tabulkami items/gitterboxes
+- Sestavení bezpečného MATCH výrazu z uživatelského dotazu
+- Hledání s řazením podle relevance (bm25) a stránkováním
+"""
+
+import re
+from typing import List, Dict, Any, Optional
+
+from sqlalchemy import text, select, table, column, literal_column
+from sqlalchemy.orm import Session
+
+# Řádky indexu: položka má rowid = id * 2, GB má rowid = id * 2 + 1
+SEARCH_INDEX_DDL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+    typ UNINDEXED,
+    gitterbox_id UNINDEXED,
+    item_id UNINDEXED,
+    nazev_dilu,
+    tma_cislo,
+    projekt,
+    poznamka,
+    zodpovedna_osoba,
+    cislo_gb,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+)
+"""
+
+_INSERT_ITEM_ROW = """
+    INSERT INTO search_index (rowid, typ, gitterbox_id, item_id, nazev_dilu, tma_cislo,
+                              projekt, poznamka, zodpovedna_osoba, cislo_gb)
+"""
+
+SEARCH_TRIGGERS = [
+    # Položky - indexují se pouze aktivní položky aktivních GB (jako v rebuild)
+    f"""
+    CREATE TRIGGER IF NOT EXISTS search_items_ai AFTER INSERT ON items
+    WHEN new.stav = 'aktivni'
+    BEGIN
+        {_INSERT_ITEM_ROW}
+        SELECT new.id * 2, 'polozka', new.gitterbox_id, new.id, new.nazev_dilu, new.tma_cislo,
+               new.projekt, new.poznamka, g.zodpovedna_osoba, g.cislo_gb
+        FROM gitterboxes g WHERE g.id = new.gitterbox_id AND g.stav = 'aktivni';
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_items_ad AFTER DELETE ON items
+    BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 2;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS search_items_au AFTER UPDATE ON items
+    BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 2;
+        {_INSERT_ITEM_ROW}
+        SELECT new.id * 2, 'polozka', new.gitterbox_id, new.id, new.nazev_dilu, new.tma_cislo,
+               new.projekt, new.poznamka, g.zodpovedna_osoba, g.cislo_gb
+        FROM gitterboxes g WHERE g.id = new.gitterbox_id AND new.stav = 'aktivni' AND g.stav = 'aktivni';
+    END
+    """,
+    # Gitterboxy - vlastní řádek GB
+    f"""
+    CREATE TRIGGER IF NOT EXISTS search_gitterboxes_ai AFTER INSERT ON gitterboxes
+    WHEN new.stav = 'aktivni'
+    BEGIN
+        {_INSERT_ITEM_ROW}
+        VALUES (new.id * 2 + 1, 'gitterbox', new.id, NULL, NULL, NULL,
+                NULL, new.poznamka, new.zodpovedna_osoba, new.cislo_gb);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_gitterboxes_ad AFTER DELETE ON gitterboxes
+    BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 2 + 1;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS search_gitterboxes_au
+    AFTER UPDATE OF poznamka, zodpovedna_osoba, cislo_gb, stav ON gitterboxes
+    BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 2 + 1;
+        {_INSERT_ITEM_ROW}
+        SELECT new.id * 2 + 1, 'gitterbox', new.id, NULL, NULL, NULL,
+               NULL, new.poznamka, new.zodpovedna_osoba, new.cislo_gb
+        WHERE new.stav = 'aktivni';
+    END
+    """,
+    # Změna osoby/čísla/stavu GB se musí propsat i do řádků jeho položek
+    f"""
+    CREATE TRIGGER IF NOT EXISTS search_gitterboxes_au_items
+    AFTER UPDATE OF zodpovedna_osoba, cislo_gb, stav ON gitterboxes
+    BEGIN
+        DELETE FROM search_index WHERE rowid IN (SELECT id * 2 FROM items WHERE gitterbox_id = new.id);
+        {_INSERT_ITEM_ROW}
+        SELECT i.id * 2, 'polozka', i.gitterbox_id, i.id, i.nazev_dilu, i.tma_cislo,
+               i.projekt, i.poznamka, new.zodpovedna_osoba, new.cislo_gb
+        FROM items i WHERE i.gitterbox_id = new.id AND i.stav = 'aktivni' AND new.stav = 'aktivni';
+    END
+    """,
+]
+
+_REBUILD_STATEMENTS = [
+    "DELETE FROM search_index",
+    f"""
+    {_INSERT_ITEM_ROW}
+    SELECT i.id * 2, 'polozka', i.gitterbox_id, i.id, i.nazev_dilu, i.tma_cislo,
+           i.projekt, i.poznamka, g.zodpovedna_osoba, g.cislo_gb
+    FROM items i JOIN gitterboxes g ON g.id = i.gitterbox_id
+    WHERE i.stav = 'aktivni' AND g.stav = 'aktivni'
+    """,
+    f"""
+    {_INSERT_ITEM_ROW}
+    SELECT g.id * 2 + 1, 'gitterbox', g.id, NULL, NULL, NULL,
+           NULL, g.poznamka, g.zodpovedna_osoba, g.cislo_gb
+    FROM gitterboxes g WHERE g.stav = 'aktivni'
+    """,
+]
+
+# Lehká reprezentace FTS tabulky pro skládání Core dotazů
+search_index = table(
+    "search_index", column("gitterbox_id"), column("item_id"), column("typ")
+)
+
+# Sloupce indexu, podle kterých lze omezit hledání (např. projekt)
+INDEXED_COLUMNS = (
+    "nazev_dilu",
+    "tma_cislo",
+    "projekt",
+    "poznamka",
+    "zodpovedna_osoba",
+    "cislo_gb",
+)
+
+
+class SearchService:
+    """Správa FTS5 indexu a fulltext dotazy"""
+
+    @staticmethod
+    def create_search_index(connection) -> None:
+        """
+        Vytvoří FTS5 tabulku a triggery (idempotentní)
+
+        Pokud tabulka vzniká poprvé, naplní se z existujících dat.
+
+        Args:
+            connection: SQLAlchemy Connection v otevřené transakci
+        """
+        exists = connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'"
+        ).first()
+
+        connection.exec_driver_sql(SEARCH_INDEX_DDL)
+        for trigger in SEARCH_TRIGGERS:
+            connection.exec_driver_sql(trigger)
+
+        if not exists:
+            SearchService.rebuild_search_index(connection)
+            print("✅ Fulltext index vytvořen")
+
+    @staticmethod
+    def drop_item_triggers(connection) -> None:
+        """Smaže triggery položek (create_search_index je vytvoří v aktuální podobě)"""
+        for trigger in ("search_items_ai", "search_items_au"):
+            connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {trigger}")
+
+    @staticmethod
+    def rebuild_search_index(connection) -> None:
+        """Znovu naplní index z tabulek items a gitterboxes"""
+        for statement in _REBUILD_STATEMENTS:
+            connection.exec_driver_sql(statement)
+
+    @staticmethod
+    def drop_search_index(connection) -> None:
+        """Smaže FTS5 tabulku (triggery zanikají spolu s tabulkami items/gitterboxes)"""
+        connection.exec_driver_sql("DROP TABLE IF EXISTS search_index")
+
+    @staticmethod
+    def build_match_query(query: str, column: Optional[str] = None) -> Optional[str]:
+        """
+        Převede uživatelský dotaz na FTS5 MATCH výraz
+
+        Každé slovo se hledá jako prefix a všechna slova musí odpovídat (AND).
+        Uvozovky a speciální znaky FTS5 syntaxe se z dotazu odstraní.
+
+        Args:
+            query: Text zadaný uživatelem
+            column: Omezení na jeden sloupec indexu (volitelné)
+
+        Returns:
+            str nebo None pokud dotaz neobsahuje žádné hledatelné slovo
+        """
+        if column is not None and column not in INDEXED_COLUMNS:
+            raise ValueError(f"Sloupec {column} není ve fulltext indexu")
+
+        terms = []
+        for term in (query or "").split():
+            cleaned = re.sub(r'["*^:(){}]', " ", term).strip()
+            if re.search(r"\w", cleaned):
+                terms.append(f'"{cleaned}"*')
+
+        if not terms:
+            return None
+
+        match = " ".join(terms)
+        return f"{column} : ({match})" if column else match
+
+    @staticmethod
+    def search(
+        db: Session, query: str, limit: int = 50, offset: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Vyhledá položky a GB podle relevance
+
+        Args:
+            db: Databázová session
+            query: Text dotazu
+            limit: Maximální počet výsledků na stránku
+            offset: Posun stránky
+
+        Returns:
+            Dict: {"vysledky": [...], "ma_dalsi": bool}
+        """
+        match = SearchService.build_match_query(query)
+        if match is None:
+            return {"vysledky": [], "ma_dalsi": False}
+
+        # O jeden řádek navíc, abychom věděli, zda existuje další stránka
+        rows = db.execute(
+            text("""
+                SELECT typ, gitterbox_id, item_id, nazev_dilu, tma_cislo, projekt, poznamka,
+                       bm25(search_index) AS skore
+                FROM search_index
+                WHERE search_index MATCH :match
+                ORDER BY rank
+                LIMIT :limit OFFSET :offset
+                """),
+            {"match": match, "limit": limit + 1, "offset": offset},
+        ).fetchall()
+
+        vysledky: List[Dict[str, Any]] = []
+        for row in rows[:limit]:
+            vysledky.append(
+                {
+                    "typ": row.typ,
+                    "gitterbox_id": row.gitterbox_id,
+                    "skore": round(-row.skore, 4),
+                    "polozka": (
+                        {
+                            "id": row.item_id,
+                            "nazev_dilu": row.nazev_dilu,
+                            "tma_cislo": row.tma_cislo,
+                            "projekt": row.projekt,
+                            "poznamka": row.poznamka,
+                        }
+                        if row.typ == "polozka"
+                        else None
+                    ),
+                }
+            )
+
+        return {"vysledky": vysledky, "ma_dalsi": len(rows) > limit}
+
+    @staticmethod
+    def matching_gitterbox_ids(query: str, column: Optional[str] = None):
+        """
+        Vrátí poddotaz s ID GB odpovídajících dotazu, nebo None pro prázdný dotaz
+
+        Pro použití v Gitterbox.id.in_(...) filtrech, např. v exportu.
+        """
+        match = SearchService.build_match_query(query, column)
+        if match is None:
+            return None
+        return select(search_index.c.gitterbox_id).where(
+            literal_column("search_index").op("MATCH")(match)
+        )
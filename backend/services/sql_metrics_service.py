@@ -0,0 +1,208 @@
+"""
+Měření SQL dotazů každého požadavku a log pomalých dotazů
+Autor: GitHub Copilot
+Datum: 17.10.2026
+
+Funkcionalita:
+- Události enginu měří každý SQL příkaz (počet, celkový čas, nejpomalejší)
+  a přičtou ho k právě běžícímu HTTP požadavku
+- SQLMetricsMiddleware vrací výsledek v hlavičkách X-DB-Queries
+  a Server-Timing (vidí je i záložka Network v prohlížeči)
+- Příkazy nad prahem SLOW_QUERY_MS se zapisují do rotujícího logu
+  s normalizovaným SQL a plánem dotazu (EXPLAIN)
+"""
+
+import contextvars
+import logging
+import os
+import re
+import time
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+from database import IS_SQLITE, engine
+
+# Příkazy delší než práh (ms) se zapisují do logu pomalých dotazů
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+
+# Log pomalých dotazů (prázdná hodnota log vypne), rotuje podle velikosti
+SLOW_QUERY_LOG = os.getenv(
+    "SLOW_QUERY_LOG",
+    str(Path(__file__).parent.parent.parent / "logs" / "slow_queries.log"),
+)
+SLOW_QUERY_LOG_MAX_BYTES = int(
+    os.getenv("SLOW_QUERY_LOG_MAX_BYTES", str(5 * 1024 * 1024))
+)
+SLOW_QUERY_LOG_BACKUPS = int(os.getenv("SLOW_QUERY_LOG_BACKUPS", "5"))
+
+# Příkazy, u kterých má smysl zjišťovat plán dotazu
+_EXPLAIN_PREFIXES = ("SELECT", "WITH", "UPDATE", "DELETE", "INSERT")
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN \((?:\?, )+\?\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryStats:
+    """SQL příkazy jednoho požadavku"""
+
+    __slots__ = ("request", "count", "total_ms", "slowest_ms", "slowest_sql")
+
+    def __init__(self, request: str):
+        self.request = request
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest_sql: Optional[str] = None
+
+    def record(self, statement: str, duration_ms: float) -> None:
+        self.count += 1
+        self.total_ms += duration_ms
+        if duration_ms > self.slowest_ms:
+            self.slowest_ms = duration_ms
+            self.slowest_sql = statement
+
+    def server_timing(self, app_ms: float) -> str:
+        """Hodnota hlavičky Server-Timing (jen ASCII, hlavičky jsou latin-1)"""
+        return (
+            f'db;dur={self.total_ms:.1f};desc="{self.count} queries", '
+            f"db-slowest;dur={self.slowest_ms:.1f}, "
+            f"app;dur={app_ms:.1f}"
+        )
+
+
+# Statistiky právě běžícího požadavku (threadpool dostává kopii kontextu,
+# objekt QueryStats je sdílený)
+_current_stats: contextvars.ContextVar[Optional[QueryStats]] = contextvars.ContextVar(
+    "sql_query_stats", default=None
+)
+
+_slow_log: Optional[logging.Logger] = None
+
+
+def current_stats() -> Optional[QueryStats]:
+    """Statistiky SQL právě běžícího požadavku (mimo požadavek None)"""
+    return _current_stats.get()
+
+
+def normalize_sql(statement: str) -> str:
+    """SQL bez literálů a s jedním řádkem - stejné dotazy mají stejný text"""
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _NUMBER_LITERAL.sub("?", statement)
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    return _IN_LIST.sub("IN (?...)", statement)
+
+
+def _get_slow_log() -> logging.Logger:
+    """Logger pomalých dotazů, soubor se založí až při prvním zápisu"""
+    global _slow_log
+    if _slow_log is None:
+        logger = logging.getLogger("storage_app.slow_queries")
+        logger.setLevel(logging.WARNING)
+        logger.propagate = False
+        if not logger.handlers:
+            Path(SLOW_QUERY_LOG).parent.mkdir(parents=True, exist_ok=True)
+            handler = RotatingFileHandler(
+                SLOW_QUERY_LOG,
+                maxBytes=SLOW_QUERY_LOG_MAX_BYTES,
+                backupCount=SLOW_QUERY_LOG_BACKUPS,
+                encoding="utf-8",
+            )
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            logger.addHandler(handler)
+        _slow_log = logger
+    return _slow_log
+
+
+def _explain(dbapi_connection, statement: str, parameters) -> str:
+    """Plán dotazu na stejném připojení (přímo přes DB-API, mimo měření)"""
+    prefix = "EXPLAIN QUERY PLAN " if IS_SQLITE else "EXPLAIN "
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        rows = cursor.fetchall()
+    except Exception as e:
+        return f"EXPLAIN selhal: {e}"
+    finally:
+        cursor.close()
+    if IS_SQLITE:
+        # (id, parent, notused, detail) - detail odsazený podle hloubky ve stromu plánu
+        hloubka = {0: 0}
+        radky = []
+        for node_id, parent, _, detail in rows:
+            hloubka[node_id] = hloubka.get(parent, 0) + 1
+            radky.append("  " * hloubka[node_id] + detail)
+        return "\n".join(radky)
+    return "\n".join("  " + " ".join(str(value) for value in row) for row in rows)
+
+
+def _log_slow_query(
+    conn, statement: str, parameters, duration_ms: float, executemany: bool
+) -> None:
+    stats = current_stats()
+    request = stats.request if stats else "-"
+    zprava = f"{duration_ms:.1f} ms | {request} | {normalize_sql(statement)}"
+    if not executemany and statement.lstrip().upper().startswith(_EXPLAIN_PREFIXES):
+        zprava += "\n" + _explain(conn.connection, statement, parameters)
+    _get_slow_log().warning(zprava)
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._sql_metrics_start = time.perf_counter()
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _record_query(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_sql_metrics_start", None)
+    if start is None:
+        return
+    duration_ms = (time.perf_counter() - start) * 1000
+
+    stats = current_stats()
+    if stats is not None:
+        stats.record(statement, duration_ms)
+
+    if SLOW_QUERY_LOG and duration_ms >= SLOW_QUERY_MS:
+        try:
+            _log_slow_query(conn, statement, parameters, duration_ms, executemany)
+        except Exception as e:
+            # Log pomalých dotazů nesmí shodit požadavek
+            print(f"⚠️ Nelze zapsat pomalý dotaz do logu: {e}")
+
+
+class SQLMetricsMiddleware:
+    """ASGI middleware: měří SQL požadavku a přidá hlavičky X-DB-Queries a Server-Timing"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(f"{scope['method']} {scope['path']}")
+        start = time.perf_counter()
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                # Dotazy streamované odpovědi po odeslání hlaviček už v nich nejsou
+                headers = MutableHeaders(scope=message)
+                headers["X-DB-Queries"] = str(stats.count)
+                headers["Server-Timing"] = stats.server_timing(
+                    (time.perf_counter() - start) * 1000
+                )
+            await send(message)
+
+        token = _current_stats.set(stats)
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _current_stats.reset(token)
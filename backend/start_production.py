@@ -5,7 +5,9 @@ Použití: python start_production.py
 """
 
 import os
+import shutil
 import sys
+import tempfile
 import uvicorn
 from pathlib import Path
 
@@ -13,16 +15,40 @@ from pathlib import Path
 BASE_DIR = Path(__file__).parent
 sys.path.append(str(BASE_DIR))
 
-# Import aplikace
-from main import app
+# Počet workerů (uvicorn je spustí jen s aplikací zadanou jako "modul:app")
+WORKERS = int(os.getenv("WORKERS", "2"))
+
+
+def prepare_metrics_dir() -> None:
+    """
+    Sdílený adresář metrik Prometheus pro více workerů
+
+    Musí být v prostředí dřív, než workery importují prometheus_client,
+    a při startu se vyprázdní (soubory workerů z minulého běhu).
+    """
+    metrics_dir = os.environ.setdefault(
+        "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "storage_app_metrics")
+    )
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
 
 if __name__ == "__main__":
+    if WORKERS > 1:
+        prepare_metrics_dir()
+
+        # Schéma a výchozí data připraví hlavní proces, souběžné workery by
+        # nad novou databází zakládaly tabulky a lokace současně
+        from database import init_database
+        init_database()
+
     # Produkční konfigurace
     uvicorn.run(
-        app,
+        "main:app",
+        app_dir=str(BASE_DIR),
         host=os.getenv("HOST", "0.0.0.0"),
         port=int(os.getenv("PORT", 8000)),
-        workers=2,  # Více workerů pro produkci
+        workers=WORKERS,  # Více workerů pro produkci
         access_log=True,
         log_level="info"
     )
@@ -131,6 +131,14 @@ const API = {
         return ApiClient.get(`/shelves/${shelfId}/positions`);
     },
 
+    /**
+     * Kompaktní mřížky obsazenosti (regál, lokace nebo celý sklad)
+     */
+    async getOccupancy(params = {}) {
+        const query = new URLSearchParams(params).toString();
+        return ApiClient.get(`/positions/occupancy${query ? `?${query}` : ''}`);
+    },
+
     /**
      * Získání detailu konkrétní pozice
      */
@@ -178,10 +186,19 @@ const API = {
     // === GITTERBOXY ===
     
     /**
-     * Získání všech Gitterboxů
+     * Získání všech Gitterboxů (bez stránkování)
      */
     async getAllGitterboxes() {
-        return ApiClient.get('/gitterboxes/');
+        return ApiClient.get('/gitterboxes/?vse=true');
+    },
+
+    /**
+     * Jedna stránka Gitterboxů - další stránku vrací strankovani.next_cursor
+     */
+    async getGitterboxesPage(cursor = null, limit = 100) {
+        const params = new URLSearchParams({ limit });
+        if (cursor) params.set('cursor', cursor);
+        return ApiClient.get(`/gitterboxes/?${params}`);
     },
 
     /**
@@ -191,6 +208,20 @@ const API = {
         return ApiClient.get('/gitterboxes/available-numbers');
     },
 
+    /**
+     * Rezervace bloku čísel GB pro hromadný příjem
+     */
+    async reserveGBNumbers(pocet, souvisle = false) {
+        return ApiClient.post('/gitterboxes/numbers/reserve', { pocet, souvisle });
+    },
+
+    /**
+     * Zrušení rezervace čísel GB
+     */
+    async releaseGBNumbers(token) {
+        return ApiClient.delete(`/gitterboxes/numbers/reserve/${token}`);
+    },
+
     /**
      * Získání konkrétního Gitterboxu
      */
@@ -274,14 +305,14 @@ const API = {
      * Získání expirovaných položek
      */
     async getExpiredItems() {
-        return ApiClient.get('/items/expired');
+        return ApiClient.get('/items/expired?vse=true');
     },
 
     /**
      * Získání položek blízko expirace
      */
     async getExpiringSoonItems(daysAhead = 30) {
-        return ApiClient.get(`/items/expiring-soon?days_ahead=${daysAhead}`);
+        return ApiClient.get(`/items/expiring-soon?days_ahead=${daysAhead}&vse=true`);
     },
 
     /**
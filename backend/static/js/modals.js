@@ -211,6 +211,7 @@ class GitterboxModal {
         // ApiClient je statická třída, takže nepoužíváme instanci
         this.mode = 'create'; // 'create' nebo 'edit'
         this.editingGbId = null;
+        this.editingGbVerze = null;
         this.availablePositions = [];
         
         this.createModal();
@@ -602,6 +603,7 @@ class GitterboxModal {
     async openCreate(preselectedPositionId = null) {
         this.mode = 'create';
         this.editingGbId = null;
+        this.editingGbVerze = null;
         this.currentPositionId = null; // Vyčisti při vytváření
         
         document.getElementById('gb-modal-title').innerHTML = `
@@ -689,6 +691,7 @@ class GitterboxModal {
     async openEdit(gb) {
         this.mode = 'edit';
         this.editingGbId = gb.id;
+        this.editingGbVerze = gb.verze ?? null; // Verze GB pro kontrolu souběžné úpravy
         this.currentPositionId = gb.position_id; // Uloži aktuální pozici pro pozdější použití
         
         document.getElementById('gb-modal-title').innerHTML = `
@@ -809,6 +812,9 @@ class GitterboxModal {
                 const gbNumber = result.data?.cislo_gb || result.cislo_gb || data.cislo_gb;
                 this.modalManager.showSuccess(`Gitterbox #${gbNumber} byl úspěšně vytvořen`);
             } else {
+                if (this.editingGbVerze !== null) {
+                    data.verze = this.editingGbVerze;
+                }
                 result = await API.updateGitterbox(this.editingGbId, data);
                 const gbNumber = result.data?.cislo_gb || result.cislo_gb || data.cislo_gb;
                 this.modalManager.showSuccess(`Gitterbox #${gbNumber} byl úspěšně aktualizován`);
@@ -845,6 +851,18 @@ class GitterboxModal {
         }
     }
 
+    static expandRanges(rozsahy, limit) {
+        // Rozbalí intervaly [od, do] na jednotlivá čísla (nejvýše limit čísel)
+        const cisla = [];
+        for (const [od, doCisla] of rozsahy) {
+            for (let cislo = od; cislo <= doCisla && cisla.length < limit; cislo++) {
+                cisla.push(cislo);
+            }
+            if (cisla.length >= limit) break;
+        }
+        return cisla;
+    }
+
     async loadAvailableGBNumbers() {
         const strip = document.getElementById('available-numbers-strip');
         const info = document.getElementById('gb-numbers-info');
@@ -869,7 +887,10 @@ class GitterboxModal {
             console.log('✅ Response:', response);
             const data = response; // Response už obsahuje přímo data, ne zabalená
             
-            if (data.volna_cisla.length === 0) {
+            // Volná čísla chodí jako intervaly [od, do], zobrazí se jen prvních 50
+            const volnaCisla = GitterboxModal.expandRanges(data.volne_rozsahy, 50);
+            
+            if (volnaCisla.length === 0) {
                 strip.innerHTML = '<div class="text-red-500 text-sm">Žádná volná čísla</div>';
                 info.textContent = 'Všechna čísla GB jsou obsazená!';
                 return;
@@ -879,8 +900,7 @@ class GitterboxModal {
             const numbersContainer = document.createElement('div');
             numbersContainer.className = 'flex flex-wrap gap-1 min-w-max';
             
-            // Zobraz všechna volná čísla (ne jen prvních 20)
-            data.volna_cisla.slice(0, 50).forEach(cislo => { // Omezit na 50 pro performance
+            volnaCisla.forEach(cislo => {
                 const numberBtn = document.createElement('button');
                 numberBtn.type = 'button';
                 numberBtn.className = 'px-2 py-1 text-xs bg-green-100 hover:bg-green-200 text-green-800 rounded border border-green-300 transition-colors';
@@ -905,10 +925,9 @@ class GitterboxModal {
             strip.appendChild(numbersContainer);
             
             // Aktualizuj info text
-            const totalShown = Math.min(50, data.volna_cisla.length);
-            info.textContent = `Volných čísel: ${data.celkem_volnych} z ${data.max_cislo} (zobrazeno prvních ${totalShown})`;
+            info.textContent = `Volných čísel: ${data.celkem_volnych} z ${data.max_cislo} (zobrazeno prvních ${volnaCisla.length})`;
             
-            console.log(`Načteno ${data.volna_cisla.length} volných GB čísel`);
+            console.log(`Načteno ${data.celkem_volnych} volných GB čísel v ${data.volne_rozsahy.length} intervalech`);
             
         } catch (error) {
             console.error('Chyba při načítání volných čísel GB:', error);
@@ -953,7 +972,7 @@ class GitterboxModal {
             const response = await API.getAvailableGBNumbers();
             const data = response; // Opraveno - použij response přímo
             
-            if (data.volna_cisla.includes(number)) {
+            if (data.volne_rozsahy.some(([od, doCisla]) => number >= od && number <= doCisla)) {
                 input.classList.remove('border-red-500', 'border-gray-300');
                 input.classList.add('border-green-500');
                 if (info) info.textContent = `✅ Číslo ${number} je volné`;
@@ -272,9 +272,12 @@ class VyhledavaniTab {
                 person: this.filterPerson.value.trim()
             };
 
-            // Pro teď simulace API volání - použijeme data z regálů
-            const allGb = await this.getAllGitterboxesForSearch();
-            const filtered = this.filterResults(allGb);
+            // Textový dotaz řeší server (fulltext index), ostatní filtry klient
+            const fulltext = Boolean(this.currentQuery);
+            const allGb = fulltext
+                ? await this.getGitterboxesFromFulltext(this.currentQuery)
+                : await this.getAllGitterboxesForSearch();
+            const filtered = this.filterResults(allGb, fulltext);
             
             this.displaySearchResults(filtered);
             
@@ -312,14 +315,33 @@ class VyhledavaniTab {
         return gitterboxes;
     }
 
+    /**
+     * Získání GB z fulltext vyhledávání (/api/search), seřazených podle relevance
+     */
+    async getGitterboxesFromFulltext(query) {
+        const response = await API.search(query, { limit: 500 });
+        const seen = new Set();
+        const gitterboxes = [];
+
+        // Výsledky jsou po položkách - jeden GB zobrazíme jen jednou
+        response.data.forEach(hit => {
+            if (hit.gitterbox && !seen.has(hit.gitterbox.id)) {
+                seen.add(hit.gitterbox.id);
+                gitterboxes.push(hit.gitterbox);
+            }
+        });
+
+        return gitterboxes;
+    }
+
     /**
      * Filtrování výsledků podle kritérií
      */
-    filterResults(gitterboxes) {
+    filterResults(gitterboxes, fulltext = false) {
         let results = [...gitterboxes];
 
-        // Textové vyhledávání
-        if (this.currentQuery) {
+        // Textové vyhledávání (přeskočeno, pokud ho už provedl fulltext na serveru)
+        if (this.currentQuery && !fulltext) {
             const query = this.currentQuery.toLowerCase();
             results = results.filter(gb => {
                 return (
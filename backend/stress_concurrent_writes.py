@@ -0,0 +1,199 @@
+"""
+Zátěžový test souběžného zakládání a přesunů GB
+Autor: GitHub Copilot
+Datum: 17.10.2026
+
+Spustí server s několika workery nad dočasnou databází, z mnoha vláken
+posílá náhodná založení a přesuny GB na malou sadu "horkých" pozic a čísel
+a nakonec přímo v databázi ověří, že žádná pozice není obsazená dvakrát,
+žádné číslo není použité dvakrát a status pozic odpovídá aktivním GB.
+Selže i při odpovědi 500 (503 s Retry-After je povolené odmítnutí).
+Použití: python stress_concurrent_writes.py [--workers 4] [--clients 48] [--requests 600]
+"""
+
+import argparse
+import json
+import os
+import random
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _request(base_url: str, method: str, path: str, body=None):
+    """Vrací (status, JSON těla nebo None)"""
+    data = json.dumps(body).encode() if body is not None else None
+    request = urllib.request.Request(
+        base_url + path,
+        data=data,
+        method=method,
+        headers={"Content-Type": "application/json"},
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            return response.status, json.loads(response.read() or b"null")
+    except urllib.error.HTTPError as e:
+        return e.code, None
+    except (urllib.error.URLError, ConnectionError, socket.timeout):
+        return 0, None
+
+
+def _start_server(db_path: str, port: int, workers: int) -> subprocess.Popen:
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_path}", DEBUG="False")
+    env.pop("PROMETHEUS_MULTIPROC_DIR", None)
+
+    # Schéma připraví jeden proces, jako start_production.py
+    subprocess.run(
+        [sys.executable, "-c", "from database import init_database; init_database()"],
+        cwd=BASE_DIR,
+        env=env,
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "main:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+            "--log-level",
+            "warning",
+            "--no-access-log",
+        ],
+        cwd=BASE_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        if _request(base_url, "GET", "/api/health")[0] == 200:
+            return server
+        time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("Server nenastartoval")
+
+
+def _check_database(db_path: str) -> dict:
+    """Porušení integrity obsazenosti přímo v databázi"""
+    with sqlite3.connect(db_path) as connection:
+
+        def count(sql: str) -> int:
+            return connection.execute(sql).fetchone()[0]
+
+        return {
+            "dvakrát obsazené pozice": count("""
+                SELECT COUNT(*) FROM (SELECT position_id FROM gitterboxes WHERE stav = 'aktivni'
+                GROUP BY position_id HAVING COUNT(*) > 1)"""),
+            "dvakrát použitá čísla": count("""
+                SELECT COUNT(*) FROM (SELECT cislo_gb FROM gitterboxes WHERE stav = 'aktivni'
+                GROUP BY cislo_gb HAVING COUNT(*) > 1)"""),
+            "nesouhlasný status pozic": count(
+                """
+                SELECT COUNT(*) FROM positions p
+                WHERE (p.status = 'obsazena') != EXISTS (
+                    SELECT 1 FROM gitterboxes g WHERE g.position_id = p.id AND g.stav = 'aktivni')"""
+            ),
+        }
+
+
+def run(workers: int, clients: int, pocet_pozadavku: int, hot: int) -> bool:
+    temp_dir = tempfile.mkdtemp(prefix="storage_app_stress_")
+    db_path = os.path.join(temp_dir, "stress.db")
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+
+    server = _start_server(db_path, port, workers)
+    try:
+        pozice = [
+            p["id"]
+            for p in _request(base_url, "GET", f"/api/positions/available?limit={hot}")[
+                1
+            ]["data"]
+        ]
+        cisla = list(range(1, hot + 1))
+        zalozene = []
+
+        def one_request(_):
+            if zalozene and random.random() < 0.5:
+                status, _ = _request(
+                    base_url,
+                    "PUT",
+                    f"/api/gitterboxes/{random.choice(zalozene)}",
+                    {"position_id": random.choice(pozice)},
+                )
+                return "přesun", status
+            status, data = _request(
+                base_url,
+                "POST",
+                "/api/gitterboxes/",
+                {
+                    "cislo_gb": random.choice(cisla),
+                    "position_id": random.choice(pozice),
+                    "zodpovedna_osoba": "Stress",
+                },
+            )
+            if status == 200:
+                zalozene.append(data["id"])
+            return "založení", status
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as pool:
+            vysledky = list(pool.map(one_request, range(pocet_pozadavku)))
+        trvani = time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    print(
+        f"{pocet_pozadavku} požadavků, {clients} klientů, {workers} workerů: "
+        f"{pocet_pozadavku / trvani:.0f} req/s"
+    )
+    for (druh, status), pocet in sorted(Counter(vysledky).items()):
+        print(f"   {druh:<9} {status}: {pocet}")
+
+    ok = True
+    chyby_serveru = sum(
+        pocet for (_, status), pocet in Counter(vysledky).items() if status in (0, 500)
+    )
+    if chyby_serveru:
+        ok = False
+        print(f"❌ Chyby serveru (500 nebo spojení): {chyby_serveru}")
+    for popis, pocet in _check_database(db_path).items():
+        print(f"{'✅' if pocet == 0 else '❌'} {popis}: {pocet}")
+        ok = ok and pocet == 0
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Zátěžový test souběžných zápisů GB")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--clients", type=int, default=48)
+    parser.add_argument("--requests", type=int, default=600)
+    parser.add_argument(
+        "--hot", type=int, default=40, help="Počet horkých pozic a čísel"
+    )
+    args = parser.parse_args()
+    sys.exit(0 if run(args.workers, args.clients, args.requests, args.hot) else 1)
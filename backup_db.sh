@@ -12,7 +12,9 @@ mkdir -p "$BACKUP_DIR"
 
 # Backup databáze
 if [ -f "$DB_PATH" ]; then
-    cp "$DB_PATH" "$BACKUP_FILE"
+    # DB běží ve WAL módu - prostý cp by vynechal změny z storage.db-wal,
+    # online backup API vytvoří konzistentní kopii i za běhu aplikace
+    python3 -c "import sqlite3, sys; src = sqlite3.connect(sys.argv[1]); dst = sqlite3.connect(sys.argv[2]); src.backup(dst); dst.close(); src.close()" "$DB_PATH" "$BACKUP_FILE" || exit 1
     echo "$(date): Backup vytvořen: $BACKUP_FILE" >> "$BACKUP_DIR/backup.log"
     
     # Smazání starých backupů (starších než 30 dní)